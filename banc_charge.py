@@ -0,0 +1,253 @@
+"""Banc de charge : amplification amont de la logique de rafraîchissement de la page.
+
+Simule N onglets ouverts qui suivent le calendrier de rafraîchissement de la page générée,
+face à des API amont locales (bouchons Esplora, CoinGecko et Blockchain.info), et mesure ce
+que voient ces API : requêtes par seconde, octets transférés et latences.
+
+Deux scénarios :
+    interrogation  chaque onglet appelle les API (updateData au chargement puis toutes les
+                   POLL_INTERVAL_MS), comme en hébergement statique
+    sse            les onglets sont abonnés au flux de diffusion.py ; seul le veilleur appelle
+                   les API (latence mesurée : délai de diffusion d'un nouveau bloc)
+
+Le temps est accéléré (--acceleration) : une heure simulée dure quelques secondes réelles ;
+les débits sont rapportés en temps simulé. Les durées réelles (latence des bouchons, coût
+HTTP) ne sont pas accélérées : dans le scénario sse, elles s'ajouteraient à chaque tour du
+veilleur et fausseraient débit et délai de diffusion. L'accélération y est donc plafonnée
+pour que la latence réelle d'une requête reste sous MAX_LATENCY_SHARE de l'intervalle
+d'interrogation accéléré.
+
+Usage :
+    python banc_charge.py --clients 500 --duree 3600 --scenario interrogation [--budget 1.0]
+"""
+import argparse
+import heapq
+import json
+import random
+import sys
+import threading
+import time
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+import sources
+from calculs import CURRENCY_SYMBOLS
+from diffusion import EVENTS_PATH, PRICE_REFRESH_S, TIP_POLL_S, create_server
+from model_gaspillage_btc_france import POLL_INTERVAL_MS
+
+BLOCK_INTERVAL_S = 600  # Intervalle moyen entre blocs (temps simulé)
+STUB_START_HEIGHT = 920000
+MAX_LATENCY_SHARE = 0.05  # Part maximale de l'intervalle du veilleur (temps réel) prise par une requête
+MIN_REQUEST_S = 0.002  # Coût HTTP local minimal d'une requête, même sans latence ajoutée
+STUB_PRICES = {'eur': 97304.0, 'usd': 113000.0, 'gbp': 84500.0, 'chf': 90500.0, 'jpy': 16800000.0}
+
+
+class UpstreamStub:
+    """API amont locales sur un seul port, avec comptage des requêtes et octets par API."""
+
+    ROUTES = {
+        '/blocks/tip/height': 'esplora',
+        '/api/v3/simple/price': 'coingecko',
+        '/charts/hash-rate': 'blockchain.info',
+    }
+
+    def __init__(self, block_interval_s, latency_s=0.0):
+        self.block_interval_s = block_interval_s  # En secondes réelles
+        self.latency_s = latency_s
+        self.requests = Counter()
+        self.bytes = Counter()
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, name="bouchon-amont", daemon=True).start()
+
+    def tip_height(self):
+        return STUB_START_HEIGHT + int((time.monotonic() - self.started) / self.block_interval_s)
+
+    def block_time(self, height):
+        """Instant (monotonic) d'apparition du bloc `height` sur le bouchon."""
+        return self.started + (height - STUB_START_HEIGHT) * self.block_interval_s
+
+    def handle(self, request):
+        url = urlparse(request.path)
+        api = self.ROUTES.get(url.path)
+        if api == 'esplora':
+            body = str(self.tip_height())
+        elif api == 'coingecko':
+            currencies = parse_qs(url.query).get('vs_currencies', ['eur'])[0].split(',')
+            body = json.dumps({'bitcoin': {c: STUB_PRICES[c] for c in currencies if c in STUB_PRICES}})
+        elif api == 'blockchain.info':
+            body = json.dumps({'values': [{'x': int(time.time()), 'y': 6e8}]})
+        else:
+            request.send_error(404)
+            return
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        data = body.encode('utf-8')
+        request.send_response(200)
+        request.send_header('Content-Type', 'application/json')
+        request.send_header('Content-Length', str(len(data)))
+        request.send_header('Access-Control-Allow-Origin', '*')
+        request.end_headers()
+        request.wfile.write(data)
+        with self._lock:
+            self.requests[api] += 1
+            self.bytes[api] += len(data)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def page_refresh_urls():
+    """Requêtes d'un updateData() de la page (hauteur de bloc + prix de toutes les devises)."""
+    return [
+        f"{sources.ESPLORA_URL}/blocks/tip/height",
+        f"{sources.COINGECKO_URL}/simple/price?ids=bitcoin&vs_currencies={','.join(CURRENCY_SYMBOLS)}",
+    ]
+
+
+def run_polling(clients, duration_s, acceleration, arrival_s, workers=64):
+    """Onglets interrogeant les API ; retourne les latences client (s) de chaque requête."""
+    interval = POLL_INTERVAL_MS / 1000 / acceleration
+    start = time.monotonic()
+    end = start + duration_s / acceleration
+    # Calendrier de tous les onglets : arrivée étalée, puis un rafraîchissement par intervalle
+    schedule = [(start + random.uniform(0, arrival_s / acceleration), i) for i in range(clients)]
+    heapq.heapify(schedule)
+    latencies = []
+
+    def timed_get(url):
+        t0 = time.monotonic()
+        with urllib.request.urlopen(url, timeout=30) as response:
+            response.read()
+        latencies.append(time.monotonic() - t0)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while schedule:
+            at, client = heapq.heappop(schedule)
+            if at >= end:
+                break
+            time.sleep(max(0.0, at - time.monotonic()))
+            for url in page_refresh_urls():
+                pool.submit(timed_get, url)
+            heapq.heappush(schedule, (at + interval, client))
+    return latencies
+
+
+def run_sse(stub, clients, duration_s, acceleration, arrival_s):
+    """Onglets abonnés au flux SSE ; retourne les délais de diffusion (s simulées) des nouveaux blocs."""
+    server, broadcaster, stop = create_server(
+        host='127.0.0.1', port=0, esplora_url=sources.ESPLORA_URL,
+        poll_s=TIP_POLL_S / acceleration, price_refresh_s=PRICE_REFRESH_S / acceleration,
+    )
+    threading.Thread(target=server.serve_forever, name="diffusion", daemon=True).start()
+    events_url = f"http://127.0.0.1:{server.server_port}{EVENTS_PATH}"
+    start = time.monotonic()
+    delays = []
+
+    def listen(delay_s):
+        time.sleep(delay_s)
+        with urllib.request.urlopen(events_url, timeout=60) as stream:
+            for line in stream:
+                if not line.startswith(b'data:'):
+                    continue
+                height = json.loads(line[5:]).get('h')
+                if height and stub.block_time(height) >= start:
+                    delays.append((time.monotonic() - stub.block_time(height)) * acceleration)
+
+    for _ in range(clients):
+        threading.Thread(target=listen, args=(random.uniform(0, arrival_s / acceleration),), daemon=True).start()
+    time.sleep(duration_s / acceleration)
+    stop.set()
+    server.shutdown()
+    return delays
+
+
+def percentiles(values, scale=1.0):
+    """p50, p90, p99 et max d'une série (None si vide)."""
+    if not values:
+        return None
+    p50, p90, p99 = np.percentile(np.asarray(values) * scale, [50, 90, 99])
+    return {'p50': p50, 'p90': p90, 'p99': p99, 'max': max(values) * scale}
+
+
+def max_acceleration(scenario, latency_s):
+    """Accélération maximale fidèle au scénario (None : pas de limite).
+
+    En sse, le veilleur enchaîne requête puis attente de TIP_POLL_S / accélération : au-delà
+    de cette limite, la latence réelle allonge chaque tour et sous-estime la charge amont.
+    """
+    if scenario != 'sse':
+        return None
+    return TIP_POLL_S * MAX_LATENCY_SHARE / max(latency_s, MIN_REQUEST_S)
+
+
+def print_report(scenario, clients, duration_s, stub, latency):
+    """Affiche le rapport et retourne le débit amont total (requêtes par seconde simulée)."""
+    total_requests = sum(stub.requests.values())
+    rate = total_requests / duration_s
+    print(f"Scénario {scenario} : {clients} onglets, {duration_s:.0f} s simulées")
+    print(f"{'API':<18}{'Requêtes':>10}{'req/s':>10}{'Octets':>12}{'o/s':>10}")
+    for api in UpstreamStub.ROUTES.values():
+        print(f"{api:<18}{stub.requests[api]:>10}{stub.requests[api] / duration_s:>10.3f}"
+              f"{stub.bytes[api]:>12}{stub.bytes[api] / duration_s:>10.1f}")
+    print(f"{'Total':<18}{total_requests:>10}{rate:>10.3f}{sum(stub.bytes.values()):>12}"
+          f"{sum(stub.bytes.values()) / duration_s:>10.1f}")
+    label, unit = ("Latence client", "ms") if scenario == 'interrogation' else ("Délai de diffusion", "s")
+    if latency is None:
+        print(f"{label} : aucune mesure")
+    else:
+        print(f"{label} ({unit}) : " + ", ".join(f"{k} {v:.1f}" for k, v in latency.items()))
+    return rate
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesure la charge amont générée par N onglets ouverts.")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--duree", type=float, default=3600, help="durée simulée (s)")
+    parser.add_argument("--scenario", choices=("interrogation", "sse"), default="interrogation")
+    parser.add_argument("--acceleration", type=float, default=600, help="facteur d'accélération du temps")
+    parser.add_argument("--arrivee", type=float, default=POLL_INTERVAL_MS / 1000,
+                        help="étalement des arrivées des onglets (s simulées)")
+    parser.add_argument("--latence-ms", type=float, default=20, help="latence ajoutée par les bouchons amont")
+    parser.add_argument("--budget", type=float, help="débit amont maximal admis (req/s) ; code de sortie 1 si dépassé")
+    args = parser.parse_args()
+
+    limit = max_acceleration(args.scenario, args.latence_ms / 1000)
+    if limit is not None and args.acceleration > limit:
+        print(f"Accélération ramenée de {args.acceleration:g} à {limit:g} : au-delà, la latence des bouchons "
+              f"({args.latence_ms:g} ms) dépasse {MAX_LATENCY_SHARE:.0%} de l'intervalle du veilleur")
+        args.acceleration = limit
+    stub = UpstreamStub(BLOCK_INTERVAL_S / args.acceleration, args.latence_ms / 1000)
+    sources.ESPLORA_URL = stub.url
+    sources.COINGECKO_URL = f"{stub.url}/api/v3"
+    sources.BLOCKCHAIN_INFO_URL = stub.url
+    # Fournisseurs de secours (fournisseurs.py) : sans route sur le bouchon, jamais vers Internet
+    sources.MEMPOOL_URL = f"{stub.url}/mempool"
+    sources.BLOCKCHAIN_COM_URL = f"{stub.url}/blockchain.com"
+    sources.KRAKEN_URL = f"{stub.url}/kraken"
+    if args.scenario == 'interrogation':
+        latency = percentiles(run_polling(args.clients, args.duree, args.acceleration, args.arrivee), scale=1000)
+    else:
+        latency = percentiles(run_sse(stub, args.clients, args.duree, args.acceleration, args.arrivee))
+    stub.close()
+    rate = print_report(args.scenario, args.clients, args.duree, stub, latency)
+    if args.budget is not None and rate > args.budget:
+        print(f"Budget dépassé : {rate:.3f} req/s > {args.budget} req/s")
+        sys.exit(1)
@@ -0,0 +1,368 @@
+"""Cœur de calcul du compteur, sans aucune entrée/sortie réseau.
+
+Toutes les fonctions travaillent sur un « snapshot » de données (dict) fourni par l'appelant :
+
+    {
+        'date': date,                 # date du calcul
+        'timestamp': int,             # instant du calcul (unix, s)
+        'block_height': int,          # hauteur de bloc actuelle
+        'prices': {devise: float},    # prix actuel du BTC par devise ('eur' obligatoire)
+        'hash_rate_ths': float,       # hash rate actuel (TH/s)
+        'hashrate_history': (t, hr),  # historique du hash rate (unix s, TH/s)
+        'price_histories': {devise: [[ts_ms, prix], ...]},  # prix journaliers par devise
+        'block_rewards': BlockStore | None,     # registre exact subvention + frais (optionnel)
+    }
+
+numpy n'est importé qu'à l'appel des fonctions vectorisées, pour que le module reste
+importable en quelques millisecondes (fonctions serverless, workers de test).
+"""
+from datetime import date, datetime
+
+START_BLOCK = 499500  # Hauteur approximative au 1er janvier 2018
+START_TS_2018 = 1514764800  # 2018-01-01
+GENESIS_DATE = date(2009, 1, 3)
+
+# Nombre de points envoyés par série au graphique (indépendant de la longueur de l'historique)
+CHART_MAX_POINTS = 400
+
+# Courbe d'efficacité moyenne du parc mondial (année, J/TH), interpolée linéairement
+EFFICIENCY_CURVE = [
+    (2018.0, 100.0),
+    (2019.0, 85.0),
+    (2020.0, 60.0),
+    (2021.0, 50.0),
+    (2022.0, 40.0),
+    (2023.0, 33.0),
+    (2024.0, 27.0),
+    (2025.0, 23.0),
+    (2026.0, 20.0),
+]
+
+# Paramètres de simulation (miroir des constantes JS de la page)
+CURRENT_HASH_EH_S = 1000  # Hash global actuel (EH/s)
+BASE_FRENCH_HASH_EH_S = 55.6  # Pour 1 GW à 18 J/TH
+BLOCKS_PER_DAY = 144
+BLOCK_INTERVAL_S = 86400 // BLOCKS_PER_DAY  # Intervalle moyen entre blocs (600 s)
+DAYS_PER_YEAR = 365.25
+FEES_PER_BLOCK = 0.022
+
+# Fenêtre de l'estimation de la dérive récente du prix (extrapolation côté page)
+PRICE_DRIFT_WINDOW_DAYS = 30
+
+POWER_LAW_EXPONENT = 5.6
+
+# Devises proposées sur la page (code CoinGecko -> symbole affiché), l'euro en premier
+CURRENCY_SYMBOLS = {
+    'eur': '€',
+    'usd': '$',
+    'gbp': '£',
+    'chf': 'CHF',
+    'jpy': '¥',
+}
+
+
+def days_since_genesis(current_date=None):
+    """Calcule les jours depuis la genèse (03/01/2009)."""
+    if current_date is None:
+        current_date = date.today()
+    return (current_date - GENESIS_DATE).days
+
+
+def calculate_mined_btc(start_block, current_block):
+    """Calcule le total de BTC minés depuis le bloc de départ jusqu'au bloc actuel."""
+    total_btc = 0.0
+
+    # Période 1 : Blocs ~499500 à 630000 (récompense 12.5 BTC)
+    halving1_end = 630000
+    blocks1 = max(0, min(halving1_end, current_block) - max(start_block, 499500))
+    total_btc += blocks1 * 12.5
+
+    # Période 2 : Blocs 630000 à 840000 (récompense 6.25 BTC)
+    halving2_start = 630000
+    halving2_end = 840000
+    blocks2_start = max(start_block, halving2_start)
+    blocks2_end = min(halving2_end, current_block)
+    blocks2 = max(0, blocks2_end - blocks2_start)
+    total_btc += blocks2 * 6.25
+
+    # Période 3 : Blocs 840000 à maintenant (récompense 3.125 BTC)
+    halving3_start = 840000
+    blocks3_start = max(start_block, halving3_start)
+    blocks3_end = current_block
+    blocks3 = max(0, blocks3_end - blocks3_start)
+    total_btc += blocks3 * 3.125
+
+    return total_btc
+
+
+def merge_series(timestamps, values, new_timestamps, new_values):
+    """Fusionne deux séries temporelles, triées et dédupliquées (la nouvelle valeur l'emporte)."""
+    import numpy as np
+
+    all_ts = np.concatenate([new_timestamps, timestamps])
+    all_values = np.concatenate([new_values, values])
+    # np.unique garde la première occurrence : les nouvelles valeurs sont placées en tête
+    unique_ts, idx = np.unique(all_ts, return_index=True)
+    return unique_ts, all_values[idx]
+
+
+def network_efficiency_j_th(timestamps):
+    """Efficacité moyenne du réseau (J/TH) à chaque timestamp, d'après EFFICIENCY_CURVE."""
+    import numpy as np
+
+    years = 1970.0 + np.asarray(timestamps, dtype=np.float64) / (365.25 * 86400)
+    curve_years, curve_eff = zip(*EFFICIENCY_CURVE)
+    return np.interp(years, curve_years, curve_eff)
+
+
+def integrate_energy(timestamps, hash_rates, end_ts, share=1.0, start_ts=START_TS_2018):
+    """Intègre la puissance (hash rate × J/TH) sur [start_ts, end_ts] : TWh cumulés et MW moyens."""
+    import numpy as np
+
+    t = np.asarray(timestamps, dtype=np.float64)
+    # Bornes d'intégration interpolées pour ne pas dépendre de l'échantillonnage
+    inside = (t > start_ts) & (t < end_ts)
+    t = np.concatenate([[start_ts], t[inside], [end_ts]])
+    hr = np.interp(t, timestamps, hash_rates) if len(timestamps) else np.zeros_like(t)
+    power_w = hr * network_efficiency_j_th(t) * share
+    energy_j = float(np.sum((power_w[1:] + power_w[:-1]) * 0.5 * np.diff(t)))
+    duration_s = max(end_ts - start_ts, 1)
+    return {
+        'total_twh': energy_j / 3.6e15,
+        'average_mw': energy_j / duration_s / 1_000_000,
+    }
+
+
+def lttb_downsample(x, y, n_out):
+    """Indices retenus par Largest-Triangle-Three-Buckets (préserve pics et creux de la série).
+
+    Le premier et le dernier point sont conservés ; dans chaque bucket intermédiaire, on garde
+    le point formant le plus grand triangle avec le point précédemment retenu et la moyenne
+    du bucket suivant (calcul vectorisé au sein de chaque bucket).
+    """
+    import numpy as np
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[:-1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:-1], edges[:-1]) / counts
+    # Point d'ancrage de chaque bucket : moyenne du suivant (dernier point pour le dernier bucket)
+    anchor_x = np.append(avg_x[1:], x[-1])
+    anchor_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - anchor_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (anchor_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_downsample(x, y, n_out):
+    """Indices du minimum et du maximum de chaque bucket (entièrement vectorisé).
+
+    Le premier et le dernier point sont conservés, les buckets se partagent les points
+    intermédiaires : n_out indices croissants (n_out - 1 si n_out est impair).
+    """
+    import numpy as np
+
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    n_buckets = (n_out - 2) // 2
+    interior = n - 2  # Au moins 2 points par bucket : min et max sont deux indices distincts
+    bucket = (np.arange(interior) * n_buckets) // interior
+    # Tri par (bucket, y) : le premier élément d'un bucket est son min, le dernier son max
+    order = np.lexsort((y[1:-1], bucket))
+    starts = np.searchsorted(bucket[order], np.arange(n_buckets))
+    ends = np.append(starts[1:], interior) - 1
+    return np.concatenate([[0], np.sort(np.concatenate([order[starts], order[ends]])) + 1, [n - 1]])
+
+
+def downsample(x, y, n_out=CHART_MAX_POINTS, method='lttb'):
+    """Indices à conserver pour réduire une série à environ n_out points ('lttb' ou 'minmax')."""
+    if method == 'minmax':
+        return minmax_downsample(x, y, n_out)
+    return lttb_downsample(x, y, n_out)
+
+
+def historical_price_points(price_history, max_points=CHART_MAX_POINTS):
+    """Convertit les prix journaliers [[ts_ms, prix], ...] en points {'x': année, 'y': prix}, réduits par LTTB."""
+    import numpy as np
+
+    data = np.asarray(price_history, dtype=np.float64)
+    points = []
+    for ts_ms, p in data[downsample(data[:, 0], data[:, 1], max_points)].tolist():
+        dt = datetime.fromtimestamp(ts_ms / 1000).date()
+        fractional_year = dt.year + ((dt.timetuple().tm_yday - 1) / 365.25)
+        points.append({'x': fractional_year, 'y': p})
+    return points
+
+
+def power_law_matrix(current_date, prices, exponent=POWER_LAW_EXPONENT, years_ahead=5, max_points=CHART_MAX_POINTS):
+    """Courbes de loi de puissance de plusieurs devises en une seule opération matricielle.
+
+    Retourne (années, matrice devises × points, coefficients A par devise) : chaque ligne est
+    la courbe calibrée sur le prix actuel dans la devise correspondante.
+    """
+    import numpy as np
+
+    current_days = days_since_genesis(current_date)
+    A = np.asarray(prices, dtype=np.float64) / (current_days ** exponent)
+
+    n_points = min(max_points, (years_ahead * 365) + 1)
+    days = current_days + np.linspace(0, years_ahead * 365, n_points)
+    years = 2009 + (days / 365.25)
+    return years, A[:, None] * (days ** exponent)[None, :], A
+
+
+def price_drift_per_s(price_history, window_days=PRICE_DRIFT_WINDOW_DAYS):
+    """Dérive relative récente du prix (par seconde) : pente de la régression du log du prix
+    sur les window_days derniers jours de [[ts_ms, prix], ...] (0 sans historique exploitable)."""
+    import numpy as np
+
+    data = np.asarray(price_history, dtype=np.float64).reshape(-1, 2)
+    data = data[data[:, 1] > 0]
+    if len(data) < 2:
+        return 0.0
+    recent = data[data[:, 0] >= data[-1, 0] - window_days * 86_400_000]
+    if len(recent) < 2:
+        recent = data[-2:]
+    return float(np.polyfit(recent[:, 0] / 1000, np.log(recent[:, 1]), 1)[0])
+
+
+def calculate_opportunity_cost(snapshot, share=0.10):  # 10% de part hypothétique
+    """Calcule le coût d'opportunité, plus données pour graphique, à partir d'un snapshot."""
+    import numpy as np
+
+    start_block = START_BLOCK
+    current_block = snapshot['block_height']
+    prices = snapshot['prices']
+    price_eur = prices['eur']
+    current_date = snapshot['date']
+
+    # Subvention + frais exacts sur la plage couverte par le registre de blocs, subvention seule au-delà
+    store = snapshot.get('block_rewards')
+    if store is not None:
+        covered_start = max(start_block, store.base_height)
+        covered_end = max(covered_start, min(current_block, store.tip_height + 1))
+        exact = store.range_totals(covered_start, covered_end)
+        fees_btc = exact['fees_btc']
+        total_mined_btc = (calculate_mined_btc(start_block, current_block)
+                           - calculate_mined_btc(covered_start, covered_end) + exact['total_btc'])
+    else:
+        fees_btc = 0.0
+        total_mined_btc = calculate_mined_btc(start_block, current_block)
+    france_btc_past = total_mined_btc * share
+    value_eur_past = france_btc_past * price_eur
+    total_euros_past = int(value_eur_past)  # En euros complets
+
+    fetched_at = snapshot.get('fetched_at', {})
+
+    # Valorisation et courbes de loi de puissance de toutes les devises d'un coup (vecteur / matrice)
+    codes = [code for code in CURRENCY_SYMBOLS if code in prices]
+    price_vector = [prices[code] for code in codes]
+    values = france_btc_past * np.asarray(price_vector, dtype=np.float64)
+    years, power_matrix, A_vector = power_law_matrix(current_date, price_vector)
+    histories = snapshot.get('price_histories', {})
+    currencies = {}
+    for i, code in enumerate(codes):
+        history = histories.get(code)
+        currencies[code] = {
+            'symbol': CURRENCY_SYMBOLS[code],
+            'price': price_vector[i],
+            'total_value_past': int(values[i]),
+            'A': float(A_vector[i]),
+            'hist_points': historical_price_points(history) if history is not None and len(history) >= 2 else [],
+            'price_drift_per_s': price_drift_per_s(history) if history is not None else 0.0,
+            'power_points': [{'x': x, 'y': y} for x, y in zip(years.tolist(), power_matrix[i].tolist())],
+        }
+
+    initial_blocks = current_block - start_block
+
+    # Énergie du réseau intégrée depuis 2018 (historique du hash rate × courbe d'efficacité)
+    hr_timestamps, hr_values = snapshot['hashrate_history']
+    if len(hr_timestamps) < 2:
+        # Pas d'historique : hash rate actuel supposé constant sur la période
+        hr_timestamps = [START_TS_2018, snapshot['timestamp']]
+        hr_values = [snapshot['hash_rate_ths']] * 2
+    energy = integrate_energy(hr_timestamps, hr_values, snapshot['timestamp'])
+    total_mw = energy['average_mw']
+
+    return {
+        'france_btc_past': france_btc_past,
+        'total_euros_past': total_euros_past,
+        'price_eur': price_eur,
+        'share': share,
+        # Instants des données de hauteur et de prix (ancres de l'extrapolation côté page)
+        'height_timestamp': fetched_at.get('block_height') or snapshot['timestamp'],
+        'price_timestamp': fetched_at.get('prices') or snapshot['timestamp'],
+        'block_interval_s': BLOCK_INTERVAL_S,
+        'hist_points': currencies['eur']['hist_points'],
+        'initial_blocks': initial_blocks,
+        'start_block': start_block,
+        'initial_current_block': current_block,
+        'total_mined_btc': total_mined_btc,
+        'fees_btc': fees_btc,
+        'initial_total_mw': total_mw,
+        'total_twh': energy['total_twh'],
+        'power_points': currencies['eur']['power_points'],
+        'A': currencies['eur']['A'],
+        'exponent': POWER_LAW_EXPONENT,
+        'currencies': currencies,
+    }
+
+
+def get_average_reward(year):
+    """Récompense moyenne par bloc (subvention + frais) pour une année ; halving approx avril 2028."""
+    if year < 2028:
+        return 3.125 + FEES_PER_BLOCK
+    elif year < 2032:
+        if year == 2028:
+            # Moyenne 2028 : ~121 jours à 3.125, reste à 1.5625
+            full_reward_days = 121 / DAYS_PER_YEAR
+            return (3.125 * full_reward_days + 1.5625 * (1 - full_reward_days)) + FEES_PER_BLOCK
+        return 1.5625 + FEES_PER_BLOCK
+    return 0.78125 + FEES_PER_BLOCK  # Post-2032
+
+
+def days_from_genesis_mid_year(year):
+    """Jours entre la genèse et le 1er juillet de l'année donnée."""
+    return (date(year, 7, 1) - GENESIS_DATE).days
+
+
+def simulate_deployment(price_eur, gw=1.0, exponent=5.6, growth_pct=30, years=range(2026, 2033),
+                        calibration_year=2025):
+    """Simulation annuelle d'un déploiement de gw GW (miroir de updateSimulation côté JS)."""
+    annual_growth_rate = 1 + growth_pct / 100
+    french_hash_eh_s = BASE_FRENCH_HASH_EH_S * gw
+    A = price_eur / (days_from_genesis_mid_year(calibration_year) ** exponent)
+
+    rows = []
+    cumulative_revenue_eur = 0.0
+    for year in years:
+        year_price_eur = A * (days_from_genesis_mid_year(year) ** exponent)
+        hash_year = CURRENT_HASH_EH_S * annual_growth_rate ** (year - 2026)
+        hash_pct = (french_hash_eh_s / hash_year) * 100
+        total_btc_emitted_year = get_average_reward(year) * BLOCKS_PER_DAY * DAYS_PER_YEAR
+        btc_mined = (hash_pct / 100) * total_btc_emitted_year
+        revenue_eur = btc_mined * year_price_eur
+        cumulative_revenue_eur += revenue_eur
+        rows.append({
+            'year': year,
+            'price_eur': year_price_eur,
+            'hash_pct': hash_pct,
+            'btc_mined': btc_mined,
+            'revenue_eur': revenue_eur,
+            'cumulative_eur': cumulative_revenue_eur,
+        })
+    return rows
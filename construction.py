@@ -0,0 +1,381 @@
+"""Construction du répertoire de production dist/ (fichiers déployables minifiés et précompressés)."""
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import urllib.request
+
+try:
+    import brotli
+except ImportError:  # Optionnel : sans brotli, seules les variantes .gz sont produites
+    brotli = None
+
+# Chart.js épinglé, servi depuis le site (pas de dépendance à un CDN tiers au rendu)
+CHARTJS_VERSION = '4.4.1'
+CHARTJS_CDN_URL = f'https://cdn.jsdelivr.net/npm/chart.js@{CHARTJS_VERSION}/dist/chart.umd.min.js'
+CHARTJS_VENDOR_PATH = os.path.join('vendor', f'chart-{CHARTJS_VERSION}.umd.min.js')
+
+# Service Worker à la racine du site (sa portée couvre tout le site)
+SERVICE_WORKER_PATH = 'sw.js'
+
+# Seuls ces fichiers sont publiés (pas de source Python, README, .DS_Store, ...)
+DEPLOY_FILES = [
+    'index.html',
+    'index_alarmiste.html',
+    'CNAME',
+    os.path.join('assets', 'site.css'),
+    os.path.join('assets', 'simulation.js'),
+    CHARTJS_VENDOR_PATH,
+    SERVICE_WORKER_PATH,  # En dernier : sa version est calculée sur les fichiers déjà construits
+]
+DIST_DIR = 'dist'
+COMPRESSIBLE_EXTENSIONS = ('.html', '.css', '.js', '.svg', '.json')
+
+# Balises de bloc autour desquelles les espaces n'ont aucun effet sur le rendu
+BLOCK_TAGS = (
+    'html|head|body|meta|link|title|style|script|div|p|ul|ol|li|h[1-6]|table|thead|tbody|tfoot|tr|th|td|'
+    'select|option|canvas|br|button|svg|noscript'
+)
+
+# Coquille (HTML, CSS, Chart.js) servie depuis le cache sans aller-retour réseau ; réponses des API
+# servies depuis le cache puis revalidées en arrière-plan (stale-while-revalidate). Les pages
+# sont prévenues des données revalidées par un message {type: 'donnees-rafraichies', url, body}.
+SERVICE_WORKER_JS = """
+const CACHE_VERSION = 'dev';
+const SHELL_CACHE = `compteur-coquille-${CACHE_VERSION}`;
+const DATA_CACHE = 'compteur-donnees';
+const PRECACHE_URLS = __PRECACHE_URLS__;
+const API_HOSTS = ['blockstream.info', 'api.coingecko.com'];
+
+self.addEventListener('install', event => {
+    event.waitUntil(
+        caches.open(SHELL_CACHE).then(cache => cache.addAll(PRECACHE_URLS)).then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', event => {
+    // Supprime les coquilles des versions précédentes (le cache des données est conservé)
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(keys
+                .filter(key => key.startsWith('compteur-coquille-') && key !== SHELL_CACHE)
+                .map(key => caches.delete(key))))
+            .then(() => self.clients.claim())
+    );
+});
+
+async function notifyClients(url, response) {
+    const body = await response.text();
+    const clients = await self.clients.matchAll();
+    clients.forEach(client => client.postMessage({ type: 'donnees-rafraichies', url, body }));
+}
+
+async function staleWhileRevalidate(event) {
+    const cache = await caches.open(DATA_CACHE);
+    const cached = await cache.match(event.request);
+    const network = fetch(event.request).then(response => {
+        if (response.ok) {
+            cache.put(event.request, response.clone());
+            if (cached) notifyClients(event.request.url, response.clone());
+        }
+        return response;
+    });
+    if (cached) {
+        event.waitUntil(network.catch(() => undefined));
+        return cached;
+    }
+    return network;
+}
+
+async function cacheFirst(request) {
+    const cached = await caches.match(request, { ignoreSearch: true });
+    return cached || fetch(request);
+}
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+    const url = new URL(request.url);
+    if (API_HOSTS.includes(url.hostname)) {
+        event.respondWith(staleWhileRevalidate(event));
+    } else if (PRECACHE_URLS.some(path => new URL(path, self.location).href === url.href.split('?')[0])) {
+        event.respondWith(cacheFirst(request));
+    }
+    // Le reste (flux SSE /evenements, autres fichiers) passe directement par le réseau
+});
+"""
+
+IDENT_CHARS = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$\\')
+# Après ces caractères, un '/' commence une expression régulière (et non une division)
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^\n')
+
+
+def ensure_vendored_chartjs(path=CHARTJS_VENDOR_PATH, url=CHARTJS_CDN_URL):
+    """Télécharge une fois la version épinglée de Chart.js dans vendor/ ; retourne True si elle est disponible."""
+    if os.path.exists(path):
+        return True
+    try:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            data = response.read()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return True
+    except Exception as e:
+        print(f"Erreur lors du téléchargement de Chart.js {CHARTJS_VERSION} : {e}")
+        return False
+
+
+def content_hash(paths, length=12):
+    """Empreinte courte du contenu d'une liste de fichiers (les fichiers absents sont ignorés)."""
+    digest = hashlib.sha256()
+    for path in paths:
+        if os.path.exists(path):
+            digest.update(path.replace(os.sep, '/').encode('utf-8'))
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:length]
+
+
+def stamp_service_worker(source, version):
+    """Remplace la version du cache du Service Worker."""
+    # Tolère la forme minifiée (espaces supprimés autour du '=')
+    return re.sub(r"(const CACHE_VERSION\s*=\s*)'[^']*'", rf"\g<1>'{version}'", source, count=1)
+
+
+def render_service_worker(precache_urls, version):
+    """Code du Service Worker : coquille précachée sous la version donnée, API en stale-while-revalidate."""
+    source = SERVICE_WORKER_JS.replace('__PRECACHE_URLS__', json.dumps(precache_urls))
+    return stamp_service_worker(source, version)
+
+
+def minify_css(source):
+    """Minifie du CSS : commentaires supprimés, espaces superflus retirés."""
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    source = re.sub(r'\s+', ' ', source)
+    source = re.sub(r'\s*([{};,>])\s*', r'\1', source)
+    # Resserre les déclarations "propriété : valeur" (les ':' des sélecteurs ne sont pas touchés)
+    source = re.sub(r'([{;])\s*([\w-]+)\s*:\s*', r'\1\2:', source)
+    source = source.replace(';}', '}')
+    return source.strip()
+
+
+def _skip_string(source, i):
+    """Retourne l'index suivant la fin de la chaîne '...' ou "..." commençant en i."""
+    quote = source[i]
+    i += 1
+    while i < len(source) and source[i] != quote:
+        i += 2 if source[i] == '\\' else 1
+    return i + 1
+
+
+def _skip_template(source, i):
+    """Retourne l'index suivant la fin du littéral de gabarit `...` commençant en i (avec ${...} imbriqués)."""
+    i += 1
+    while i < len(source):
+        c = source[i]
+        if c == '\\':
+            i += 2
+        elif c == '`':
+            return i + 1
+        elif source.startswith('${', i):
+            i += 2
+            depth = 1
+            while i < len(source) and depth:
+                c = source[i]
+                if c in '\'"':
+                    i = _skip_string(source, i)
+                    continue
+                if c == '`':
+                    i = _skip_template(source, i)
+                    continue
+                depth += {'{': 1, '}': -1}.get(c, 0)
+                i += 1
+        else:
+            i += 1
+    return i
+
+
+def _skip_regex(source, i):
+    """Retourne l'index suivant la fin de l'expression régulière /.../flags commençant en i."""
+    i += 1
+    in_class = False
+    while i < len(source):
+        c = source[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            i += 1
+            break
+        i += 1
+    while i < len(source) and source[i].isalpha():
+        i += 1
+    return i
+
+
+def minify_js(source):
+    """Minifie du JavaScript de manière conservatrice.
+
+    Les commentaires sont supprimés et les espaces réduits, sans toucher au contenu des
+    chaînes, gabarits et expressions régulières. Les retours à la ligne significatifs sont
+    conservés pour ne pas dépendre de l'insertion automatique des points-virgules.
+    """
+    out = []
+    i, n = 0, len(source)
+
+    def last():
+        return out[-1][-1] if out else '\n'
+
+    while i < n:
+        c = source[i]
+        if c in '\'"':
+            end = _skip_string(source, i)
+            out.append(source[i:end])
+            i = end
+        elif c == '`':
+            end = _skip_template(source, i)
+            out.append(source[i:end])
+            i = end
+        elif source.startswith('//', i):
+            end = source.find('\n', i)
+            i = n if end == -1 else end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+        elif c == '/' and (last() in REGEX_PRECEDERS or re.search(r'\b(return|typeof)\s*$', ''.join(out[-8:]))):
+            end = _skip_regex(source, i)
+            out.append(source[i:end])
+            i = end
+        elif c.isspace():
+            j = i
+            while j < n and source[j].isspace():
+                j += 1
+            newline = '\n' in source[i:j]
+            i = j
+            # Les commentaires qui suivent un blanc sont traités au prochain tour de boucle
+            nxt = source[i] if i < n else '\n'
+            prev = last()
+            if newline:
+                if prev not in '\n{;,([' and nxt not in ')]}':
+                    out.append('\n')
+            elif prev in IDENT_CHARS and nxt in IDENT_CHARS:
+                out.append(' ')
+            elif prev in '+-' and nxt == prev:
+                out.append(' ')
+        else:
+            out.append(c)
+            i += 1
+    # Un retour à la ligne suivi d'un commentaire peut en précéder un autre : on les fusionne
+    return re.sub(r'\n\s*\n', '\n', ''.join(out)).strip()
+
+
+def minify_html(source):
+    """Minifie un document HTML, y compris ses blocs <style> et <script> en ligne."""
+    parts = []
+    pos = 0
+    for match in re.finditer(r'(<(style|script)\b[^>]*>)(.*?)(</\2>)', source, flags=re.S | re.I):
+        parts.append(_minify_markup(source[pos:match.start()]))
+        body = match.group(3)
+        body = minify_css(body) if match.group(2).lower() == 'style' else minify_js(body)
+        parts.append(match.group(1) + body + match.group(4))
+        pos = match.end()
+    parts.append(_minify_markup(source[pos:]))
+    return ''.join(parts).strip()
+
+
+def _minify_markup(markup):
+    """Supprime commentaires et espaces superflus du balisage HTML (hors <style>/<script>)."""
+    markup = re.sub(r'<!--(?!\[if).*?-->', '', markup, flags=re.S)
+    markup = re.sub(r'\s+', ' ', markup)
+    markup = re.sub(rf'\s*(</?(?:{BLOCK_TAGS})\b[^>]*>)\s*', r'\1', markup, flags=re.I)
+    return '' if markup.isspace() else markup
+
+
+def precompress(path):
+    """Écrit les variantes .gz (et .br si brotli est disponible) d'un fichier ; retourne leurs tailles."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    sizes = {}
+    # mtime=0 : sortie reproductible d'une construction à l'autre
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    with open(path + '.gz', 'wb') as f:
+        f.write(gz)
+    sizes['gz'] = len(gz)
+    if brotli is not None:
+        br = brotli.compress(data, quality=11)
+        with open(path + '.br', 'wb') as f:
+            f.write(br)
+        sizes['br'] = len(br)
+    return sizes
+
+
+def minify_file(name, content):
+    """Minifie le contenu d'un fichier selon son extension."""
+    if name.endswith('.html'):
+        return minify_html(content)
+    if name.endswith('.css'):
+        return minify_css(content)
+    if name.endswith('.js') and not name.endswith('.min.js'):
+        return minify_js(content)
+    return content
+
+
+def build_dist(src_dir='.', dist_dir=DIST_DIR, files=DEPLOY_FILES):
+    """Construit dist/ à partir des fichiers déployables ; retourne le rapport de tailles."""
+    if os.path.isdir(dist_dir):
+        shutil.rmtree(dist_dir)
+    os.makedirs(dist_dir)
+    report = []
+    for name in files:
+        src = os.path.join(src_dir, name)
+        if not os.path.exists(src):
+            print(f"Fichier ignoré (absent) : {name}")
+            continue
+        dst = os.path.join(dist_dir, name)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        raw_size = os.path.getsize(src)
+        if name.endswith(COMPRESSIBLE_EXTENSIONS):
+            with open(src, encoding='utf-8') as f:
+                content = minify_file(name, f.read())
+            if name == SERVICE_WORKER_PATH:
+                # Nouvelle version de cache dès que l'un des fichiers construits change
+                built = [os.path.join(dist_dir, row['file']) for row in report]
+                content = stamp_service_worker(content, content_hash(built))
+            with open(dst, 'w', encoding='utf-8') as f:
+                f.write(content)
+            sizes = precompress(dst)
+        else:
+            shutil.copyfile(src, dst)
+            sizes = {}
+        report.append({
+            'file': name,
+            'raw': raw_size,
+            'min': os.path.getsize(dst),
+            'gz': sizes.get('gz'),
+            'br': sizes.get('br'),
+        })
+    return report
+
+
+def print_size_report(report):
+    """Affiche la taille de chaque fichier : source, minifié, gzip et brotli."""
+    def fmt(size):
+        return '-' if size is None else f"{size / 1024:.1f} Ko"
+
+    print(f"{'Fichier':<24}{'Source':>12}{'Minifié':>12}{'gzip':>12}{'brotli':>12}")
+    for row in report:
+        print(f"{row['file']:<24}{fmt(row['raw']):>12}{fmt(row['min']):>12}{fmt(row['gz']):>12}{fmt(row['br']):>12}")
+    if brotli is None:
+        print("Module brotli absent : variantes .br non générées (pip install brotli)")
+
+
+if __name__ == "__main__":
+    ensure_vendored_chartjs()
+    print_size_report(build_dist())
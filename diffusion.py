@@ -0,0 +1,210 @@
+"""Mode serveur : pages statiques + diffusion des nouveaux blocs par Server-Sent Events (SSE).
+
+Un seul veilleur interroge la hauteur de bloc (API Esplora) et, à chaque nouveau bloc, le hash
+rate ; le prix est rafraîchi périodiquement. Chaque changement est poussé à toutes les pages
+ouvertes sous forme d'un événement « delta » ne contenant que les champs modifiés :
+
+    {'h': hauteur, 'p': {devise: prix}, 'mw': puissance moyenne du réseau depuis 2018 (MW)}
+
+Quel que soit le nombre d'onglets ouverts, les API amont ne voient qu'un seul client.
+
+Seul le répertoire de production (dist/ par défaut) est servi, jamais la racine du dépôt
+(sources, data/, .git/), et seulement sur l'interface locale sauf --hote explicite.
+
+Usage :
+    python diffusion.py [--port 8000] [--hote 127.0.0.1] [--esplora URL] [--dossier dist]
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from calculs import integrate_energy, merge_series
+from construction import DIST_DIR
+from fournisseurs import REGISTRY, cross_check, hedged_fetch, save_latencies
+from sources import ESPLORA_URL, fetch_block_height, load_hashrate_history
+
+EVENTS_PATH = '/evenements'
+DEFAULT_HOST = '127.0.0.1'  # Interface locale : exposer le serveur est un choix explicite
+TIP_POLL_S = 10  # Interrogation de la hauteur de bloc
+PRICE_REFRESH_S = 60  # Rafraîchissement du prix
+SANITY_CHECK_S = 3600  # Vérification croisée des fournisseurs (relègue les aberrants)
+HEARTBEAT_S = 15  # Commentaire SSE envoyé aux clients inactifs (garde la connexion ouverte)
+RETRY_MS = 10000  # Délai de reconnexion suggéré au navigateur
+CLIENT_QUEUE_SIZE = 16  # Événements en attente par client avant déconnexion d'un client trop lent
+
+
+def format_event(event_id, data):
+    """Sérialise un événement SSE « delta » (JSON compact)."""
+    payload = json.dumps(data, separators=(",", ":"))
+    return f"id: {event_id}\nevent: delta\ndata: {payload}\n\n".encode("utf-8")
+
+
+class Broadcaster:
+    """Diffuse les deltas à tous les abonnés et conserve l'état complet pour les nouveaux venus."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self.state = {}
+        self.event_id = 0
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def subscribe(self):
+        """Inscrit un client ; retourne sa file d'événements et l'état courant (id, valeurs)."""
+        q = queue.Queue(CLIENT_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add(q)
+            return q, (self.event_id, dict(self.state))
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def publish(self, values):
+        """Met à jour l'état et diffuse les seuls champs modifiés ; retourne le delta (vide si rien n'a changé)."""
+        with self._lock:
+            delta = {key: value for key, value in values.items() if self.state.get(key) != value}
+            if not delta:
+                return {}
+            self.state.update(delta)
+            self.event_id += 1
+            message = format_event(self.event_id, delta)
+            for q in list(self._subscribers):
+                try:
+                    q.put_nowait(message)
+                except queue.Full:
+                    # Client trop lent : on le déconnecte, le navigateur se reconnecte et reçoit l'état complet
+                    self._subscribers.discard(q)
+                    q.get_nowait()
+                    q.put_nowait(None)
+            return delta
+
+
+def check_providers():
+    """Vérification croisée de toutes les mesures (en arrière-plan : ne retarde pas le veilleur).
+
+    Les latences mesurées depuis le démarrage sont enregistrées au passage.
+    """
+    for metric in REGISTRY:
+        cross_check(metric)
+    save_latencies()
+
+
+def watch(broadcaster, esplora_url=ESPLORA_URL, stop=None, poll_s=TIP_POLL_S, price_refresh_s=PRICE_REFRESH_S):
+    """Boucle du veilleur unique : hauteur à chaque tour, hash rate à chaque nouveau bloc, prix périodiquement.
+
+    La hauteur est interrogée sur une seule API Esplora (appel fréquent et léger) ; prix et hash
+    rate passent par les fournisseurs redondants de fournisseurs.py.
+    """
+    if stop is None:
+        stop = threading.Event()
+    hr_timestamps, hr_values = load_hashrate_history()
+    height = None
+    price_fetched_at = None
+    checked_at = time.monotonic()
+    while not stop.is_set():
+        if time.monotonic() - checked_at >= SANITY_CHECK_S:
+            threading.Thread(target=check_providers, name="verification", daemon=True).start()
+            checked_at = time.monotonic()
+        values = {}
+        try:
+            new_height = fetch_block_height(esplora_url)
+            if new_height != height:
+                height = values['h'] = new_height
+                try:
+                    now = int(time.time())
+                    hr_timestamps, hr_values = merge_series(hr_timestamps, hr_values, [now], [hedged_fetch('hash_rate_ths')])
+                    values['mw'] = round(integrate_energy(hr_timestamps, hr_values, now)['average_mw'], 1)
+                except Exception as e:
+                    print(f"Erreur lors de la récupération du hash rate : {e}")
+        except Exception as e:
+            print(f"Erreur lors de la récupération de la hauteur de bloc : {e}")
+        if price_fetched_at is None or time.monotonic() - price_fetched_at >= price_refresh_s:
+            try:
+                values['p'] = hedged_fetch('prices')
+                price_fetched_at = time.monotonic()
+            except Exception as e:
+                print(f"Erreur lors de la récupération du prix : {e}")
+        broadcaster.publish(values)
+        stop.wait(poll_s)
+
+
+class EventHandler(SimpleHTTPRequestHandler):
+    """Sert les fichiers du site, plus le flux SSE sur EVENTS_PATH."""
+
+    def __init__(self, *args, broadcaster, **kwargs):
+        # Attribut posé avant l'appel parent, qui traite la requête immédiatement
+        self.broadcaster = broadcaster
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] == EVENTS_PATH:
+            self.stream_events()
+        else:
+            super().do_GET()
+
+    def stream_events(self):
+        q, (event_id, state) = self.broadcaster.subscribe()
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('X-Accel-Buffering', 'no')  # Pas de mise en tampon derrière un proxy nginx
+            self.end_headers()
+            self.wfile.write(f"retry: {RETRY_MS}\n\n".encode("utf-8"))
+            if state:
+                self.wfile.write(format_event(event_id, state))
+            self.wfile.flush()
+            while True:
+                try:
+                    message = q.get(timeout=HEARTBEAT_S)
+                except queue.Empty:
+                    message = b": ping\n\n"
+                if message is None:
+                    break
+                self.wfile.write(message)
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Onglet fermé
+        finally:
+            self.broadcaster.unsubscribe(q)
+
+
+def create_server(directory=DIST_DIR, port=8000, esplora_url=ESPLORA_URL, host=DEFAULT_HOST, poll_s=TIP_POLL_S,
+                  price_refresh_s=PRICE_REFRESH_S):
+    """Crée le serveur HTTP et démarre le veilleur ; retourne (serveur, diffuseur, événement d'arrêt)."""
+    broadcaster = Broadcaster()
+    stop = threading.Event()
+    threading.Thread(target=watch, args=(broadcaster, esplora_url, stop, poll_s, price_refresh_s),
+                     name="veilleur", daemon=True).start()
+    server = ThreadingHTTPServer((host, port), partial(EventHandler, directory=directory, broadcaster=broadcaster))
+    return server, broadcaster, stop
+
+
+def serve(directory=DIST_DIR, port=8000, esplora_url=ESPLORA_URL, host=DEFAULT_HOST):
+    """Sert le site et les événements jusqu'à interruption (Ctrl+C)."""
+    server, _, stop = create_server(directory, port, esplora_url, host)
+    print(f"Serveur sur http://{host or '0.0.0.0'}:{port}/ (répertoire {directory}, événements SSE : {EVENTS_PATH})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sert le compteur et pousse les nouveaux blocs par SSE.")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--hote", default=DEFAULT_HOST, help="interface d'écoute ('' : toutes les interfaces)")
+    parser.add_argument("--esplora", default=ESPLORA_URL, help="URL de l'API Esplora (ex. instance locale)")
+    parser.add_argument("--dossier", default=DIST_DIR, help="répertoire des fichiers servis (construit par construction.py)")
+    args = parser.parse_args()
+    serve(args.dossier, args.port, args.esplora, args.hote)
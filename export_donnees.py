@@ -0,0 +1,193 @@
+"""Export colonnaire des séries et scalaires calculés lors d'une génération de la page.
+
+Les outils d'analyse chargent les données d'une construction sans analyser le HTML : chaque
+table est écrite dans EXPORT_DIR au format Parquet si pyarrow est installé, en CSV sinon, et
+décrite (colonnes, types, nombre de lignes) dans schema.json. Les séries longues sont écrites
+par tranches de EXPORT_CHUNK_ROWS lignes, sans être matérialisées en entier.
+
+Tables :
+    scalaires           une ligne : totaux, part, hauteurs, énergie, exposant de la loi de puissance
+    devises             une ligne par devise : prix, valeur manquée, constante A, dérive du prix
+    points_historiques  points du graphique des prix (réduits par LTTB), par devise
+    loi_puissance       courbe de loi de puissance, par devise
+    prix_journaliers    historique complet des prix journaliers, par devise
+    energie             hash rate, efficacité, MW du réseau et de la France, BTC cumulés estimés
+    simulation          projection annuelle d'un déploiement de 1 GW (simulate_deployment)
+"""
+import csv
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+from calculs import START_BLOCK, START_TS_2018, network_efficiency_j_th, simulate_deployment
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optionnel : sans pyarrow, les tables sont écrites en CSV
+    pa = None
+
+EXPORT_DIR = 'export'
+EXPORT_CHUNK_ROWS = 65_536
+SCHEMA_FILE = 'schema.json'
+
+# Périodes de récompense de calculate_mined_btc (début, fin, BTC par bloc), pour la version vectorisée
+REWARD_ERAS = [(START_BLOCK, 630_000, 12.5), (630_000, 840_000, 6.25), (840_000, np.inf, 3.125)]
+
+SCALAR_KEYS = [
+    ('france_btc_past', 'float64'),
+    ('total_euros_past', 'int64'),
+    ('price_eur', 'float64'),
+    ('share', 'float64'),
+    ('start_block', 'int64'),
+    ('initial_current_block', 'int64'),
+    ('initial_blocks', 'int64'),
+    ('total_mined_btc', 'float64'),
+    ('fees_btc', 'float64'),
+    ('initial_total_mw', 'float64'),
+    ('total_twh', 'float64'),
+    ('exponent', 'float64'),
+    ('A', 'float64'),
+    ('height_timestamp', 'int64'),
+    ('price_timestamp', 'int64'),
+    ('block_interval_s', 'int64'),
+]
+
+
+def mined_btc_series(heights):
+    """BTC minés depuis START_BLOCK jusqu'à chaque hauteur (calculate_mined_btc vectorisé)."""
+    heights = np.asarray(heights, dtype=np.float64)
+    return sum(reward * (np.clip(heights, start, end) - start) for start, end, reward in REWARD_ERAS)
+
+
+def _chunks(columns, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Découpe des colonnes de même longueur en tranches de chunk_rows lignes."""
+    length = len(next(iter(columns.values())))
+    for start in range(0, length, chunk_rows):
+        yield {name: values[start:start + chunk_rows] for name, values in columns.items()}
+
+
+def _points_by_currency(result, key):
+    """Points {'x', 'y'} de chaque devise, une tranche par devise."""
+    for code, currency in result['currencies'].items():
+        points = currency[key]
+        yield {
+            'currency': [code] * len(points),
+            'year': [p['x'] for p in points],
+            'price': [p['y'] for p in points],
+        }
+
+
+def _daily_prices(snapshot):
+    """Historique complet des prix de chaque devise, par tranches."""
+    for code, history in snapshot.get('price_histories', {}).items():
+        data = np.asarray(history, dtype=np.float64).reshape(-1, 2)
+        for chunk in _chunks({'t_ms': data[:, 0].astype(np.int64), 'price': data[:, 1]}):
+            yield {'currency': [code] * len(chunk['t_ms']), **chunk}
+
+
+def _energy(snapshot, result):
+    """Puissance du réseau et de la part française à chaque point de l'historique du hash rate.
+
+    La hauteur est estimée par interpolation linéaire entre (2018, START_BLOCK) et la hauteur
+    actuelle ; les BTC cumulés de la France en découlent (mined_btc_series × part).
+    """
+    timestamps, hash_rates = snapshot['hashrate_history']
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    hash_rates = np.asarray(hash_rates, dtype=np.float64)
+    for chunk in _chunks({'t': timestamps, 'hash_rate_ths': hash_rates}):
+        network_mw = chunk['hash_rate_ths'] * network_efficiency_j_th(chunk['t']) / 1e6
+        heights = np.interp(chunk['t'], [START_TS_2018, snapshot['timestamp']],
+                            [START_BLOCK, result['initial_current_block']]).astype(np.int64)
+        mined = mined_btc_series(heights)
+        yield {
+            **chunk,
+            'efficiency_j_th': network_efficiency_j_th(chunk['t']),
+            'network_mw': network_mw,
+            'france_mw': network_mw * result['share'],
+            'estimated_height': heights,
+            'france_btc_cumulative': mined * result['share'],
+        }
+
+
+def export_tables(snapshot, result):
+    """Tables à exporter : (nom, schéma [(colonne, type)], générateur de tranches {colonne: valeurs})."""
+    currencies = result['currencies']
+    simulation = simulate_deployment(result['price_eur'])
+    return [
+        ('scalaires', SCALAR_KEYS, iter([{key: [result[key]] for key, _ in SCALAR_KEYS}])),
+        ('devises', [('currency', 'string'), ('symbol', 'string'), ('price', 'float64'),
+                     ('total_value_past', 'int64'), ('A', 'float64'), ('price_drift_per_s', 'float64')],
+         iter([{
+             'currency': list(currencies),
+             'symbol': [c['symbol'] for c in currencies.values()],
+             'price': [c['price'] for c in currencies.values()],
+             'total_value_past': [c['total_value_past'] for c in currencies.values()],
+             'A': [c['A'] for c in currencies.values()],
+             'price_drift_per_s': [c['price_drift_per_s'] for c in currencies.values()],
+         }])),
+        ('points_historiques', [('currency', 'string'), ('year', 'float64'), ('price', 'float64')],
+         _points_by_currency(result, 'hist_points')),
+        ('loi_puissance', [('currency', 'string'), ('year', 'float64'), ('price', 'float64')],
+         _points_by_currency(result, 'power_points')),
+        ('prix_journaliers', [('currency', 'string'), ('t_ms', 'int64'), ('price', 'float64')],
+         _daily_prices(snapshot)),
+        ('energie', [('t', 'int64'), ('hash_rate_ths', 'float64'), ('efficiency_j_th', 'float64'),
+                     ('network_mw', 'float64'), ('france_mw', 'float64'), ('estimated_height', 'int64'),
+                     ('france_btc_cumulative', 'float64')],
+         _energy(snapshot, result)),
+        ('simulation', [(key, 'int64' if key == 'year' else 'float64') for key in simulation[0]],
+         iter([{key: [row[key] for row in simulation] for key in simulation[0]}])),
+    ]
+
+
+def write_parquet(path, schema, chunks):
+    """Écrit les tranches dans un fichier Parquet, un groupe de lignes par tranche ; retourne le nombre de lignes."""
+    arrow_schema = pa.schema([(name, pa.string() if kind == 'string' else getattr(pa, kind)()) for name, kind in schema])
+    rows = 0
+    with pq.ParquetWriter(path, arrow_schema) as writer:
+        for chunk in chunks:
+            writer.write_batch(pa.record_batch([pa.array(np.asarray(chunk[name]).tolist() if kind == 'string'
+                                                         else np.asarray(chunk[name], dtype=kind))
+                                                for name, kind in schema], schema=arrow_schema))
+            rows += len(chunk[schema[0][0]])
+    return rows
+
+
+def write_csv(path, schema, chunks):
+    """Écrit les tranches dans un fichier CSV avec en-tête ; retourne le nombre de lignes."""
+    names = [name for name, _ in schema]
+    rows = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(names)
+        for chunk in chunks:
+            columns = [np.asarray(chunk[name]).tolist() for name in names]
+            writer.writerows(zip(*columns))
+            rows += len(columns[0])
+    return rows
+
+
+def export_build(snapshot, result, directory=EXPORT_DIR):
+    """Écrit toutes les tables et leur schéma dans directory ; retourne le contenu de schema.json."""
+    os.makedirs(directory, exist_ok=True)
+    fmt = 'parquet' if pa is not None else 'csv'
+    manifest = {
+        'format': fmt,
+        'generated_at': datetime.fromtimestamp(snapshot['timestamp'], tz=timezone.utc).isoformat(),
+        'tables': {},
+    }
+    for name, schema, chunks in export_tables(snapshot, result):
+        filename = f"{name}.{fmt}"
+        write = write_parquet if fmt == 'parquet' else write_csv
+        rows = write(os.path.join(directory, filename), schema, chunks)
+        manifest['tables'][name] = {
+            'file': filename,
+            'rows': rows,
+            'columns': [{'name': column, 'type': kind} for column, kind in schema],
+        }
+    with open(os.path.join(directory, SCHEMA_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
@@ -0,0 +1,313 @@
+"""Registre de fournisseurs redondants par mesure et requêtes couvertes (« hedged requests »).
+
+Chaque mesure (hauteur de bloc, prix, hash rate) a plusieurs fournisseurs interchangeables,
+par ordre de préférence. hedged_fetch() interroge le premier ; s'il n'a pas donné de réponse
+valide dans son délai de couverture (p95 de ses latences récentes), le suivant est interrogé
+en parallèle, et la première réponse valide l'emporte : un fournisseur lent ne fixe plus la
+latence de toute la construction. confirmed_fetch() (construction de la page) exige en plus
+qu'un second fournisseur confirme la valeur, et signale celles qui ne l'ont pas été. Chaque
+mesure a trois fournisseurs : un fournisseur lent est couvert sans bloquer la confirmation.
+
+Les latences sont enregistrées dans data/latences_fournisseurs.json (save_latencies) et
+rechargées au démarrage : les délais de couverture s'apprennent d'une construction à l'autre.
+
+cross_check() interroge tous les fournisseurs, calcule une valeur de consensus (médiane) et
+relègue en fin de liste ceux qui s'en écartent au-delà de SANITY_TOLERANCE.
+
+Les fonctions de récupération lisent les URL de base de sources.py à chaque appel : des
+serveurs locaux peuvent remplacer les API (voir banc_charge.py).
+
+Usage :
+    python fournisseurs.py   # vérification croisée de toutes les mesures
+"""
+import json
+import os
+import queue
+import statistics
+import threading
+import time
+from collections import deque
+
+from sources import (HTTP_TIMEOUT_S, fetch_block_height, fetch_block_height_blockchain_info,
+                     fetch_block_height_mempool, fetch_hash_rate_difficulty, fetch_hash_rate_mempool,
+                     fetch_hash_rate_ths, fetch_prices, fetch_prices_blockchain_info, fetch_prices_kraken)
+
+HEDGE_PERCENTILE = 95
+DEFAULT_HEDGE_DELAY_S = 1.0  # Tant qu'un fournisseur n'a pas MIN_SAMPLES mesures
+MIN_HEDGE_DELAY_S = 0.05
+MIN_SAMPLES = 5
+LATENCY_WINDOW = 50  # Latences conservées par fournisseur
+LATENCIES_PATH = os.path.join("data", "latences_fournisseurs.json")
+
+# Écart maximal admis à la médiane des fournisseurs : ('abs', blocs) ou ('rel', fraction)
+SANITY_TOLERANCE = {
+    'block_height': ('abs', 3),
+    'prices': ('rel', 0.03),
+    'hash_rate_ths': ('rel', 0.5),  # Estimations calculées sur des fenêtres différentes
+}
+
+
+class Provider:
+    """Fournisseur d'une mesure : fonction de récupération et latences de ses réponses réussies."""
+
+    def __init__(self, name, fetch):
+        self.name = name
+        self.fetch = fetch
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"Provider({self.name!r})"
+
+    def call(self):
+        """Appelle le fournisseur et enregistre la latence en cas de succès."""
+        started = time.monotonic()
+        value = self.fetch()
+        with self._lock:
+            self.latencies.append(time.monotonic() - started)
+        return value
+
+    def samples(self):
+        """Copie des latences récentes (s)."""
+        with self._lock:
+            return list(self.latencies)
+
+    def hedge_delay(self):
+        """Délai avant de couvrir ce fournisseur : p95 de ses latences récentes."""
+        samples = sorted(self.samples())
+        if len(samples) < MIN_SAMPLES:
+            return DEFAULT_HEDGE_DELAY_S
+        index = min(len(samples) - 1, len(samples) * HEDGE_PERCENTILE // 100)
+        return max(MIN_HEDGE_DELAY_S, samples[index])
+
+
+def default_registry():
+    """Fournisseurs par mesure, du préféré au dernier recours."""
+    return {
+        'block_height': [
+            Provider('blockstream', fetch_block_height),
+            Provider('mempool.space', fetch_block_height_mempool),
+            Provider('blockchain.com', fetch_block_height_blockchain_info),
+        ],
+        'prices': [
+            Provider('coingecko', fetch_prices),
+            Provider('blockchain.com', fetch_prices_blockchain_info),
+            Provider('kraken', fetch_prices_kraken),
+        ],
+        'hash_rate_ths': [
+            Provider('blockchain.info', fetch_hash_rate_ths),
+            Provider('mempool.space', fetch_hash_rate_mempool),
+            Provider('blockstream', fetch_hash_rate_difficulty),
+        ],
+    }
+
+
+def load_latencies(registry, path=LATENCIES_PATH):
+    """Recharge dans le registre les latences enregistrées par les exécutions précédentes."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return registry
+    for metric, providers in registry.items():
+        for provider in providers:
+            provider.latencies.extend(saved.get(metric, {}).get(provider.name, []))
+    return registry
+
+
+def save_latencies(registry=None, path=LATENCIES_PATH):
+    """Enregistre les latences récentes de chaque fournisseur (écriture atomique)."""
+    if registry is None:
+        with _registry_lock:
+            registry = {metric: list(providers) for metric, providers in REGISTRY.items()}
+    data = {metric: {p.name: [round(s, 4) for s in p.samples()] for p in providers}
+            for metric, providers in registry.items()}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+REGISTRY = load_latencies(default_registry())
+_registry_lock = threading.Lock()
+
+
+def _demote(metric, names):
+    """Relègue en fin de liste du registre les fournisseurs nommés (tri stable : ordre conservé sinon)."""
+    if names:
+        with _registry_lock:
+            REGISTRY[metric].sort(key=lambda p: p.name in names)
+
+
+def validate(metric, value):
+    """Lève ValueError si la réponse n'est pas plausible pour la mesure."""
+    if metric == 'prices':
+        if not isinstance(value, dict) or not value.get('eur') or any(p <= 0 for p in value.values()):
+            raise ValueError(f"Prix invalides : {value!r}")
+    elif not value or value <= 0:
+        raise ValueError(f"Valeur invalide pour {metric} : {value!r}")
+    return value
+
+
+def _confirmed(metric, answers, quorum):
+    """Première réponse reçue qui concorde avec au moins quorum réponses (elle comprise), sinon None."""
+    for _, value in answers:
+        if sum(agree(metric, other, value) for _, other in answers) >= quorum:
+            return value
+    return None
+
+
+def _hedged(metric, providers, deadline, quorum):
+    """Requête couverte commune à hedged_fetch et confirmed_fetch ; retourne (valeur, confirmée)."""
+    use_registry = providers is None
+    if use_registry:
+        with _registry_lock:
+            providers = list(REGISTRY[metric])
+    remaining = list(providers)
+    results = queue.Queue()
+    errors = []
+    answers = []  # (fournisseur, valeur) valides, par ordre d'arrivée
+    pending = 0
+
+    def run(provider):
+        try:
+            results.put((provider, validate(metric, provider.call()), None))
+        except Exception as e:
+            results.put((provider, None, e))
+
+    def launch():
+        nonlocal pending
+        provider = remaining.pop(0)
+        threading.Thread(target=run, args=(provider,), name=f"{metric}-{provider.name}", daemon=True).start()
+        pending += 1
+        return provider.hedge_delay()
+
+    deadline_at = time.monotonic() + deadline
+    hedge_at = time.monotonic() + launch()
+    while pending or remaining:
+        now = time.monotonic()
+        if now >= deadline_at:
+            break
+        if remaining and (not pending or now >= hedge_at):
+            # Couverture : le fournisseur en cours est lent (ou a échoué), on lance le suivant
+            hedge_at = now + launch()
+            continue
+        timeout = deadline_at - now
+        if remaining:
+            timeout = min(timeout, hedge_at - now)
+        try:
+            provider, value, error = results.get(timeout=timeout)
+        except queue.Empty:
+            continue
+        pending -= 1
+        if error is not None:
+            errors.append(f"{provider.name} : {error}")
+            continue
+        answers.append((provider, value))
+        confirmed = _confirmed(metric, answers, quorum)
+        if confirmed is not None:
+            if use_registry:
+                _demote(metric, [p.name for p, v in answers if not agree(metric, v, confirmed)])
+            return confirmed, True
+        hedge_at = time.monotonic()  # Réponse non confirmée : le suivant est lancé sans attendre
+    if len(answers) == 1:
+        provider, value = answers[0]
+        print(f"Réponse {metric} de {provider.name} non confirmée : aucun autre fournisseur n'a répondu à temps")
+        return value, False
+    if answers:
+        errors.append("réponses discordantes : " + ", ".join(f"{p.name} {v}" for p, v in answers))
+    raise RuntimeError(f"Aucune réponse valide pour {metric} ({'; '.join(errors) or 'délai dépassé'})")
+
+
+def hedged_fetch(metric, providers=None, deadline=HTTP_TIMEOUT_S):
+    """Première réponse valide parmi les fournisseurs de la mesure, avec couverture au p95.
+
+    Le suivant est lancé dès que le précédent échoue ou dépasse son délai de couverture ; les
+    requêtes perdantes se terminent en arrière-plan. Lève RuntimeError si aucune réponse
+    valide n'arrive avant `deadline` secondes.
+    """
+    return _hedged(metric, providers, deadline, quorum=1)[0]
+
+
+def confirmed_fetch(metric, providers=None, deadline=HTTP_TIMEOUT_S):
+    """Comme hedged_fetch, mais la réponse doit être confirmée par un second fournisseur ; retourne (valeur, confirmée).
+
+    Une réponse valide restée seule fait lancer aussitôt le suivant ; la valeur retenue
+    concorde avec une autre réponse (à SANITY_TOLERANCE près) et, avec le registre par défaut,
+    les fournisseurs contredits sont relégués. Si une seule réponse valide est arrivée à
+    l'échéance, elle est retournée avec confirmée=False : l'appelant la signale. Lève
+    RuntimeError sans réponse valide ou si les réponses sont toutes discordantes.
+    """
+    return _hedged(metric, providers, deadline, quorum=2)
+
+
+def consensus(metric, values):
+    """Valeur médiane des réponses (devise par devise pour les prix)."""
+    if metric == 'prices':
+        currencies = {code for prices in values for code in prices}
+        return {code: statistics.median(p[code] for p in values if code in p) for code in sorted(currencies)}
+    return statistics.median(values)
+
+
+def agree(metric, value, reference):
+    """True si value est à moins de SANITY_TOLERANCE de la référence."""
+    kind, tolerance = SANITY_TOLERANCE[metric]
+    pairs = ([(value[c], reference[c]) for c in value if c in reference] if metric == 'prices'
+             else [(value, reference)])
+    if kind == 'abs':
+        return all(abs(a - b) <= tolerance for a, b in pairs)
+    return all(abs(a - b) <= tolerance * abs(b) for a, b in pairs)
+
+
+def cross_check(metric, providers=None, timeout=HTTP_TIMEOUT_S):
+    """Interroge tous les fournisseurs en parallèle et compare leurs réponses à la médiane.
+
+    Retourne {'values': {nom: valeur}, 'consensus': valeur, 'outliers': [noms]}. Avec le
+    registre par défaut, les fournisseurs aberrants sont relégués en fin de liste, de sorte
+    que hedged_fetch() ne les interroge plus en premier.
+    """
+    use_registry = providers is None
+    if use_registry:
+        with _registry_lock:
+            providers = list(REGISTRY[metric])
+    values = {}
+    lock = threading.Lock()
+
+    def run(provider):
+        try:
+            value = validate(metric, provider.call())
+        except Exception as e:
+            print(f"Vérification {metric} : {provider.name} en échec ({e})")
+            return
+        with lock:
+            values[provider.name] = value
+
+    threads = [threading.Thread(target=run, args=(p,), daemon=True) for p in providers]
+    for thread in threads:
+        thread.start()
+    deadline_at = time.monotonic() + timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline_at - time.monotonic()))
+    with lock:
+        values = dict(values)
+    if not values:
+        return {'values': {}, 'consensus': None, 'outliers': []}
+
+    reference = consensus(metric, list(values.values()))
+    outliers = [name for name, value in values.items() if not agree(metric, value, reference)]
+    for name in outliers:
+        print(f"Vérification {metric} : {name} s'écarte du consensus ({values[name]} vs {reference})")
+    if use_registry:
+        _demote(metric, outliers)
+    return {'values': values, 'consensus': reference, 'outliers': outliers}
+
+
+if __name__ == "__main__":
+    for metric, providers in REGISTRY.items():
+        report = cross_check(metric)
+        print(f"{metric} : consensus {report['consensus']}")
+        for provider in providers:
+            status = "aberrant" if provider.name in report['outliers'] else "ok"
+            value = report['values'].get(provider.name, "sans réponse")
+            print(f"    {provider.name:<16}{status:<10}{value}  (couverture après {provider.hedge_delay():.2f} s)")
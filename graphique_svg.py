@@ -0,0 +1,92 @@
+"""Rendu côté serveur des graphiques en SVG (affichage immédiat, sans JavaScript)."""
+import math
+from html import escape
+
+import numpy as np
+
+GRID_COLOR = 'rgba(255,255,255,0.1)'
+TEXT_COLOR = '#fff'
+MARGIN = {'left': 70, 'right': 20, 'top': 40, 'bottom': 45}
+
+
+def _points_to_arrays(points):
+    """Convertit une liste de points {'x', 'y'} en deux tableaux numpy."""
+    n = len(points)
+    x = np.fromiter((p['x'] for p in points), dtype=np.float64, count=n)
+    y = np.fromiter((p['y'] for p in points), dtype=np.float64, count=n)
+    return x, y
+
+
+def nice_ticks(lo, hi, count=5):
+    """Graduations « rondes » (pas de 1, 2 ou 5 × 10^n) couvrant [lo, hi]."""
+    if hi <= lo:
+        hi = lo + 1
+    raw_step = (hi - lo) / count
+    magnitude = 10 ** math.floor(math.log10(raw_step))
+    step = next(m * magnitude for m in (1, 2, 5, 10) if m * magnitude >= raw_step)
+    start = math.ceil(lo / step) * step
+    return np.arange(start, hi + step * 0.5, step)
+
+
+def _format_tick(value):
+    """Libellé compact d'une graduation de prix (ex. 150k, 1.2M)."""
+    if abs(value) >= 1_000_000:
+        return f"{value / 1_000_000:g}M"
+    if abs(value) >= 1_000:
+        return f"{value / 1_000:g}k"
+    return f"{value:g}"
+
+
+def render_line_chart_svg(series, width=800, height=500, x_title='Année', y_title='Prix BTC (€)',
+                          begin_at_zero=True):
+    """Rend des séries de points en un SVG en ligne.
+
+    series : liste de dicts {'label', 'points', 'color', 'dash' (optionnel)}, où points est
+    une liste de {'x', 'y'} (format des datasets Chart.js).
+    """
+    arrays = [_points_to_arrays(s['points']) for s in series]
+    all_x = np.concatenate([x for x, _ in arrays]) if arrays else np.zeros(1)
+    all_y = np.concatenate([y for _, y in arrays]) if arrays else np.zeros(1)
+    x_min, x_max = float(all_x.min()), float(all_x.max())
+    y_min = 0.0 if begin_at_zero else float(all_y.min())
+    y_ticks = nice_ticks(y_min, float(all_y.max()))
+    y_max = float(y_ticks[-1])
+    x_ticks = nice_ticks(x_min, x_max, count=8)
+    x_ticks = x_ticks[(x_ticks >= x_min) & (x_ticks <= x_max)]
+
+    plot_w = width - MARGIN['left'] - MARGIN['right']
+    plot_h = height - MARGIN['top'] - MARGIN['bottom']
+    sx = plot_w / ((x_max - x_min) or 1)
+    sy = plot_h / ((y_max - y_min) or 1)
+
+    def to_px(x, y):
+        return MARGIN['left'] + (x - x_min) * sx, MARGIN['top'] + plot_h - (y - y_min) * sy
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" width="100%" '
+        f'role="img" aria-label="{escape(y_title)} / {escape(x_title)}" font-family="Arial, sans-serif" font-size="12">'
+    ]
+    # Grille et graduations
+    for value in y_ticks:
+        _, py = to_px(x_min, value)
+        parts.append(f'<line x1="{MARGIN["left"]}" x2="{width - MARGIN["right"]}" y1="{py:.1f}" y2="{py:.1f}" stroke="{GRID_COLOR}"/>')
+        parts.append(f'<text x="{MARGIN["left"] - 6}" y="{py + 4:.1f}" fill="{TEXT_COLOR}" text-anchor="end">{_format_tick(value)}</text>')
+    for value in x_ticks:
+        px, _ = to_px(value, y_min)
+        parts.append(f'<line x1="{px:.1f}" x2="{px:.1f}" y1="{MARGIN["top"]}" y2="{MARGIN["top"] + plot_h}" stroke="{GRID_COLOR}"/>')
+        parts.append(f'<text x="{px:.1f}" y="{MARGIN["top"] + plot_h + 16}" fill="{TEXT_COLOR}" text-anchor="middle">{value:g}</text>')
+    parts.append(f'<text x="{MARGIN["left"] + plot_w / 2:.0f}" y="{height - 6}" fill="{TEXT_COLOR}" text-anchor="middle">{escape(x_title)}</text>')
+    parts.append(f'<text transform="translate(14 {MARGIN["top"] + plot_h / 2:.0f}) rotate(-90)" fill="{TEXT_COLOR}" text-anchor="middle">{escape(y_title)}</text>')
+
+    # Séries : transformation vectorisée puis une seule polyline par série
+    legend_x = MARGIN['left']
+    for s, (x, y) in zip(series, arrays):
+        px, py = to_px(x, y)
+        coords = ' '.join(f'{a:.1f},{b:.1f}' for a, b in zip(px.tolist(), py.tolist()))
+        dash = f' stroke-dasharray="{",".join(str(d) for d in s["dash"])}"' if s.get('dash') else ''
+        parts.append(f'<polyline fill="none" stroke="{s["color"]}" stroke-width="2"{dash} points="{coords}"/>')
+        parts.append(f'<rect x="{legend_x}" y="12" width="30" height="10" fill="{s["color"]}"/>')
+        parts.append(f'<text x="{legend_x + 36}" y="21" fill="{TEXT_COLOR}">{escape(s["label"])}</text>')
+        legend_x += 46 + 7 * len(s['label'])
+    parts.append('</svg>')
+    return ''.join(parts)
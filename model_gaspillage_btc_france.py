@@ -1,189 +1,47 @@
-import requests
+import argparse
 import json
-from datetime import date, datetime
-import time
-
-def get_current_block_height():
-    """Récupère la hauteur de bloc actuelle du Bitcoin."""
-    try:
-        response = requests.get("https://blockstream.info/api/blocks/tip/height")
-        return int(response.text)
-    except Exception as e:
-        print(f"Erreur lors de la récupération de la hauteur de bloc : {e}")
-        return 916944  # Fallback pour 29/09/2025
-
-def get_btc_price_eur():
-    """Récupère le prix actuel du BTC en EUR via CoinGecko API."""
-    try:
-        response = requests.get("https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=eur")
-        return response.json()["bitcoin"]["eur"]
-    except Exception as e:
-        print(f"Erreur lors de la récupération du prix : {e}")
-        return 97304  # Fallback pour 29/09/2025
-
-def get_current_hash_rate_ths():
-    """Récupère le hash rate actuel en TH/s via Blockchain.info API."""
-    try:
-        response = requests.get("https://api.blockchain.info/charts/hash-rate?format=json")
-        data = response.json()
-        hr_ths = data['values'][-1]['y']
-        return hr_ths
-    except Exception as e:
-        print(f"Erreur lors de la récupération du hash rate : {e}")
-        return 600000000  # Fallback approx 600 EH/s = 6e8 TH/s
-
-def days_since_genesis(current_date=None):
-    """Calcule les jours depuis la genèse (03/01/2009)."""
-    genesis = date(2009, 1, 3)
-    if current_date is None:
-        current_date = date.today()
-    return (current_date - genesis).days
-
-def get_historical_prices(current_date):
-    """Récupère les prix historiques BTC en EUR depuis 2018, échantillonné tous les 7 jours pour hebdomadaire."""
-    from_ts = 1514764800  # 2018-01-01
-    to_ts = int(time.mktime(current_date.timetuple()))
-    try:
-        url = f"https://api.coingecko.com/api/v3/coins/bitcoin/market_chart/range?vs_currency=eur&from={from_ts}&to={to_ts}"
-        response = requests.get(url)
-        data = response.json()['prices']
-        points = []
-        for i in range(0, len(data), 7):  # Échantillon tous les 7 jours pour hebdomadaire
-            ts_ms, p = data[i]
-            dt = datetime.fromtimestamp(ts_ms / 1000).date()
-            fractional_year = dt.year + ((dt.timetuple().tm_yday - 1) / 365.25)
-            points.append({'x': fractional_year, 'y': p})
-        return points
-    except Exception as e:
-        print(f"Erreur hist: {e}")
-        return [{'x': 2018.0, 'y': 10000}, {'x': 2025.0, 'y': 88266}]  # Dummy fallback
-
-def get_power_law_points(current_date, exponent=5.6, years_ahead=5):
-    """Génère des points pour la courbe de loi de puissance."""
-    current_days = days_since_genesis(current_date)
-    price_eur = get_btc_price_eur()
-    A = price_eur / (current_days ** exponent)
-    
-    points = []
-    for i in range(0, (years_ahead * 365) + 1, 30):  # Tous les 30 jours pour lisser
-        day = current_days + i
-        year = 2009 + (day / 365.25)
-        price = A * (day ** exponent)
-        points.append({'x': year, 'y': price})
-    return points, A, exponent
-
-def calculate_mined_btc(start_block, current_block):
-    """Calcule le total de BTC minés depuis le bloc de départ jusqu'au bloc actuel."""
-    total_btc = 0.0
-    
-    # Période 1 : Blocs ~499500 à 630000 (récompense 12.5 BTC)
-    halving1_end = 630000
-    blocks1 = max(0, min(halving1_end, current_block) - max(start_block, 499500))
-    total_btc += blocks1 * 12.5
-    
-    # Période 2 : Blocs 630000 à 840000 (récompense 6.25 BTC)
-    halving2_start = 630000
-    halving2_end = 840000
-    blocks2_start = max(start_block, halving2_start)
-    blocks2_end = min(halving2_end, current_block)
-    blocks2 = max(0, blocks2_end - blocks2_start)
-    total_btc += blocks2 * 6.25
-    
-    # Période 3 : Blocs 840000 à maintenant (récompense 3.125 BTC)
-    halving3_start = 840000
-    blocks3_start = max(start_block, halving3_start)
-    blocks3_end = current_block
-    blocks3 = max(0, blocks3_end - blocks3_start)
-    total_btc += blocks3 * 3.125
-    
-    return total_btc
-
-def calculate_opportunity_cost(share=0.10):  # 10% de part hypothétique
-    """Calcule le coût d'opportunité, plus données pour graphique."""
-    start_block = 499500  # Hauteur approximative au 1er janvier 2018
-    current_block = get_current_block_height()
-    price_eur = get_btc_price_eur()
-    current_date = date.today()
-    
-    total_mined_btc = calculate_mined_btc(start_block, current_block)
-    france_btc_past = total_mined_btc * share
-    value_eur_past = france_btc_past * price_eur
-    total_euros_past = int(value_eur_past)  # En euros complets
-    
-    # Données historiques pour le graphique
-    hist_points = get_historical_prices(current_date)
-    
-    initial_blocks = current_block - start_block
-    
-    # Calcul initial MW/jour total réseau (puissance moyenne)
-    hr_ths = get_current_hash_rate_ths()
-    eff = 30  # J/TH moyenne
-    total_power_w = hr_ths * eff
-    total_mw = total_power_w / 1_000_000
-    
-    # Points pour loi de puissance
-    power_points, A, exponent = get_power_law_points(current_date)
-    
-    return {
-        'france_btc_past': france_btc_past,
-        'total_euros_past': total_euros_past,
-        'price_eur': price_eur,
-        'share': share,
-        'hist_points': hist_points,
-        'initial_blocks': initial_blocks,
-        'start_block': start_block,
-        'initial_current_block': current_block,
-        'total_mined_btc': total_mined_btc,
-        'initial_total_mw': total_mw,
-        'power_points': power_points,
-        'A': A,
-        'exponent': exponent
-    }
+import os
+from datetime import datetime
 
-def generate_html():
-    """Génère le fichier HTML avec mises à jour en temps réel via API."""
-    result = calculate_opportunity_cost()
-    
-    html_content = f"""
-<!DOCTYPE html>
-<html lang="fr">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Compteur Bitcoin France</title>
-    <link rel="icon" type="image/x-icon" href="https://res.cloudinary.com/daabdiwnt/image/upload/v1760992725/ArticleBTC/Galaxy_mqivqu.ico">
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Arial:wght@400;700&display=swap');
-        body {{ 
+from calculs import calculate_opportunity_cost
+from construction import (CHARTJS_CDN_URL, CHARTJS_VENDOR_PATH, DIST_DIR, SERVICE_WORKER_PATH, build_dist,
+                          content_hash, ensure_vendored_chartjs, print_size_report, render_service_worker)
+from diffusion import DEFAULT_HOST, serve
+from export_donnees import EXPORT_DIR, export_build
+from graphique_svg import render_line_chart_svg
+from sources import COINGECKO_URL, ESPLORA_URL, fetch_snapshot, wait_for_refreshes
+
+# CSS critique (au-dessus de la ligne de flottaison), intégré dans le <head>
+CRITICAL_CSS = """
+        body { 
             font-family: 'Arial', sans-serif; 
             background: #000; 
             color: #fff; 
             margin: 0; 
             padding: 0; 
             overflow: auto;
-        }}
-        .container {{ display: flex; min-height: 100vh; }}
-        .left {{ 
+        }
+        .container { display: flex; min-height: 100vh; }
+        .left { 
             flex: 1; 
             padding: 40px; 
             display: flex; 
             flex-direction: column; 
             background: #000; 
-        }}
-        .right {{ 
+        }
+        .right { 
             flex: 1; 
             padding: 40px; 
             background: #111; 
-        }}
-        h1 {{ 
+        }
+        h1 { 
             font-size: 2.5em; 
             color: #F7931A; 
             margin-bottom: 20px; 
             text-align: center;
-        }}
-        p {{ color: #ccc; text-align: center; margin-bottom: 40px; }}
-        .share-select {{ 
+        }
+        p { color: #ccc; text-align: center; margin-bottom: 40px; }
+        .share-select { 
             font-size: 1.2em; 
             color: #F7931A; 
             background: rgba(247, 147, 26, 0.1); 
@@ -192,9 +50,9 @@ def generate_html():
             padding: 10px; 
             margin-bottom: 20px; 
             text-align: center;
-        }}
+        }
         /* Style the button that is used to open and close the collapsible content */
-        .collapsible {{
+        .collapsible {
         background-color: #000;
         color: orange;
         cursor: pointer;
@@ -204,22 +62,22 @@ def generate_html():
         text-align: left;
         outline: none;
         font-size: 15px;
-        }}
+        }
 
         /* Add a background color to the button if it is clicked on (add the .active class with JS), and when you move the mouse over it (hover) */
-        .active, .collapsible:hover {{
+        .active, .collapsible:hover {
         background-color: #000;
-        }}
+        }
 
         /* Style the collapsible content. Note: hidden by default */
-        .collapsible-content {{
+        .collapsible-content {
         padding: 0 18px;
         display: none;
         overflow: hidden;
         background-color: #000;
-        }}
+        }
 
-        .counter {{ 
+        .counter { 
             font-size: 2.5em; 
             font-weight: 700; 
             margin: 20px 0; 
@@ -230,87 +88,82 @@ def generate_html():
             box-shadow: 0 0 10px rgba(247, 147, 26, 0.3); 
             color: #fff;
             transition: all 0.3s ease;
-        }}
-        .label {{ 
+        }
+        .label { 
             font-size: 1.2em; 
             color: #F7931A; 
             margin-bottom: 10px; 
             text-align: center;
-        }}
-        h2 {{ color: #F7931A; text-align: center; margin-bottom: 20px; }}
-        #powerLawChart {{ 
+        }
+        h2 { color: #F7931A; text-align: center; margin-bottom: 20px; }
+        #powerLawChart { 
             max-height: 500px; 
             background: #000; 
             border-radius: 8px; 
             border: 1px solid #F7931A; 
             margin-bottom: 20px;
-        }}
-        .additional-text {{ 
+        }
+        .chart-svg { 
+            background: #000; 
+            border-radius: 8px; 
+            border: 1px solid #F7931A; 
+            margin-bottom: 20px;
+        }
+        .chart-svg svg { display: block; }
+        .additional-text { 
             color: #ccc; 
             font-size: 0.9em; 
             text-align: left; 
             line-height: 1.6;
-        }}
-        .additional-text ul {{ 
+        }
+        .additional-text ul { 
             list-style-type: none; 
             padding-left: 0; 
-        }}
-        .additional-text li {{ 
+        }
+        .additional-text li { 
             margin-bottom: 10px; 
             padding-left: 20px; 
             position: relative; 
-        }}
-        .additional-text li::before {{ 
+        }
+        .additional-text li::before { 
             content: "•"; 
             color: #F7931A; 
             font-weight: bold; 
             position: absolute; 
             left: 0; 
-        }}
-        a:link {{
+        }
+        a:link {
         color: orange;
         background-color: transparent;
         text-decoration: none;
-        }}
+        }
 
-        a:visited {{
+        a:visited {
         color: orange;
         background-color: transparent;
         text-decoration: none;
-        }}
+        }
 
-        a:hover {{
+        a:hover {
         color: red;
         background-color: transparent;
         text-decoration: underline;
-        }}
+        }
 
-        a:active {{
+        a:active {
         color: orange;
         background-color: transparent;
         text-decoration: underline;
-        }}
-
-        table {{ border-collapse: collapse; width: 100%; color: #FFF;}}
-        th, td {{ border: 1px solid #FF9900; padding: 8px; text-align: right; }}
-        th {{ background-color: #000; text-align: left; }}
-        .slider-container {{ margin: 10px 0; display: flex; align-items: center; color: #FF9900;}}
-        .slider-container label {{ width: 200px; margin-right: 10px; }}
-        .slider-container input {{ flex: 1; }}
-        .slider-container span {{ width: 60px; margin-left: 10px; text-align: right; }}
-        .wrapper {{
-            text-align: center;
-        }}
-        button {{ padding: 10px; background: #FF9900; color: white; border: none; cursor: pointer; }}
+        }
 
-        .updating {{ color: #ccc; font-size: 0.9em; text-align: center; margin-top: 20px; }}
+        .updating { color: #ccc; font-size: 0.9em; text-align: center; margin-top: 20px; }
         /* Tooltip Styles - Updated for ? icon */
-        .tooltip {{
+        .tooltip {
             position: relative;
             display: inline-block;
             cursor: help;
-        }}
-        .tooltip .tooltiptext {{
+        }
+        .tooltip .tooltiptext {
             visibility: hidden;
             width: 350px;
             background-color: #111;
@@ -329,8 +182,8 @@ def generate_html():
             border: 1px solid #F7931A;
             font-size: 0.9em;
             line-height: 1.4;
-        }}
-        .tooltip .tooltiptext::after {{
+        }
+        .tooltip .tooltiptext::after {
             content: "";
             position: absolute;
             bottom: 100%;
@@ -339,54 +192,69 @@ def generate_html():
             border-width: 10px;
             border-style: solid;
             border-color: #F7931A transparent transparent transparent;
-        }}
-        .tooltip:hover .tooltiptext {{
+        }
+        .tooltip:hover .tooltiptext {
             visibility: visible;
             opacity: 1;
-        }}
+        }
 
-        .tooltip .tooltip-icon {{
+        .tooltip .tooltip-icon {
             color: #0066cc;
             font-weight: bold;
             font-size: 1em;
             margin-left: 2px;
             vertical-align: super;
-        }}
-        
-        :root {{
+        }
+"""
+
+# CSS du panneau de simulation (replié par défaut), chargé sans bloquer le rendu
+DEFERRED_CSS = """
+        table { border-collapse: collapse; width: 100%; color: #FFF;}
+        th, td { border: 1px solid #FF9900; padding: 8px; text-align: right; }
+        th { background-color: #000; text-align: left; }
+        .slider-container { margin: 10px 0; display: flex; align-items: center; color: #FF9900;}
+        .slider-container label { width: 200px; margin-right: 10px; }
+        .slider-container input { flex: 1; }
+        .slider-container span { width: 60px; margin-left: 10px; text-align: right; }
+        .wrapper {
+            text-align: center;
+        }
+        button { padding: 10px; background: #FF9900; color: white; border: none; cursor: pointer; }
+
+        :root {
         --track-height: 6px;
         --thumb-height: 18px;
         --thumb-width: 18px;
-        }}
+        }
 
-        input[type="range"] {{
+        input[type="range"] {
         appearance: none;
         background: transparent;
         width: 15rem;
         cursor: pointer;
         border-radius: 3px;
-        }}
+        }
 
         /* Input Track */
 
         /* Chrome, Safari, Edge (Chromium) */
-        input[type="range"]::-webkit-slider-runnable-track {{
+        input[type="range"]::-webkit-slider-runnable-track {
         background: linear-gradient(to right, #fff 0%, #ff9900 100%);
         height: var(--track-height);
         border-radius: 3px;
-        }}
+        }
         
         /* Firefox */
-        input[type="range"]::-moz-range-track {{
+        input[type="range"]::-moz-range-track {
         background: linear-gradient(to right, #fff 0%, #ff9900 100%);
         height: var(--track-height);
         border-radius: 3px;
-        }}
+        }
 
         /* Inpiut Thumb */
 
         /* Chrome, Safari, Edge (Chromium) */
-        input[type="range"]::-webkit-slider-thumb {{
+        input[type="range"]::-webkit-slider-thumb {
         appearance: none;
         background: #fff;
         border-radius: 50%;
@@ -394,19 +262,300 @@ def generate_html():
         height: var(--thumb-height);
         margin-top: calc((var(--track-height) / 2) - (var(--thumb-height) / 2));
         border: 3px solid #ff9900;
-        }}
+        }
 
         /* Firefox */
-        input[type="range"]::-moz-range-thumb {{
+        input[type="range"]::-moz-range-thumb {
         appearance: none;
         background: #fff;
         border-radius: 0;
         border-radius: 50%;
         border: 3px solid #ff9900;
-        }}
+        }
+"""
+DEFERRED_CSS_PATH = os.path.join("assets", "site.css")
+
+# Module du panneau de simulation (replié par défaut), chargé au premier dépliage seulement
+SIMULATION_JS = """
+(function () {
+    // Paramètres de simulation
+    const GENESIS_DATE = new Date(2009, 0, 3);  // 3 janv 2009
+    const CURRENT_HASH_EH_S = 1000;  // Hash global actuel (EH/s)
+    const BASE_FRENCH_HASH_EH_S = 55.6;   // Pour 1 GW à 18 J/TH
+    const BLOCKS_PER_DAY = 144;
+    const DAYS_PER_YEAR = 365.25;
+    const FEES_PER_BLOCK = 0.022;
+    const YEARS = [2026, 2027, 2028, 2029, 2030, 2031, 2032];
+
+    let priceChart, revenueChart, cumulativeChart;
+    let currentPriceEur = null;
+
+    // Halving approx avril 2028 (jour 121 de l'année)
+    function getAverageReward(year) {
+        if (year < 2028) {
+            return 3.125 + FEES_PER_BLOCK;
+        } else if (year < 2032) {
+            if (year === 2028) {
+                // Moyenne 2028 : ~121 jours à 3.125, reste à 1.5625
+                const full_reward_days = 121 / DAYS_PER_YEAR;
+                return (3.125 * full_reward_days + 1.5625 * (1 - full_reward_days)) + FEES_PER_BLOCK;
+            }
+            return 1.5625 + FEES_PER_BLOCK;
+        }
+        return 0.78125 + FEES_PER_BLOCK;  // Post-2032
+    }
+
+    function getDaysFromGenesis(year) {
+        const midDate = new Date(year, 6, 1);  // 1er juillet
+        const diffTime = midDate - GENESIS_DATE;
+        return Math.floor(diffTime / (1000 * 60 * 60 * 24));
+    }
+
+    function computeSimulation(priceEur, gw, exponent, growthPct) {
+        const annualGrowthRate = 1 + growthPct / 100;
+        const frenchHashEhS = BASE_FRENCH_HASH_EH_S * gw;
+        // Loi de puissance calibrée sur le prix actuel en EUR
+        const A = priceEur / Math.pow(getDaysFromGenesis(2025), exponent);
+
+        let cumulativeRevenueEur = 0;
+        return YEARS.map(year => {
+            const priceYearEur = A * Math.pow(getDaysFromGenesis(year), exponent);
+            const hashYear = CURRENT_HASH_EH_S * Math.pow(annualGrowthRate, year - 2026);
+            const hashPct = (frenchHashEhS / hashYear) * 100;
+            const totalBTCEmittedYear = getAverageReward(year) * BLOCKS_PER_DAY * DAYS_PER_YEAR;
+            const btcMined = (hashPct / 100) * totalBTCEmittedYear;
+            const revenueEur = btcMined * priceYearEur;
+            cumulativeRevenueEur += revenueEur;
+            return {
+                year: year,
+                priceEur: priceYearEur,
+                hashPct: hashPct,
+                btcMined: btcMined,
+                revenueEur: revenueEur,
+                cumulativeEur: cumulativeRevenueEur
+            };
+        });
+    }
+
+    function renderTable(simulationData) {
+        let tableHTML = `
+            <table>
+                <thead>
+                    <tr>
+                        <th>Année</th>
+                        <th>Prix BTC (€)</th>
+                        <th>% Hash FR</th>
+                        <th>BTC Minés</th>
+                        <th>Revenus Annuels (M €)</th>
+                        <th>Revenus Cumulés (M €)</th>
+                    </tr>
+                </thead>
+                <tbody>
+        `;
+        simulationData.forEach(row => {
+            tableHTML += `
+                <tr>
+                    <td>${row.year}</td>
+                    <td>${Math.round(row.priceEur).toLocaleString()}</td>
+                    <td>${row.hashPct.toFixed(3)} %</td>
+                    <td>${Math.round(row.btcMined).toLocaleString()}</td>
+                    <td>${Math.round(row.revenueEur).toLocaleString()}</td>
+                    <td>${Math.round(row.cumulativeEur).toLocaleString()}</td>
+                </tr>
+            `;
+        });
+        tableHTML += `
+                </tbody>
+                <tfoot>
+                    <tr style="font-weight: bold;">
+                        <td>Total</td>
+                        <td colspan="2"></td>
+                        <td>${Math.round(simulationData.reduce((sum, r) => sum + r.btcMined, 0)).toLocaleString()} BTC</td>
+                        <td colspan="2">${Math.round(simulationData[simulationData.length - 1].cumulativeEur).toLocaleString()} M €</td>
+                    </tr>
+                </tfoot>
+            </table>
+        `;
+        document.getElementById('results-table').innerHTML = tableHTML;
+    }
+
+    // Graphiques créés une seule fois, au premier affichage du panneau
+    function createCharts() {
+        const labels = YEARS.map(y => y.toString());
+
+        // Graphique 1: Prix BTC (€)
+        priceChart = new Chart(document.getElementById('priceChart').getContext('2d'), {
+            type: 'line',
+            data: {
+                labels: labels,
+                datasets: [{
+                    label: 'Prix BTC (€)',
+                    data: [],
+                    borderColor: '#3b82f6',
+                    backgroundColor: 'rgba(59, 130, 246, 0.1)',
+                    fill: true,
+                    tension: 0.1
+                }]
+            },
+            options: {
+                responsive: true,
+                scales: {
+                    y: { beginAtZero: false, title: { display: true, text: 'Prix (€)' } },
+                    x: { title: { display: true, text: 'Année' } }
+                },
+                plugins: { title: { display: true, text: 'Projection du Prix du Bitcoin (Loi de Puissance)' } }
+            }
+        });
+
+        // Graphique 2: Revenus Annuels (M €)
+        revenueChart = new Chart(document.getElementById('revenueChart').getContext('2d'), {
+            type: 'bar',
+            data: {
+                labels: labels,
+                datasets: [{
+                    label: 'Revenus (M €)',
+                    data: [],
+                    backgroundColor: ['#10b981', '#f59e0b', '#ef4444', '#8b5cf6', '#06b6d4']
+                }]
+            },
+            options: {
+                responsive: true,
+                scales: {
+                    y: { beginAtZero: true, title: { display: true, text: 'Revenus (M €)' } },
+                    x: { title: { display: true, text: 'Année' } }
+                },
+                plugins: { title: { display: true, text: 'Revenus Annuels Projetés' } }
+            }
+        });
+
+        // Graphique 3: Revenus Cumulés (M €)
+        cumulativeChart = new Chart(document.getElementById('cumulativeChart').getContext('2d'), {
+            type: 'line',
+            data: {
+                labels: labels,
+                datasets: [{
+                    label: 'Revenus Cumulés (M €)',
+                    data: [],
+                    borderColor: '#10b981',
+                    backgroundColor: 'rgba(16, 185, 129, 0.2)',
+                    fill: true,
+                    tension: 0.1
+                }]
+            },
+            options: {
+                responsive: true,
+                scales: {
+                    y: { beginAtZero: true, title: { display: true, text: 'Revenus Cumulés (M €)' } },
+                    x: { title: { display: true, text: 'Année' } }
+                },
+                plugins: { title: { display: true, text: 'Projection des Revenus Cumulés' } }
+            }
+        });
+    }
+
+    // Recalcule le tableau et met à jour les graphiques en place (sans les recréer)
+    function updateSimulation() {
+        const simulationData = computeSimulation(
+            currentPriceEur,
+            parseFloat(document.getElementById('gwSlider').value),
+            parseFloat(document.getElementById('exponentSlider').value),
+            parseFloat(document.getElementById('growthSlider').value)
+        );
+        renderTable(simulationData);
+
+        if (!priceChart) createCharts();
+        priceChart.data.datasets[0].data = simulationData.map(d => d.priceEur);
+        revenueChart.data.datasets[0].data = simulationData.map(d => d.revenueEur);
+        cumulativeChart.data.datasets[0].data = simulationData.map(d => d.cumulativeEur);
+        priceChart.update();
+        revenueChart.update();
+        cumulativeChart.update();
+    }
+
+    // Sliders : le panneau est ouvert quand ils bougent, la mise à jour est immédiate
+    [['gwSlider', 'gwValue'], ['exponentSlider', 'exponentValue'], ['growthSlider', 'growthValue']].forEach(([slider, value]) => {
+        document.getElementById(slider).oninput = function () {
+            document.getElementById(value).textContent = this.value;
+            updateSimulation();
+        };
+    });
+
+    // Point d'entrée appelé par la page à chaque ouverture du panneau (et à chaque nouveau prix
+    // tant qu'il reste ouvert) : rien n'est recalculé si le prix n'a pas changé
+    window.simulation = {
+        show(priceEur) {
+            if (priceEur === currentPriceEur) return;
+            currentPriceEur = priceEur;
+            updateSimulation();
+        }
+    };
+})();
+"""
+SIMULATION_JS_PATH = os.path.join("assets", "simulation.js")
 
+# Intervalle d'interrogation des API par la page quand le flux SSE est indisponible
+POLL_INTERVAL_MS = 600_000
 
-    </style>
+# Libellés des sources pour l'affichage de l'âge des données
+SOURCE_LABELS = {
+    'block_height': 'hauteur de bloc',
+    'prices': 'prix',
+    'hash_rate_ths': 'hash rate',
+    'price_histories': 'historique des prix',
+    'hashrate_history': 'historique du hash rate',
+}
+
+def describe_data_age(snapshot):
+    """Texte de statut : signale les sources servies depuis le cache avec l'âge réel de leur donnée,
+    et les valeurs fraîches qu'aucun second fournisseur n'a confirmées."""
+    if not snapshot['stale_sources']:
+        return "Mise à jour en temps réel."
+    unconfirmed = snapshot.get('unconfirmed_sources', [])
+    details = []
+    for name in snapshot['stale_sources']:
+        if name in unconfirmed:
+            continue
+        fetched_at = snapshot['fetched_at'][name]
+        label = SOURCE_LABELS.get(name, name)
+        if fetched_at is None:
+            details.append(f"{label} : date inconnue")
+        else:
+            details.append(f"{label} du {datetime.fromtimestamp(fetched_at).strftime('%d/%m/%Y %H:%M')}")
+    parts = [f"Données en cache ({', '.join(details)})"] if details else []
+    if unconfirmed:
+        parts.append(f"Non confirmé par un second fournisseur : {', '.join(SOURCE_LABELS.get(n, n) for n in unconfirmed)}")
+    return f"{'. '.join(parts)}. Mise à jour en temps réel au chargement."
+
+def generate_html(export_dir=None):
+    """Génère le fichier HTML avec mises à jour en temps réel via API.
+
+    Avec export_dir, écrit aussi les séries et scalaires calculés en tables colonnaires (export_donnees.py).
+    """
+    snapshot = fetch_snapshot()
+    result = calculate_opportunity_cost(snapshot)
+    # Chart.js épinglé et servi localement ; CDN (même version) seulement si la copie locale manque
+    chartjs_src = CHARTJS_VENDOR_PATH.replace(os.sep, '/') if ensure_vendored_chartjs() else CHARTJS_CDN_URL
+    currency_options = ''.join(
+        f'<option value="{code}"{" selected" if code == "eur" else ""}>{code.upper()} ({c["symbol"]})</option>'
+        for code, c in result['currencies'].items()
+    )
+    power_law_svg = render_line_chart_svg([
+        {'label': 'Prix Historique (EUR)', 'points': result['hist_points'], 'color': '#F7931A'},
+        {'label': 'Loi de Puissance (exposant 5.6)', 'points': result['power_points'], 'color': '#FF6B35', 'dash': [5, 5]},
+    ])
+    
+    html_content = f"""
+<!DOCTYPE html>
+<html lang="fr">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Compteur Bitcoin France</title>
+    <link rel="icon" type="image/x-icon" href="https://res.cloudinary.com/daabdiwnt/image/upload/v1760992725/ArticleBTC/Galaxy_mqivqu.ico">
+    <script src="{chartjs_src}" defer></script>
+    <style>{CRITICAL_CSS}    </style>
+    <link rel="preload" href="{DEFERRED_CSS_PATH.replace(os.sep, '/')}" as="style" onload="this.onload=null;this.rel='stylesheet'">
+    <noscript><link rel="stylesheet" href="{DEFERRED_CSS_PATH.replace(os.sep, '/')}"></noscript>
 </head>
 <body>
     <div class="container">
@@ -422,17 +571,20 @@ def generate_html():
                 <option value="10" selected>10%</option>
                 <option value="15">15%</option>
             </select>
+            <select id="currencySelect" class="share-select" aria-label="Devise">
+                {currency_options}
+            </select>
             
-            <div class="label">MW/Jour Nécessaires <span class="tooltip"><span class="tooltip-icon">?</span><span class="tooltiptext">Pour miner, il faut de l'électricité. Ici, il s'agirait, par exemple, de surplus nucléaire et énergies intermittentes bas-carbone disponible chaque jour en France pour optimiser & limiter les gaspillages sur le réseau électrique France (optimisation sous contraintes). Par exemple <a target="_blank" href="https://x.com/i/grok/share/lgsH4qga1fdvgcIIYeSoolj2Z">il est estimé que plus de 3.6 GW sont disponibles chaque jour et non utilisés en raison de la modulation sur le parc nucléaire français.</a></span></span></div>
+            <div class="label">MW/Jour Nécessaires <span class="tooltip"><span class="tooltip-icon">?</span><span class="tooltiptext">Pour miner, il faut de l'électricité. Ici, il s'agirait, par exemple, de surplus nucléaire et énergies intermittentes bas-carbone disponible chaque jour en France pour optimiser & limiter les gaspillages sur le réseau électrique France (optimisation sous contraintes). Par exemple <a target="_blank" href="https://x.com/i/grok/share/lgsH4qga1fdvgcIIYeSoolj2Z">il est estimé que plus de 3.6 GW sont disponibles chaque jour et non utilisés en raison de la modulation sur le parc nucléaire français.</a> Puissance moyenne depuis 2018, intégrée sur l'historique du hash rate et une courbe d'efficacité des machines (J/TH) décroissante dans le temps : ~{result['total_twh']:.0f} TWh cumulés pour l'ensemble du réseau.</span></span></div>
             <div class="counter" id="mwhCounter">0</div>
 
-            <div class="label">Total Manqués (€) <span class="tooltip"><span class="tooltip-icon">?</span><span class="tooltiptext">Valeur actuelle des BTC manqués (coût d'opportunité total en milliards €). Pour 10% par exemple, ~>= 30 milliards € brut aujourd'hui. Formule (BTC minés × prix actuel).</span></span></div>
+            <div class="label">Total Manqués (<span class="currency-symbol">€</span>) <span class="tooltip"><span class="tooltip-icon">?</span><span class="tooltiptext">Valeur actuelle des BTC manqués (coût d'opportunité total en milliards €). Pour 10% par exemple, ~>= 30 milliards € brut aujourd'hui. Formule (BTC minés × prix actuel).</span></span></div>
             <div class="counter" id="totalEurosCounter">0</div>
             
             <div class="label">BTC Manqués <span class="tooltip"><span class="tooltip-icon">?</span><span class="tooltiptext">Les BTC "manqués" sont les récompenses que la France aurait gagnées en minant. "Miner" n'est pas creuser de l'or, mais un processus informatique : des ordinateurs résolvant des énigmes pour ajouter des blocs à la blockchain et sécuriser les transactions. Le premier mineur qui résout le puzzle gagne ~3.125 BTC/bloc dans le cycle actuel. Les "pools" de minage permettent de distribuer les récompenses aux différents mineurs en fonction de leur part de hachage du réseau.</span></span></div>
             <div class="counter" id="btcCounter">0</div>
             
-            <div class="label">Prix BTC Actuel (€) <span class="tooltip"><span class="tooltip-icon">?</span><span class="tooltiptext">Prix de marché actuel du Bitcoin en euros, mis à jour en live via API CoinGecko. Utilisé pour valoriser les BTC manqués (multiplié par le nombre de BTC).</span></span></div>
+            <div class="label">Prix BTC Actuel (<span class="currency-symbol">€</span>) <span class="tooltip"><span class="tooltip-icon">?</span><span class="tooltiptext">Prix de marché actuel du Bitcoin dans la devise choisie, mis à jour en live via API CoinGecko. Utilisé pour valoriser les BTC manqués (multiplié par le nombre de BTC).</span></span></div>
             <div class="counter" id="priceCounter">0</div>
             
             <div class="label">Blocs Manqués <span class="tooltip"><span class="tooltip-icon">?</span><span class="tooltiptext">Un bloc = une page de transactions ajoutée ~toutes les 10 min. On compte ici le nombre passé de blocs de transactions depuis 2018.</span></span></div>
@@ -441,12 +593,14 @@ def generate_html():
             
             
             
-            <div class="updating" id="updateText">Mise à jour en temps réel.</div>
+            <div class="updating" id="updateText">{describe_data_age(snapshot)}</div>
         </div>
         
         <div class="right">
-            <h2>Prix Historique BTC (EUR) & Loi de Puissance (exposant 5.6)</h2>
-            <canvas id="powerLawChart"></canvas>
+            <h2>Prix Historique BTC (<span class="currency-symbol">€</span>) & Loi de Puissance (exposant 5.6)</h2>
+            <!-- SVG pré-rendu (affiché immédiatement, conservé sans JavaScript), remplacé par Chart.js -->
+            <div id="powerLawChartSvg" class="chart-svg">{power_law_svg}</div>
+            <canvas id="powerLawChart" hidden></canvas>
             <p>La loi de puissance modélise la croissance du prix BTC : P(t) = a * t^5.6, où t = jours depuis genèse (2009). Calibrée sur prix actuel, elle projette une hausse ~35-40%/an. Exposant 5.6 est historique (basé sur données 2010-2025).</p>
             <div class="additional-text">
                 <ul>
@@ -472,10 +626,10 @@ def generate_html():
             </div>
             <br />
             <br />
-                <button type="button" class="collapsible"><h4>Effectuer une simulation complète : Minage Bitcoin - France (En Euro)</h4></button>
+                <button type="button" class="collapsible" id="simulationToggle"><h4>Effectuer une simulation complète : Minage Bitcoin - France (En Euro)</h4></button>
                 <div class="collapsible-content">
                     <p style="color: #FF9900;">Un site dédié a été créé : <b><a target="_blank" href="https://www.simulateur-bitcoin.fr">https://www.simulateur-bitcoin.fr</a></b>.</p>
-                    <p style="color: #FF9900;">Cette simulation modélise un déploiement variable sur surplus EDF (2026-2032), avec loi de puissance pour le prix BTC (en USD, convertis en EUR), halving 2028, et croissance du hash global. Glissez les sliders pour ajuster les paramètres et voir les mises à jour en temps réel. <span class="tooltip"><span class="tooltiptext">"La France" = l'État français (gouvernement, via Ministère Économie/Transition Écologique), pas la Banque de France. Initiative publique pour souveraineté numérique, comme un projet d'infrastructure (ex. TGV). Sécurité : Data centers blindés (ANSSI audits), wallets offline multi-sig. Pourquoi 2018 ? Équilibre : post-bulle 2017, maturité tech, inclut 2 halvings ; pas 2015 (trop volatile), pas 2021 (moins de recul).</span></span></p>
+                    <p style="color: #FF9900;">Cette simulation modélise un déploiement variable sur surplus EDF (2026-2032), avec loi de puissance pour le prix BTC (en EUR), halving 2028, et croissance du hash global. Glissez les sliders pour ajuster les paramètres et voir les mises à jour en temps réel. <span class="tooltip"><span class="tooltiptext">"La France" = l'État français (gouvernement, via Ministère Économie/Transition Écologique), pas la Banque de France. Initiative publique pour souveraineté numérique, comme un projet d'infrastructure (ex. TGV). Sécurité : Data centers blindés (ANSSI audits), wallets offline multi-sig. Pourquoi 2018 ? Équilibre : post-bulle 2017, maturité tech, inclut 2 halvings ; pas 2015 (trop volatile), pas 2021 (moins de recul).</span></span></p>
                     
                     <div class="slider-container">
                         <label>Nombre de GW : <span class="tooltip"><span class="tooltiptext">Puissance allouée (ex. 1 GW = 1000 MW). Interruptible sur surplus EDF, avec récupération chaleur (chauffage urbain). Pour 1 GW, ~55 EH/s (5.5% global), investissement ~2-3 Md€ (hardware + infra), amorti <6 mois.</span></span></label>
@@ -498,7 +652,7 @@ def generate_html():
                     
                     <div id="results-table"></div>
                     
-                    <h2>Évolution Projetée du Prix du Bitcoin (USD)</h2>
+                    <h2>Évolution Projetée du Prix du Bitcoin (€)</h2>
                     <canvas id="priceChart" width="800" height="400"></canvas>
                     
                     <h2>Revenus Annuels Projetés (M €)</h2>
@@ -525,8 +679,50 @@ def generate_html():
             }} else {{
             content.style.display = "block";
             }}
+            if (this.id === "simulationToggle") toggleSimulation(content.style.display === "block");
         }});
         }}
+
+        // Panneau de simulation : module chargé au premier dépliage, rien n'est calculé tant qu'il est replié
+        let simulationOpen = false;
+        let simulationModule = null;
+        function loadSimulation() {{
+            return new Promise((resolve, reject) => {{
+                const script = document.createElement('script');
+                script.src = '{SIMULATION_JS_PATH.replace(os.sep, '/')}';
+                script.onload = () => window.simulation ? resolve(window.simulation)
+                    : reject(new Error('simulation.js chargé sans module'));
+                script.onerror = () => {{
+                    script.remove();
+                    reject(new Error('chargement de ' + script.src + ' impossible'));
+                }};
+                document.head.appendChild(script);
+            }});
+        }}
+        // Sans module (hors ligne, fichier absent), le panneau affiche l'erreur au lieu de rester vide
+        function showSimulation() {{
+            simulationModule.then(sim => sim.show(lastPrices.eur)).catch(err => {{
+                console.error('Erreur simulation:', err);
+                document.getElementById('results-table').innerHTML =
+                    '<p style="color: #ef4444;">Impossible de charger la simulation. Repliez puis rouvrez le panneau pour réessayer.</p>';
+            }});
+        }}
+        function toggleSimulation(open) {{
+            simulationOpen = open;
+            if (!open) return;
+            if (!simulationModule) {{
+                // Chart.js (defer) est disponible au plus tard à DOMContentLoaded
+                const ready = document.readyState === 'loading'
+                    ? new Promise(resolve => document.addEventListener('DOMContentLoaded', resolve))
+                    : Promise.resolve();
+                simulationModule = ready.then(loadSimulation).catch(err => {{
+                    simulationModule = null;  // Nouvel essai à la prochaine ouverture
+                    throw err;
+                }});
+            }}
+            // À l'ouverture, la simulation rattrape le dernier prix reçu pendant qu'elle était repliée
+            showSimulation();
+        }}
         // Fonction pour calculer les BTC minés (miroir du Python)
         function calculateMinedBtc(currentBlock) {{
             let totalBtc = 0.0;
@@ -555,135 +751,170 @@ def generate_html():
             return totalBtc;
         }}
 
-        // Animation fluide des compteurs
-        function animateCounter(id, target, duration = 5000, suffix = '') {{
-            const counter = document.getElementById(id);
-            const start = parseFloat(counter.textContent.replace(/,/g, '').replace(/[^0-9.-]/g, '')) || 0;
-            const range = target - start;
-            const increment = range / (duration / 16);
-            let current = start;
-            const timer = setInterval(() => {{
-                current += increment;
-                if (current >= target) {{
-                    current = target;
-                    clearInterval(timer);
-                }}
-                if (id === 'totalEurosCounter' || id === 'btcCounter' || id === 'blocksCounter' || id === 'mwhCounter') {{
-                    counter.textContent = Math.floor(current).toLocaleString() + suffix;
-                }} else {{
-                    counter.textContent = current.toFixed(2).toLocaleString() + suffix;
-                }}
-            }}, 16);
-        }}
-
-        // Fonction pour mettre à jour tous les compteurs avec le share actuel
-        function updateAllCounters(newHeight, newPrice, newBlocks, totalMw) {{
-            const share = currentShare / 100;
-            const newTotalMined = calculateMinedBtc(newHeight);
-            const newTotalBtc = newTotalMined * share;
-            const newTotalEuros = Math.floor(newTotalBtc * newPrice);
-            const newMw = totalMw * share;
-            
-            animateCounter('totalEurosCounter', newTotalEuros, 5000, ' €');
-            animateCounter('btcCounter', newTotalBtc, 5000, ' BTC');
-            animateCounter('priceCounter', newPrice, 5000, ' €');
-            animateCounter('blocksCounter', newBlocks, 5000, '');
-            animateCounter('mwhCounter', newMw, 5000, ' MW');
-        }}
-
-        // Données embeddées initiales
-        const initialTotalEuros = {result['total_euros_past']};
-        const initialBtc = {result['france_btc_past']};
-        const initialPrice = {result['price_eur']};
-        const initialBlocks = {result['initial_blocks']};
-        const histData = {json.dumps(result['hist_points'])};
-        const powerData = {json.dumps(result['power_points'])};
+        // Données embeddées initiales (toutes les devises : changer de devise ne fait aucun appel réseau)
+        const CURRENCIES = {json.dumps({code: c['symbol'] for code, c in result['currencies'].items()}, ensure_ascii=False)};
+        const histByCurrency = {json.dumps({code: c['hist_points'] for code, c in result['currencies'].items()})};
+        const powerByCurrency = {json.dumps({code: c['power_points'] for code, c in result['currencies'].items()})};
+        const initialPrices = {json.dumps({code: c['price'] for code, c in result['currencies'].items()})};
         const initialTotalMw = {result['initial_total_mw']};
         const startBlock = {result['start_block']};
+        const feesMinedBtc = {result['fees_btc']};
         const initialCurrentBlock = {result['initial_current_block']};
+        const heightTimeMs = {result['height_timestamp'] * 1000};
+        const priceTimeMs = {result['price_timestamp'] * 1000};
+        const blockIntervalS = {result['block_interval_s']};
+        const priceDriftPerS = {json.dumps({code: c['price_drift_per_s'] for code, c in result['currencies'].items()})};
 
         let currentShare = 10;
+        let currentCurrency = 'eur';
         let lastHeight = initialCurrentBlock;
-        let lastPrice = initialPrice;
+        let lastPrices = Object.assign({{}}, initialPrices);
         let lastTotalMw = initialTotalMw;
 
+        // Affichage des compteurs, au format de chacun
+        function renderCounter(id, value, suffix) {{
+            const text = (id === 'priceCounter' ? value.toFixed(2) : Math.floor(value).toLocaleString()) + suffix;
+            const counter = document.getElementById(id);
+            if (counter.textContent !== text) counter.textContent = text;
+        }}
+
+        // Extrapolation entre deux rafraîchissements : la hauteur avance d'un bloc toutes les
+        // blockIntervalS secondes, le prix suit sa dérive récente (horizon plafonné à un jour).
+        // À chaque changement (données réelles, part, devise), l'écart entre la valeur affichée et
+        // le nouveau modèle est résorbé en RECONCILE_MS ; le compteur de blocs ne recule jamais.
+        const RECONCILE_MS = 5000;
+        const COUNTER_REFRESH_MS = 250;  // Hors résorption, les compteurs n'évoluent qu'à la seconde
+        const MAX_PRICE_EXTRAPOLATION_S = 86400;
+        let heightTime = heightTimeMs;
+        let priceTime = priceTimeMs;
+        let heightHold = 0;
+        let heightResidual = 0;
+        let residual = {{btc: 0, total: 0, price: 0, mw: 0}};
+        let residualStart = 0;
+
+        function blendFactor(now) {{
+            return Math.max(0, 1 - (now - residualStart) / RECONCILE_MS);
+        }}
+
+        function modelHeight(now) {{
+            return lastHeight + (now - heightTime) / 1000 / blockIntervalS;
+        }}
+
+        function displayedHeight(now) {{
+            return Math.max(modelHeight(now) + heightResidual * blendFactor(now), heightHold);
+        }}
+
+        function modelValues(now) {{
+            const share = currentShare / 100;
+            // Frais exacts jusqu'au bloc de génération (registre de blocs), subvention extrapolée en direct
+            const btc = (calculateMinedBtc(displayedHeight(now)) + feesMinedBtc) * share;
+            const elapsedS = Math.min((now - priceTime) / 1000, MAX_PRICE_EXTRAPOLATION_S);
+            const price = lastPrices[currentCurrency] * Math.exp((priceDriftPerS[currentCurrency] || 0) * elapsedS);
+            return {{btc: btc, total: btc * price, price: price, mw: lastTotalMw * share}};
+        }}
+
+        function displayedValues(now) {{
+            const values = modelValues(now);
+            const k = blendFactor(now);
+            for (const key in residual) values[key] += residual[key] * k;
+            return values;
+        }}
+
+        // Applique un changement du modèle sans saut de l'affichage
+        function reconcile(change) {{
+            const now = Date.now();
+            const heightBefore = displayedHeight(now);
+            const before = displayedValues(now);
+            change(now);
+            heightResidual = Math.min(0, heightBefore - modelHeight(now));
+            heightHold = heightBefore;
+            residualStart = now;
+            const after = modelValues(now);
+            for (const key in residual) residual[key] = before[key] - after[key];
+        }}
+
+        function renderCounters() {{
+            const now = Date.now();
+            const values = displayedValues(now);
+            const symbol = ' ' + CURRENCIES[currentCurrency];
+            renderCounter('totalEurosCounter', values.total, symbol);
+            renderCounter('btcCounter', values.btc, ' BTC');
+            renderCounter('priceCounter', values.price, symbol);
+            renderCounter('blocksCounter', Math.floor(displayedHeight(now)) - startBlock, '');
+            renderCounter('mwhCounter', values.mw, ' MW');
+            // Animation fluide pendant la résorption d'un écart, quelques rafraîchissements par seconde ensuite
+            if (blendFactor(now) > 0) requestAnimationFrame(renderCounters);
+            else setTimeout(renderCounters, COUNTER_REFRESH_MS);
+        }}
+
+        // Démarrage : les compteurs partent de 0 et rejoignent le modèle en RECONCILE_MS
+        function startCounters() {{
+            const now = Date.now();
+            residualStart = now;
+            heightResidual = startBlock - modelHeight(now);
+            const values = modelValues(now);
+            for (const key in residual) residual[key] = -values[key];
+            requestAnimationFrame(renderCounters);
+        }}
+
         // Événement pour le dropdown
         document.getElementById('shareSelect').onchange = function(e) {{
-            currentShare = parseInt(e.target.value);
             // Mise à jour immédiate avec les dernières données connues
-            if (lastHeight && lastPrice) {{
-                fetch('https://api.blockchain.info/charts/hash-rate?format=json&cors=true')
-                .then(r => r.json())
-                .then(hashData => {{
-                    const hr_ths = hashData.values[hashData.values.length - 1].y;
-                    const eff = 30; // J/TH moyenne
-                    const total_power_w = hr_ths * eff;
-                    const total_mw = total_power_w / 1000000;
-                    updateAllCounters(lastHeight, lastPrice, lastHeight - startBlock, total_mw);
-                    lastTotalMw = total_mw;
-                }})
-                .catch(() => {{
-                    // Fallback avec valeur initiale
-                    updateAllCounters(lastHeight, lastPrice, lastHeight - startBlock, initialTotalMw);
-                }});
+            // La puissance moyenne est intégrée côté Python : aucun appel réseau nécessaire
+            reconcile(() => {{ currentShare = parseInt(e.target.value); }});
+        }};
+
+        // Courbe de loi de puissance calibrée sur le prix actuel (un point tous les 30 jours sur 5 ans)
+        function powerLawPoints(price) {{
+            const currentDays = daysSinceGenesis();
+            const A = price / Math.pow(currentDays, {result['exponent']});
+            const points = [];
+            for (let i = 0; i <= 5 * 365; i += 30) {{
+                const day = currentDays + i;
+                points.push({{x: 2009 + (day / 365.25), y: A * Math.pow(day, {result['exponent']})}});
+            }}
+            return points;
+        }}
+
+        // Changement de devise : tout est déjà embarqué ou en mémoire, aucun appel réseau
+        document.getElementById('currencySelect').onchange = function(e) {{
+            reconcile(() => {{ currentCurrency = e.target.value; }});
+            const code = currentCurrency.toUpperCase();
+            document.querySelectorAll('.currency-symbol').forEach(el => {{ el.textContent = CURRENCIES[currentCurrency]; }});
+            if (window.powerLawChart) {{
+                const datasets = window.powerLawChart.data.datasets;
+                datasets[0].label = `Prix Historique (${{code}})`;
+                datasets[0].data = histByCurrency[currentCurrency];
+                datasets[1].data = lastPrices[currentCurrency] === initialPrices[currentCurrency]
+                    ? powerByCurrency[currentCurrency]
+                    : powerLawPoints(lastPrices[currentCurrency]);
+                window.powerLawChart.options.scales.y.title.text = `Prix BTC (${{CURRENCIES[currentCurrency]}})`;
+                window.powerLawChart.update('quiet');
             }}
         }};
 
-        // Fonction de mise à jour en temps réel
-        async function updateData() {{
-            try {{
-                const heightRes = await fetch('https://blockstream.info/api/blocks/tip/height');
-                const heightText = await heightRes.text();
-                const newHeight = parseInt(heightText);
-                
-                const priceRes = await fetch('https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=eur');
-                const priceData = await priceRes.json();
-                const newPrice = priceData.bitcoin.eur;
-                
-                // Fetch hash rate pour MW
-                const hrRes = await fetch('https://api.blockchain.info/charts/hash-rate?format=json&cors=true');
-                const hashData = await hrRes.json();
-                const hr_ths = hashData.values[hashData.values.length - 1].y;
-                const eff = 30; // J/TH moyenne réseau
-                const total_power_w = hr_ths * eff;
-                const total_mw = total_power_w / 1000000;
-                
-                const newBlocks = newHeight - startBlock;
-                
-                // Mise à jour avec share actuel
-                updateAllCounters(newHeight, newPrice, newBlocks, total_mw);
-                
-                // Mise à jour du timestamp
-                document.getElementById('updateText').textContent = `Dernière mise à jour: ${{new Date().toLocaleString('fr-FR')}}`;
-                
-                lastHeight = newHeight;
-                lastPrice = newPrice;
-                lastTotalMw = total_mw;
-            }} catch (e) {{
-                console.error('Erreur lors de la mise à jour:', e);
-                // Fallback
-                updateAllCounters(lastHeight, lastPrice, lastHeight - startBlock, lastTotalMw);
+        // Exécute une tâche non critique quand le navigateur est inactif
+        function whenIdle(callback) {{
+            if ('requestIdleCallback' in window) {{
+                requestIdleCallback(callback, {{ timeout: 2000 }});
+            }} else {{
+                setTimeout(callback, 200);
             }}
         }}
 
-        // Initialisation
-        window.onload = async () => {{
-            // 1. Initialiser les compteurs à 0 (pour l'animation)
-            document.getElementById('totalEurosCounter').textContent = '0 €';
-            document.getElementById('btcCounter').textContent = '0 BTC';
-            document.getElementById('priceCounter').textContent = '0 €';
-            document.getElementById('blocksCounter').textContent = '0';
-            document.getElementById('mwhCounter').textContent = '0 MW';
-            
-            // 2a. Graphique initial avec données Python
-            const ctx = document.getElementById('powerLawChart').getContext('2d');
+        // Graphique initial avec données Python (Chart.js est chargé en defer)
+        function initPowerLawChart() {{
+            // Chart.js indisponible (CDN bloqué, hors ligne) : le graphique SVG pré-rendu reste affiché
+            if (typeof Chart === 'undefined') return;
+            const canvas = document.getElementById('powerLawChart');
+            const ctx = canvas.getContext('2d');
             window.powerLawChart = new Chart(ctx, {{
                 type: 'line',
                 data: {{
                     datasets: [
                         {{
-                            label: 'Prix Historique (EUR)',
-                            data: {json.dumps(result['hist_points'])},
+                            label: `Prix Historique (${{currentCurrency.toUpperCase()}})`,
+                            data: histByCurrency[currentCurrency],
                             borderColor: '#F7931A',
                             backgroundColor: 'rgba(247, 147, 26, 0.1)',
                             tension: 0.1,
@@ -692,7 +923,7 @@ def generate_html():
                         }},
                         {{
                             label: 'Loi de Puissance (exposant 5.6)',
-                            data: {json.dumps(result['power_points'])},
+                            data: powerByCurrency[currentCurrency],
                             borderColor: '#FF6B35',
                             backgroundColor: 'transparent',
                             tension: 0.1,
@@ -707,140 +938,93 @@ def generate_html():
                     maintainAspectRatio: false,
                     scales: {{
                         x: {{ type: 'linear', ticks: {{ color: '#fff' }}, grid: {{ color: 'rgba(255,255,255,0.1)' }}, title: {{ display: true, text: 'Année', color: '#fff' }} }},
-                        y: {{ type: 'linear', ticks: {{ color: '#fff' }}, grid: {{ color: 'rgba(255,255,255,0.1)' }}, title: {{ display: true, text: 'Prix BTC (€)', color: '#fff' }}, beginAtZero: true }}
+                        y: {{ type: 'linear', ticks: {{ color: '#fff' }}, grid: {{ color: 'rgba(255,255,255,0.1)' }}, title: {{ display: true, text: `Prix BTC (${{CURRENCIES[currentCurrency]}})`, color: '#fff' }}, beginAtZero: true }}
                     }},
                     plugins: {{ legend: {{ labels: {{ color: '#fff' }} }} }}
                 }}
             }});
-            // 2b. Tenter une première mise à jour complète (compteurs + graphiques)
-            await updateData();
-            //animateCounter('totalEurosCounter', {result['total_euros_past']}, 3000, ' €');
-            //animateCounter('btcCounter', {result['france_btc_past']}, 3000, ' BTC');
-            //animateCounter('priceCounter', {result['price_eur']}, 2000, ' €');
-            //animateCounter('blocksCounter', {result['initial_blocks']}, 2000, '');
-            //animateCounter('mwhCounter', initialMw, 2000, ' MW');
-            
-            // 3. Puis mise à jour toutes les 10 minutes (déjà en place)
-            setInterval(updateData, 600000);
-
-            // 4. Initialisation de la simulation (si le panneau est ouvert)
-            updateSimulation();
-        }};
-         // Initialisation
-        //window.onload = async () => {{
-        //    // 1. Animation initiale avec les données Python (fallback)
-        //    const initialShare = 0.10;
-        //    const initialMw = {result['initial_total_mw']} * initialShare;
-        //    
-        //    document.getElementById('totalEurosCounter').textContent = '0';
-        //    document.getElementById('btcCounter').textContent = '0';
-        //    document.getElementById('priceCounter').textContent = '0';
-        //    document.getElementById('blocksCounter').textContent = '0';
-        //    document.getElementById('mwhCounter').textContent = '0';
-        //    
-        //    animateCounter('totalEurosCounter', {result['total_euros_past']}, 3000, ' €');
-        //    animateCounter('btcCounter', {result['france_btc_past']}, 3000, ' BTC');
-        //    animateCounter('priceCounter', {result['price_eur']}, 2000, ' €');
-        //    animateCounter('blocksCounter', {result['initial_blocks']}, 2000, '');
-        //    animateCounter('mwhCounter', initialMw, 2000, ' MW');
-
-        //    // 2. Graphique initial avec données Python
-        //    const ctx = document.getElementById('powerLawChart').getContext('2d');
-        //    window.powerLawChart = new Chart(ctx, {{
-        //        type: 'line',
-        //        data: {{
-        //            datasets: [
-        //                {{
-        //                    label: 'Prix Historique (EUR)',
-        //                    data: {json.dumps(result['hist_points'])},
-        //                    borderColor: '#F7931A',
-        //                    backgroundColor: 'rgba(247, 147, 26, 0.1)',
-        //                    tension: 0.1,
-        //                    pointRadius: 0,
-        //                    fill: false
-        //                }},
-        //                {{
-        //                    label: 'Loi de Puissance (exposant 5.6)',
-        //                    data: {json.dumps(result['power_points'])},
-        //                    borderColor: '#FF6B35',
-        //                    backgroundColor: 'transparent',
-        //                    tension: 0.1,
-        //                    pointRadius: 0,
-        //                    fill: false,
-        //                    borderDash: [5, 5]
-        //                }}
-        //             ]
-        //         }},
-        //         options: {{
-        //             responsive: true,
-        //             maintainAspectRatio: false,
-        //             scales: {{
-        //                x: {{ type: 'linear', ticks: {{ color: '#fff' }}, grid: {{ color: 'rgba(255,255,255,0.1)' }}, title: {{ display: true, text: 'Année', color: '#fff' }} }},
-        //                y: {{ type: 'linear', ticks: {{ color: '#fff' }}, grid: {{ color: 'rgba(255,255,255,0.1)' }}, title: {{ display: true, text: 'Prix BTC (€)', color: '#fff' }}, beginAtZero: true }}
-        //             }},
-        //             plugins: {{ legend: {{ labels: {{ color: '#fff' }} }} }}
-        //         }}
-        //     }});
-
-        //     // 3. MISE À JOUR IMMÉDIATE AU CHARGEMENT
-        //     await updateData();  // Rafraîchit tout : bloc, prix, hash rate, graphiques
-
-        //     // 4. Puis mise à jour toutes les 10 minutes
-        //     setInterval(updateData, 600000);
-        // }};
-
-        // Fonction mise à jour (inchangée, sauf qu'elle met à jour le graphique aussi)
-        async function updateData() {{
-            try {{
-                const [heightRes, priceRes, hrRes] = await Promise.all([
-                    fetch('https://blockstream.info/api/blocks/tip/height'),
-                    fetch('https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=eur'),
-                    fetch('https://api.blockchain.info/charts/hash-rate?format=json&cors=true')
-                ]);
+            // Bascule vers le canvas seulement une fois le graphique construit
+            canvas.hidden = false;
+            document.getElementById('powerLawChartSvg').remove();
+        }}
 
-                const newHeight = parseInt(await heightRes.text());
-                const priceData = await priceRes.json();
-                const newPrice = priceData.bitcoin.eur;
-                const hashData = await hrRes.json();
-                const hr_ths = hashData.values[hashData.values.length - 1].y;
-                const eff = 30;
-                const total_mw = (hr_ths * eff) / 1000000;
-                const newBlocks = newHeight - {result['start_block']};
-
-                // Mise à jour des compteurs
-                updateAllCounters(newHeight, newPrice, newBlocks, total_mw);
-
-                // Mise à jour du graphique de loi de puissance
-                const currentDays = daysSinceGenesis();
-                const A = newPrice / Math.pow(currentDays, {result['exponent']});
-                const powerPoints = [];
-                for (let i = 0; i <= 5 * 365; i += 30) {{
-                    const day = currentDays + i;
-                    const year = 2009 + (day / 365.25);
-                    const price = A * Math.pow(day, {result['exponent']});
-                    powerPoints.push({{x: year, y: price}});
+        // Service Worker : coquille servie depuis le cache ; réponses API du cache, puis données revalidées
+        if ('serviceWorker' in navigator && location.protocol !== 'file:') {{
+            window.addEventListener('load', () => navigator.serviceWorker.register('sw.js'));
+            navigator.serviceWorker.addEventListener('message', e => {{
+                const msg = e.data;
+                if (!msg || msg.type !== 'donnees-rafraichies') return;
+                if (msg.url.includes('/blocks/tip/height')) {{
+                    applyDelta({{h: parseInt(msg.body)}});
+                }} else if (msg.url.includes('/simple/price')) {{
+                    applyDelta({{p: JSON.parse(msg.body).bitcoin}});
                 }}
+            }});
+        }}
 
-                // Mettre à jour le dataset
-                window.powerLawChart.data.datasets[1].data = powerPoints;
-                window.powerLawChart.update('quiet');
+        // Applique un delta {{h: hauteur, p: {{devise: prix}}, mw: puissance moyenne}} (SSE ou interrogation)
+        function applyDelta(delta) {{
+            // Nouvelles ancres de l'extrapolation, rejointes en douceur par les compteurs
+            reconcile(now => {{
+                if (delta.h) {{
+                    lastHeight = delta.h;
+                    heightTime = now;
+                }}
+                if (delta.p) {{
+                    Object.assign(lastPrices, delta.p);
+                    priceTime = now;
+                }}
+                if (delta.mw) lastTotalMw = delta.mw;
+            }});
 
-                // Mettre à jour la simulation si ouverte
-                if (typeof updateSimulation === 'function') {{
-                    A_POWER_LAW = newPrice / Math.pow(getDaysFromGenesis(2025), parseFloat(document.getElementById('exponentSlider')?.value || 5.6));
-                    updateSimulation();
+            if (delta.p) {{
+                // Mettre à jour la loi de puissance de la devise affichée (si le graphique est déjà créé)
+                if (window.powerLawChart) {{
+                    window.powerLawChart.data.datasets[1].data = powerLawPoints(lastPrices[currentCurrency]);
+                    window.powerLawChart.update('quiet');
                 }}
 
-                document.getElementById('updateText').textContent = `Dernière mise à jour: ${{new Date().toLocaleString('fr-FR')}}`;
+                // Mettre à jour la simulation seulement si elle est ouverte (toujours en euros)
+                if (simulationOpen && simulationModule) showSimulation();
+            }}
 
-                lastHeight = newHeight;
-                lastPrice = newPrice;
-                lastTotalMw = total_mw;
+            document.getElementById('updateText').textContent = `Dernière mise à jour: ${{new Date().toLocaleString('fr-FR')}}`;
+        }}
 
+        // Interrogation directe des API (toutes les devises en une seule requête)
+        async function updateData() {{
+            try {{
+                const [heightRes, priceRes] = await Promise.all([
+                    fetch('{ESPLORA_URL}/blocks/tip/height'),
+                    fetch(`{COINGECKO_URL}/simple/price?ids=bitcoin&vs_currencies=${{Object.keys(CURRENCIES).join(',')}}`)
+                ]);
+                applyDelta({{h: parseInt(await heightRes.text()), p: (await priceRes.json()).bitcoin}});
             }} catch (e) {{
                 console.error('Erreur mise à jour:', e);
             }}
         }}
+
+        // Interrogation toutes les 10 minutes, seulement quand le flux SSE est indisponible
+        let pollTimer = null;
+        function startPolling() {{
+            if (pollTimer) return;
+            updateData();
+            pollTimer = setInterval(updateData, {POLL_INTERVAL_MS});
+        }}
+        function stopPolling() {{
+            clearInterval(pollTimer);
+            pollTimer = null;
+        }}
+
+        // Flux poussé par le serveur (python diffusion.py) ; absent en hébergement statique -> interrogation
+        function subscribeEvents() {{
+            if (!('EventSource' in window) || location.protocol === 'file:') return false;
+            const source = new EventSource('evenements');
+            source.addEventListener('delta', e => applyDelta(JSON.parse(e.data)));
+            source.onopen = stopPolling;
+            source.onerror = startPolling;
+            return true;
+        }}
         
         // Fonction pour calculer les jours depuis genèse
         function daysSinceGenesis() {{
@@ -867,219 +1051,19 @@ def generate_html():
                 }}, 5000);
             }});
         }});
-        // Paramètres de simulation
-        const GENESIS_DATE = new Date(2009, 0, 3);  // 3 janv 2009
-        const CURRENT_HASH_EH_S = 1000;  // Hash global actuel (EH/s)
-        const BASE_FRENCH_HASH_EH_S = 55.6;   // Pour 1 GW à 18 J/TH
-        const BLOCKS_PER_DAY = 144;
-        const DAYS_PER_YEAR = 365.25;
-        const FEES_PER_BLOCK = 0.022;
-        let A_POWER_LAW = {result['A']};  // Calibré initialement
-        let ANNUAL_GROWTH_RATE = 1.5;  // 50% initial
-        let FRENCH_HASH_EH_S = BASE_FRENCH_HASH_EH_S * 1;  // Initial pour 1 GW
-        
-        let priceChart, revenueChart, cumulativeChart;
-        
-        // Halving approx avril 2028 (jour 121 de l'année)
-        function getAverageReward(year) {{
-            if (year < 2028) {{
-                return 3.125 + FEES_PER_BLOCK;
-            }} else if (year < 2032) {{
-                if (year === 2028) {{
-                    // Moyenne 2028 : ~121 jours à 3.125, reste à 1.5625
-                    const full_reward_days = 121 / DAYS_PER_YEAR;
-                    return (3.125 * full_reward_days + 1.5625 * (1 - full_reward_days)) + FEES_PER_BLOCK;
-                }}
-                return 1.5625 + FEES_PER_BLOCK;
-            }}
-            return 0.78125 + FEES_PER_BLOCK;  // Post-2032
-        }}
-        
-        function getDaysFromGenesis(year) {{
-            const midDate = new Date(year, 6, 1);  // 1er juillet
-            const diffTime = midDate - GENESIS_DATE;
-            return Math.floor(diffTime / (1000 * 60 * 60 * 24));
-        }}
-        
-        function getBTCPrice(days, exponent) {{
-            return A_POWER_LAW * Math.pow(days, exponent);
-        }}
-        
-        // Mise à jour des sliders avec appel dynamique à updateSimulation
-        document.getElementById('gwSlider').oninput = function() {{
-            document.getElementById('gwValue').textContent = this.value;
-            updateSimulation();
-        }};
-        document.getElementById('exponentSlider').oninput = function() {{
-            document.getElementById('exponentValue').textContent = this.value;
-            updateSimulation();
-        }};
-        document.getElementById('growthSlider').oninput = function() {{
-            document.getElementById('growthValue').textContent = this.value;
-            updateSimulation();
-        }};
 
-        
-        function updateSimulation() {{
-            const gw = parseFloat(document.getElementById('gwSlider').value);
-            const exponent = parseFloat(document.getElementById('exponentSlider').value);
-            ANNUAL_GROWTH_RATE = 1 + (parseFloat(document.getElementById('growthSlider').value) / 100);
-            FRENCH_HASH_EH_S = BASE_FRENCH_HASH_EH_S * gw;
-            
-            // Recalculer A si exposant change (calibré sur prix actuel ~123000 USD)
-            const currentDays = getDaysFromGenesis(2025);
-            const currentPrice = {result['price_eur']};
-            A_POWER_LAW = currentPrice / Math.pow(currentDays, exponent);
-            
-            // Calcul des données
-            const years = [2026, 2027, 2028, 2029, 2030, 2031, 2032];
-            let simulationData = [];
-            let cumulativeRevenueEur = 0;
-            
-            years.forEach(year => {{
-                const days = getDaysFromGenesis(year);
-                const priceEur = getBTCPrice(days, exponent);
-                const hashYear = CURRENT_HASH_EH_S * Math.pow(ANNUAL_GROWTH_RATE, year - 2026);
-                const hashPct = (FRENCH_HASH_EH_S / hashYear) * 100;
-                const avgReward = getAverageReward(year);
-                const totalBTCEmittedYear = avgReward * BLOCKS_PER_DAY * DAYS_PER_YEAR;
-                const btcMined = (hashPct / 100) * totalBTCEmittedYear;
-                const revenueEur = btcMined * priceEur;
-                
-                cumulativeRevenueEur += revenueEur;
-                
-                simulationData.push({{
-                    year: year,
-                    priceEur: priceEur,
-                    hashPct: hashPct,
-                    btcMined: btcMined,
-                    revenueEur: revenueEur,
-                    cumulativeEur: cumulativeRevenueEur
-                }});
-            }});
-            
-            // Génération du tableau
-            let tableHTML = `
-                <table>
-                    <thead>
-                        <tr>
-                            <th>Année</th>
-                            <th>Prix BTC (€)</th>
-                            <th>% Hash FR</th>
-                            <th>BTC Minés</th>
-                            <th>Revenus Annuels (M €)</th>
-                            <th>Revenus Cumulés (M €)</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-            `;
-            simulationData.forEach(row => {{
-                tableHTML += `
-                    <tr>
-                        <td>${{row.year}}</td>
-                        <td>${{Math.round(row.priceEur).toLocaleString()}}</td>
-                        <td>${{row.hashPct.toFixed(3)}} %</td>
-                        <td>${{Math.round(row.btcMined).toLocaleString()}}</td>
-                        <td>${{Math.round(row.revenueEur).toLocaleString()}}</td>
-                        <td>${{Math.round(row.cumulativeEur).toLocaleString()}}</td>
-                    </tr>
-                `;
-            }});
-            tableHTML += `
-                    </tbody>
-                    <tfoot>
-                        <tr style="font-weight: bold;">
-                            <td>Total</td>
-                            <td colspan="2"></td>
-                            <td>${{Math.round(simulationData.reduce((sum, r) => sum + r.btcMined, 0)).toLocaleString()}} BTC</td>
-                            <td colspan="2">${{Math.round(simulationData[simulationData.length - 1].cumulativeEur).toLocaleString()}} M €</td>
-                        </tr>
-                    </tfoot>
-                </table>
-            `;
-            document.getElementById('results-table').innerHTML = tableHTML;
-            
-            // Mise à jour des graphiques
-            if (priceChart) priceChart.destroy();
-            if (revenueChart) revenueChart.destroy();
-            if (cumulativeChart) cumulativeChart.destroy();
-            
-            // Graphique 1: Prix BTC (€)
-            const priceCtx = document.getElementById('priceChart').getContext('2d');
-            priceChart = new Chart(priceCtx, {{
-                type: 'line',
-                data: {{
-                    labels: years.map(y => y.toString()),
-                    datasets: [{{
-                        label: 'Prix BTC (€)',
-                        data: simulationData.map(d => d.priceEur),
-                        borderColor: '#3b82f6',
-                        backgroundColor: 'rgba(59, 130, 246, 0.1)',
-                        fill: true,
-                        tension: 0.1
-                    }}]
-                }},
-                options: {{
-                    responsive: true,
-                    scales: {{
-                        y: {{ beginAtZero: false, title: {{ display: true, text: 'Prix (USD)' }} }},
-                        x: {{ title: {{ display: true, text: 'Année' }} }}
-                    }},
-                    plugins: {{ title: {{ display: true, text: 'Projection du Prix du Bitcoin (Loi de Puissance)' }} }}
-                }}
-            }});
-            
-            // Graphique 2: Revenus Annuels (M €)
-            const revenueCtx = document.getElementById('revenueChart').getContext('2d');
-            revenueChart = new Chart(revenueCtx, {{
-                type: 'bar',
-                data: {{
-                    labels: years.map(y => y.toString()),
-                    datasets: [{{
-                        label: 'Revenus (M €)',
-                        data: simulationData.map(d => d.revenueEur),
-                        backgroundColor: ['#10b981', '#f59e0b', '#ef4444', '#8b5cf6', '#06b6d4']
-                    }}]
-                }},
-                options: {{
-                    responsive: true,
-                    scales: {{
-                        y: {{ beginAtZero: true, title: {{ display: true, text: 'Revenus (M €)' }} }},
-                        x: {{ title: {{ display: true, text: 'Année' }} }}
-                    }},
-                    plugins: {{ title: {{ display: true, text: 'Revenus Annuels Projetés' }} }}
-                }}
-            }});
-            
-            // Graphique 3: Revenus Cumulés (M €)
-            const cumulativeCtx = document.getElementById('cumulativeChart').getContext('2d');
-            cumulativeChart = new Chart(cumulativeCtx, {{
-                type: 'line',
-                data: {{
-                    labels: years.map(y => y.toString()),
-                    datasets: [{{
-                        label: 'Revenus Cumulés (M €)',
-                        data: simulationData.map(d => d.cumulativeEur),
-                        borderColor: '#10b981',
-                        backgroundColor: 'rgba(16, 185, 129, 0.2)',
-                        fill: true,
-                        tension: 0.1
-                    }}]
-                }},
-                options: {{
-                    responsive: true,
-                    scales: {{
-                        y: {{ beginAtZero: true, title: {{ display: true, text: 'Revenus Cumulés (M €)' }} }},
-                        x: {{ title: {{ display: true, text: 'Année' }} }}
-                    }},
-                    plugins: {{ title: {{ display: true, text: 'Projection des Revenus Cumulés' }} }}
-                }}
-            }});
+        // Initialisation : ce script est en fin de <body>, les compteurs démarrent sans attendre
+        // Chart.js (defer, exécuté seulement juste avant DOMContentLoaded)
+        // 1. Compteurs extrapolés dès le chargement, à partir des données embarquées
+        startCounters();
+
+        // 2. Mises à jour poussées par le serveur si disponible, sinon interrogation des API
+        if (!subscribeEvents()) {{
+            startPolling();
         }}
-        
-        // Initialisation
-        updateSimulation();
-    
+
+        // 3. Graphique créé après Chart.js, une fois le navigateur inactif
+        document.addEventListener('DOMContentLoaded', () => whenIdle(initPowerLawChart));
     </script>
 </body>
 </html>
@@ -1087,8 +1071,43 @@ def generate_html():
     
     with open('index.html', 'w', encoding='utf-8') as f:
         f.write(html_content)
+    os.makedirs(os.path.dirname(DEFERRED_CSS_PATH), exist_ok=True)
+    with open(DEFERRED_CSS_PATH, 'w', encoding='utf-8') as f:
+        f.write(DEFERRED_CSS)
+    with open(SIMULATION_JS_PATH, 'w', encoding='utf-8') as f:
+        f.write(SIMULATION_JS)
+    # Service Worker : version de cache dérivée du contenu de la coquille qu'il précache
+    shell_files = ['index.html', DEFERRED_CSS_PATH, SIMULATION_JS_PATH, CHARTJS_VENDOR_PATH]
+    precache_urls = ['./', 'index.html', DEFERRED_CSS_PATH.replace(os.sep, '/'), SIMULATION_JS_PATH.replace(os.sep, '/'),
+                     chartjs_src]
+    with open(SERVICE_WORKER_PATH, 'w', encoding='utf-8') as f:
+        f.write(render_service_worker(precache_urls, content_hash(shell_files)))
     
     print("Fichier index.html généré")
+    if export_dir:
+        manifest = export_build(snapshot, result, export_dir)
+        print(f"Données exportées dans {export_dir}/ ({manifest['format']}, {len(manifest['tables'])} tables)")
 
 if __name__ == "__main__":
-    generate_html()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Génère le compteur Bitcoin France.")
+    parser.add_argument("--build", action="store_true",
+                        help="construit aussi dist/ (fichiers déployables minifiés et précompressés)")
+    parser.add_argument("--serve", action="store_true",
+                        help="construit dist/, le sert et pousse les nouveaux blocs aux pages ouvertes (SSE)")
+    parser.add_argument("--port", type=int, default=8000, help="port du mode --serve")
+    parser.add_argument("--host", default=DEFAULT_HOST,
+                        help=f"interface d'écoute du mode --serve (défaut : {DEFAULT_HOST}, locale uniquement)")
+    parser.add_argument("--export", nargs="?", const=EXPORT_DIR, metavar="DOSSIER",
+                        help=f"exporte aussi les séries calculées en tables colonnaires (défaut : {EXPORT_DIR}/)")
+    args = parser.parse_args()
+    generate_html(args.export)
+    if not args.serve:
+        # Construction ponctuelle : les sources en retard ont encore le temps de remplir le cache
+        late = wait_for_refreshes()
+        if late:
+            print(f"Sources toujours sans réponse à la sortie : {', '.join(late)}")
+    # Le mode serveur ne sert que dist/ (jamais les sources, data/ ni .git/) : il construit d'abord
+    if args.build or args.serve:
+        print_size_report(build_dist())
+    if args.serve:
+        serve(DIST_DIR, args.port, host=args.host)
\ No newline at end of file
@@ -0,0 +1,188 @@
+"""Registre colonnaire local des récompenses par bloc (hauteur, horodatage, subvention, frais).
+
+Chaque colonne est un fichier binaire brut de type fixe, lu par memory-mapping (numpy.memmap) :
+rien n'est chargé en mémoire tant qu'on ne lit pas une plage. Les sommes préfixes de la
+subvention et des frais sont stockées à côté, si bien que le total exact sur n'importe quelle
+plage de hauteurs se calcule en temps constant.
+
+Usage :
+    python registre_blocs.py charger dump.csv   # import initial (height,timestamp,subsidy,fees en sats)
+    python registre_blocs.py mettre-a-jour      # ajout incrémental des nouveaux blocs
+"""
+import json
+import os
+import sys
+from itertools import islice
+
+import numpy as np
+
+BLOCK_STORE_DIR = os.path.join("data", "blocks")
+SATS_PER_BTC = 100_000_000
+HALVING_INTERVAL = 210_000
+
+COLUMNS = {
+    'height': np.int32,
+    'timestamp': np.int64,
+    'subsidy': np.int64,  # sats
+    'fees': np.int64,  # sats
+    'cum_subsidy': np.int64,  # somme préfixe, sats
+    'cum_fees': np.int64,  # somme préfixe, sats
+}
+
+
+def block_subsidy_sat(heights):
+    """Subvention exacte (sats) des blocs aux hauteurs données (vectorisé)."""
+    halvings = np.asarray(heights, dtype=np.int64) // HALVING_INTERVAL
+    return np.where(halvings < 64, (50 * SATS_PER_BTC) >> np.minimum(halvings, 63), 0)
+
+
+class BlockStore:
+    """Registre memory-mappé des blocs contigus [base_height, tip_height]."""
+
+    def __init__(self, path=BLOCK_STORE_DIR):
+        self.path = path
+        self._load()
+
+    def _meta_path(self):
+        return os.path.join(self.path, "meta.json")
+
+    def _column_path(self, name):
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _load(self):
+        """(Re)ouvre les colonnes en memory-mapping, selon le nombre de lignes validé dans meta.json."""
+        try:
+            with open(self._meta_path(), encoding="utf-8") as f:
+                self.count = json.load(f)["count"]
+        except (OSError, ValueError, KeyError):
+            self.count = 0
+        self.columns = {}
+        for name, dtype in COLUMNS.items():
+            if self.count:
+                self.columns[name] = np.memmap(self._column_path(name), dtype=dtype, mode='r', shape=(self.count,))
+            else:
+                self.columns[name] = np.empty(0, dtype=dtype)
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def base_height(self):
+        return int(self.columns['height'][0]) if self.count else None
+
+    @property
+    def tip_height(self):
+        return int(self.columns['height'][-1]) if self.count else None
+
+    def append(self, heights, timestamps, fees, subsidies=None):
+        """Ajoute des blocs en fin de registre (les hauteurs déjà présentes sont ignorées).
+
+        Les hauteurs doivent être contiguës et suivre immédiatement la dernière hauteur stockée.
+        La subvention est calculée d'après la hauteur si elle n'est pas fournie.
+        """
+        heights = np.asarray(heights, dtype=np.int64)
+        order = np.argsort(heights)
+        heights = heights[order]
+        timestamps = np.asarray(timestamps, dtype=np.int64)[order]
+        fees = np.asarray(fees, dtype=np.int64)[order]
+        subsidies = block_subsidy_sat(heights) if subsidies is None else np.asarray(subsidies, dtype=np.int64)[order]
+        if self.count:
+            new = heights > self.tip_height
+            heights, timestamps, fees, subsidies = heights[new], timestamps[new], fees[new], subsidies[new]
+        if not len(heights):
+            return 0
+        expected_start = heights[0] if not self.count else self.tip_height + 1
+        if heights[0] != expected_start or np.any(np.diff(heights) != 1):
+            raise ValueError(f"Hauteurs non contiguës : attendu {expected_start}, reçu {heights[0]}..{heights[-1]}")
+
+        last_subsidy = int(self.columns['cum_subsidy'][-1]) if self.count else 0
+        last_fees = int(self.columns['cum_fees'][-1]) if self.count else 0
+        new_columns = {
+            'height': heights,
+            'timestamp': timestamps,
+            'subsidy': subsidies,
+            'fees': fees,
+            'cum_subsidy': last_subsidy + np.cumsum(subsidies),
+            'cum_fees': last_fees + np.cumsum(fees),
+        }
+        os.makedirs(self.path, exist_ok=True)
+        for name, dtype in COLUMNS.items():
+            with open(self._column_path(name), 'r+b' if self.count else 'wb') as f:
+                # Tronque d'éventuelles lignes d'un ajout interrompu, non validées dans meta.json
+                f.truncate(self.count * np.dtype(dtype).itemsize)
+                f.seek(0, os.SEEK_END)
+                f.write(new_columns[name].astype(dtype).tobytes())
+        # meta.json est écrit en dernier : il valide l'ajout
+        tmp_path = f"{self._meta_path()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"count": self.count + len(heights)}, f)
+        os.replace(tmp_path, self._meta_path())
+        self._load()
+        return len(heights)
+
+    def range_totals(self, start_height, end_height):
+        """Subvention et frais exacts (BTC) des blocs [start_height, end_height) présents dans le registre."""
+        if not self.count:
+            return {'blocks': 0, 'subsidy_btc': 0.0, 'fees_btc': 0.0, 'total_btc': 0.0}
+        lo = min(max(start_height - self.base_height, 0), self.count)
+        hi = min(max(end_height - self.base_height, 0), self.count)
+        if hi <= lo:
+            return {'blocks': 0, 'subsidy_btc': 0.0, 'fees_btc': 0.0, 'total_btc': 0.0}
+
+        def prefix_diff(name):
+            cum = self.columns[name]
+            return int(cum[hi - 1]) - (int(cum[lo - 1]) if lo else 0)
+
+        subsidy = prefix_diff('cum_subsidy')
+        fees = prefix_diff('cum_fees')
+        return {
+            'blocks': hi - lo,
+            'subsidy_btc': subsidy / SATS_PER_BTC,
+            'fees_btc': fees / SATS_PER_BTC,
+            'total_btc': (subsidy + fees) / SATS_PER_BTC,
+        }
+
+
+def open_block_store(path=BLOCK_STORE_DIR):
+    """Ouvre le registre s'il existe et n'est pas vide, sinon None."""
+    store = BlockStore(path)
+    return store if len(store) else None
+
+
+def bulk_load(dump_path, path=BLOCK_STORE_DIR, chunk_rows=100_000):
+    """Importe un dump CSV (height,timestamp,subsidy,fees en sats, avec en-tête), par blocs de lignes."""
+    store = BlockStore(path)
+    with open(dump_path, encoding="utf-8") as f:
+        next(f)  # en-tête
+        while True:
+            lines = list(islice(f, chunk_rows))
+            if not lines:
+                break
+            chunk = np.loadtxt(lines, delimiter=',', dtype=np.int64, ndmin=2)
+            store.append(chunk[:, 0], chunk[:, 1], chunk[:, 3], subsidies=chunk[:, 2])
+    return store
+
+
+def update_block_store(path=BLOCK_STORE_DIR):
+    """Ajoute au registre les blocs minés depuis sa dernière hauteur."""
+    from sources import fetch_block_height, fetch_block_rewards
+
+    store = BlockStore(path)
+    if not len(store):
+        print("Registre vide : importer d'abord un dump (python registre_blocs.py charger dump.csv)")
+        return store
+    tip = fetch_block_height()
+    heights, timestamps, fees = fetch_block_rewards(store.tip_height + 1, tip)
+    added = store.append(heights, timestamps, fees)
+    print(f"{added} bloc(s) ajouté(s), registre jusqu'au bloc {store.tip_height}")
+    return store
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 3 and sys.argv[1] == "charger":
+        store = bulk_load(sys.argv[2])
+        print(f"{len(store)} blocs importés ({store.base_height} à {store.tip_height})")
+    elif len(sys.argv) == 2 and sys.argv[1] == "mettre-a-jour":
+        update_block_store()
+    else:
+        print(__doc__)
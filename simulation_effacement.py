@@ -0,0 +1,221 @@
+"""Simulation horaire d'un minage interruptible, alimenté par les seuls surplus du réseau français.
+
+Le compteur « MW/Jour Nécessaires » suppose une puissance constante ; un minage effaçable ne
+tourne en réalité que pendant les heures de surplus. Ce module rejoue heure par heure un profil
+de surplus (et, s'il est fourni, de prix spot) issu d'un export local de type eCO2mix, sur
+plusieurs années, et calcule pour chaque heure :
+
+    puissance effectivement consommée (MW), part du hash rate mondial, BTC minés
+
+Tout le calcul est vectorisé (numpy) : plusieurs années (8760 heures par an) se simulent en
+quelques millisecondes.
+
+Format du CSV (séparateur ';' ou ',', en-tête obligatoire) :
+    horodatage   'AAAA-MM-JJ HH:MM' ou ISO 8601 ; à défaut, colonnes eCO2mix 'Date' et 'Heures'
+    surplus_mw   puissance excédentaire disponible (MW)
+    prix_eur_mwh prix spot de l'électricité (€/MWh), optionnel
+Les pas infra-horaires (15 ou 30 min, comme dans eCO2mix) sont moyennés par heure. Les heures
+locales sont traitées comme UTC : le décalage est sans effet face à un hash rate journalier.
+Les lignes dont une valeur est vide ou illisible ('ND' d'eCO2mix, pas non encore consolidés)
+et celles sans horodatage valide (pied de tableau) sont ignorées.
+
+Usage :
+    python simulation_effacement.py profil.csv [--capacite-mw 3600] [--efficacite 18] [--prix-max 40]
+"""
+import argparse
+import csv
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from calculs import BLOCKS_PER_DAY, CURRENT_HASH_EH_S, FEES_PER_BLOCK
+from sources import load_hashrate_history, load_price_history
+
+CURTAILMENT_CAPACITY_MW = 3600  # Modulation nucléaire inutilisée estimée (~3.6 GW, cf. page)
+FLEET_EFFICIENCY_J_TH = 18.0  # Machines récentes (cohérent avec BASE_FRENCH_HASH_EH_S)
+BLOCKS_PER_HOUR = BLOCKS_PER_DAY / 24
+
+# Dates des halvings (le dernier est estimé, comme dans get_average_reward)
+HALVING_TIMESTAMPS = np.array([
+    datetime(2012, 11, 28, tzinfo=timezone.utc).timestamp(),
+    datetime(2016, 7, 9, tzinfo=timezone.utc).timestamp(),
+    datetime(2020, 5, 11, tzinfo=timezone.utc).timestamp(),
+    datetime(2024, 4, 20, tzinfo=timezone.utc).timestamp(),
+    datetime(2028, 5, 1, tzinfo=timezone.utc).timestamp(),
+    datetime(2032, 5, 1, tzinfo=timezone.utc).timestamp(),
+])
+
+
+# Positions des chiffres dans 'AAAA-MM-JJTHH:MM'
+STAMP_DIGITS = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15]
+
+
+def parse_timestamps(stamps):
+    """Horodatages 'AAAA-MM-JJ HH:MM' (ou ISO 8601) -> secondes unix ; les valeurs illisibles donnent NaT."""
+    stamps = np.char.replace(np.char.strip(np.asarray(stamps, dtype=str)), ' ', 'T').astype('U16')
+    chars = stamps.view('U1').reshape(len(stamps), 16)
+    valid = (np.char.isdigit(chars[:, STAMP_DIGITS]).all(axis=1) & (chars[:, 4] == '-') & (chars[:, 7] == '-')
+             & (chars[:, 10] == 'T') & (chars[:, 13] == ':'))
+    return np.where(valid, stamps, 'NaT').astype('datetime64[m]').astype('datetime64[s]')
+
+
+def to_float(value):
+    """Nombre d'une cellule, NaN si elle est vide ou illisible ('ND' d'eCO2mix, texte de pied de tableau)."""
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+def parse_numbers(values):
+    """Nombres à virgule ou à point -> float ; les cellules vides ou illisibles donnent NaN."""
+    values = np.char.replace(np.char.strip(np.asarray(values, dtype=str)), ',', '.')
+    try:
+        return values.astype(np.float64)  # Chemin rapide : colonne entièrement numérique
+    except ValueError:
+        return np.fromiter((to_float(v) for v in values.tolist()), dtype=np.float64, count=len(values))
+
+
+def load_surplus_profile(path):
+    """Charge un profil eCO2mix-style ; retourne (timestamps horaires, surplus MW, prix €/MWh ou None)."""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        rows = csv.DictReader(f, delimiter=';' if sample.count(';') > sample.count(',') else ',')
+        columns = {name.strip().lower(): name for name in rows.fieldnames or []}
+        if 'surplus_mw' not in columns:
+            raise ValueError(f"Colonne surplus_mw absente de {path}")
+        stamps, surplus, prices = [], [], []
+        for row in rows:
+            # Lignes courtes (pied de tableau) : les champs absents valent None
+            if 'horodatage' in columns:
+                stamps.append(row[columns['horodatage']] or '')
+            else:
+                stamps.append(f"{row[columns['date']] or ''} {row[columns['heures']] or ''}")
+            surplus.append(row[columns['surplus_mw']] or '')
+            if 'prix_eur_mwh' in columns:
+                prices.append(row[columns['prix_eur_mwh']] or '')
+
+    # Conversion vectorisée (décalage horaire ignoré), puis abandon des lignes incomplètes
+    timestamps = parse_timestamps(stamps)
+    surplus = parse_numbers(surplus)
+    prices = parse_numbers(prices) if prices else None
+    keep = ~np.isnat(timestamps) & np.isfinite(surplus)
+    if prices is not None:
+        keep &= np.isfinite(prices)
+    if not keep.any():
+        raise ValueError(f"Aucune ligne exploitable dans {path}")
+    prices = prices[keep] if prices is not None else None
+    return hourly_means(timestamps[keep].astype(np.int64), surplus[keep], prices)
+
+
+def hourly_means(timestamps, surplus, prices=None):
+    """Moyenne par heure des pas infra-horaires ; les séries sortent triées par heure."""
+    hours, index = np.unique(np.asarray(timestamps) // 3600, return_inverse=True)
+    counts = np.bincount(index)
+    surplus = np.bincount(index, weights=surplus) / counts
+    if prices is not None:
+        prices = np.bincount(index, weights=prices) / counts
+    return hours * 3600, surplus, prices
+
+
+def block_reward_btc(timestamps):
+    """Récompense moyenne par bloc (subvention + frais) à chaque instant (vectorisé)."""
+    halvings = np.searchsorted(HALVING_TIMESTAMPS, np.asarray(timestamps, dtype=np.float64), side='right')
+    return 50.0 / 2.0 ** halvings + FEES_PER_BLOCK
+
+
+def network_hash_ths(timestamps, hashrate_history=None):
+    """Hash rate mondial (TH/s) à chaque heure : historique local interpolé, sinon CURRENT_HASH_EH_S."""
+    hr_timestamps, hr_values = hashrate_history if hashrate_history is not None else load_hashrate_history()
+    if not len(hr_timestamps):
+        return np.full(len(timestamps), CURRENT_HASH_EH_S * 1e6)
+    # Au-delà de l'historique, np.interp prolonge la dernière valeur connue
+    return np.interp(timestamps, hr_timestamps, hr_values)
+
+
+def simulate_curtailment(timestamps, surplus_mw, electricity_prices=None, capacity_mw=CURTAILMENT_CAPACITY_MW,
+                         efficiency_j_th=FLEET_EFFICIENCY_J_TH, max_price_eur_mwh=None, hashrate_history=None,
+                         price_history=None):
+    """Simule heure par heure une flotte effaçable de capacity_mw MW qui ne consomme que les surplus.
+
+    La flotte tourne à min(surplus, capacité) ; avec max_price_eur_mwh, elle s'efface aussi
+    quand le prix spot dépasse ce seuil. Son hash rate s'ajoute au hash rate mondial de
+    l'heure. Retourne un dict de séries horaires (tableaux numpy) ; 'revenue_eur' est None
+    sans historique local du prix du BTC.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    used_mw = np.clip(np.asarray(surplus_mw, dtype=np.float64), 0.0, capacity_mw)
+    if max_price_eur_mwh is not None and electricity_prices is not None:
+        used_mw = np.where(electricity_prices <= max_price_eur_mwh, used_mw, 0.0)
+
+    fleet_ths = used_mw * 1e6 / efficiency_j_th
+    network_ths = network_hash_ths(timestamps, hashrate_history)
+    hash_share = fleet_ths / (network_ths + fleet_ths)
+    btc = hash_share * block_reward_btc(timestamps) * BLOCKS_PER_HOUR
+
+    if price_history is None:
+        price_history = load_price_history('eur')
+    revenue_eur = None
+    if len(price_history):
+        revenue_eur = btc * np.interp(timestamps * 1000.0, price_history[:, 0], price_history[:, 1])
+    return {
+        'timestamps': timestamps,
+        'used_mw': used_mw,
+        'hash_share': hash_share,
+        'btc': btc,
+        'revenue_eur': revenue_eur,
+        'electricity_cost_eur': used_mw * electricity_prices if electricity_prices is not None else None,
+    }
+
+
+def summarize_by_year(result):
+    """Agrège les séries horaires par année civile (heures de marche, TWh, MW moyens, part, BTC, euros)."""
+    years = result['timestamps'].astype('datetime64[s]').astype('datetime64[Y]').astype(np.int64) + 1970
+    unique_years, index = np.unique(years, return_inverse=True)
+    hours = np.bincount(index)
+    energy_mwh = np.bincount(index, weights=result['used_mw'])
+    running = np.bincount(index, weights=result['used_mw'] > 0)
+    share = np.bincount(index, weights=result['hash_share'])
+    btc = np.bincount(index, weights=result['btc'])
+    revenue = np.bincount(index, weights=result['revenue_eur']) if result['revenue_eur'] is not None else None
+    cost = (np.bincount(index, weights=result['electricity_cost_eur'])
+            if result['electricity_cost_eur'] is not None else None)
+    rows = []
+    for i, year in enumerate(unique_years):
+        rows.append({
+            'year': int(year),
+            'hours': int(hours[i]),
+            'running_hours': int(running[i]),
+            'energy_twh': energy_mwh[i] / 1e6,
+            'average_mw': energy_mwh[i] / hours[i],
+            'hash_pct': share[i] / hours[i] * 100,
+            'btc_mined': btc[i],
+            'revenue_eur': revenue[i] if revenue is not None else None,
+            'electricity_cost_eur': cost[i] if cost is not None else None,
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simule heure par heure un minage alimenté par les surplus.")
+    parser.add_argument("profil", help="CSV horaire de surplus (colonnes horodatage, surplus_mw[, prix_eur_mwh])")
+    parser.add_argument("--capacite-mw", type=float, default=CURTAILMENT_CAPACITY_MW)
+    parser.add_argument("--efficacite", type=float, default=FLEET_EFFICIENCY_J_TH, help="efficacité des machines (J/TH)")
+    parser.add_argument("--prix-max", type=float, help="prix spot au-delà duquel la flotte s'efface (€/MWh)")
+    args = parser.parse_args()
+
+    hours, surplus, electricity_prices = load_surplus_profile(args.profil)
+    started = time.perf_counter()
+    result = simulate_curtailment(hours, surplus, electricity_prices, args.capacite_mw, args.efficacite,
+                                  args.prix_max)
+    rows = summarize_by_year(result)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    print(f"{'Année':<7}{'Heures':>8}{'En marche':>11}{'TWh':>8}{'MW moy.':>9}{'Part %':>8}{'BTC':>10}{'M€':>9}")
+    for row in rows:
+        revenue = f"{row['revenue_eur'] / 1e6:>9.1f}" if row['revenue_eur'] is not None else f"{'-':>9}"
+        print(f"{row['year']:<7}{row['hours']:>8}{row['running_hours']:>11}{row['energy_twh']:>8.2f}"
+              f"{row['average_mw']:>9.0f}{row['hash_pct']:>8.3f}{row['btc_mined']:>10.1f}{revenue}")
+    print(f"{len(hours)} heures simulées en {elapsed_ms:.1f} ms")
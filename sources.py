@@ -0,0 +1,534 @@
+"""Fournisseurs de données réseau (Blockstream, CoinGecko, Blockchain.info).
+
+requests n'est importé qu'au premier appel réseau : importer ce module reste léger.
+La dernière valeur valide de chaque source est conservée sur disque (data/last_good.json)
+et servie si la source ne répond pas avant l'échéance (stale-while-revalidate).
+
+Usage :
+    python sources.py remplir-prix   # reconstruit l'historique des prix des devises sans historique local
+"""
+import json
+import os
+import sys
+import threading
+import time
+from datetime import date, datetime
+
+from calculs import CURRENCY_SYMBOLS, START_TS_2018, merge_series
+
+# Historique local du hash rate (timestamps unix en s, hash rate en TH/s)
+HASHRATE_HISTORY_PATH = os.path.join("data", "hashrate_history.json")
+# Historique local des prix journaliers, un fichier par devise (timestamps en ms, prix)
+PRICE_HISTORY_PATH = os.path.join("data", "price_history_{currency}.json")
+# Reprise d'un remplissage initial interrompu : fenêtres déjà récupérées, par devise
+PRICE_BACKFILL_PATH = os.path.join("data", "price_backfill_{currency}.json")
+# Dernière valeur valide par source : {source: {'value': ..., 'fetched_at': ts}}
+LAST_GOOD_PATH = os.path.join("data", "last_good.json")
+HTTP_TIMEOUT_S = 10
+# API amont ; remplaçables par des instances locales (ex. banc de charge)
+ESPLORA_URL = "https://blockstream.info/api"
+COINGECKO_URL = "https://api.coingecko.com/api/v3"
+BLOCKCHAIN_INFO_URL = "https://api.blockchain.info"
+# Fournisseurs de secours (voir fournisseurs.py)
+MEMPOOL_URL = "https://mempool.space/api"
+BLOCKCHAIN_COM_URL = "https://blockchain.info"
+KRAKEN_URL = "https://api.kraken.com"
+REFRESH_DEADLINE_S = 5.0
+CONFIRM_MARGIN_S = 0.5  # Une réponse non confirmée est rendue avant l'échéance, pour battre le cache
+PENDING_REFRESH_WAIT_S = 30.0  # Attente maximale, avant de quitter, des sources en retard
+
+# Remplissage initial de l'historique des prix : fenêtres récupérées en parallèle sous limite de débit.
+# Au-delà de 90 jours, CoinGecko renvoie des points journaliers (horaires en dessous).
+BACKFILL_WINDOW_DAYS = 365
+BACKFILL_WORKERS = 4
+BACKFILL_RETRIES = 3
+COINGECKO_RATE_PER_S = 0.5  # Limite prudente de l'API publique (~30 appels/min)
+COINGECKO_BURST = 5
+
+# Valeurs par défaut (sans cache) et date à laquelle elles étaient justes
+FALLBACK_TS = 1759104000  # 29/09/2025
+FALLBACKS = {
+    'block_height': (916944, FALLBACK_TS),
+    'prices': ({'eur': 97304}, FALLBACK_TS),
+    'hash_rate_ths': (600000000, FALLBACK_TS),  # approx 600 EH/s = 6e8 TH/s
+    'price_histories': ({'eur': [[1514764800000, 10000], [1735689600000, 88266]]}, None),  # Dummy (2018, 2025)
+}
+
+_last_good_lock = threading.Lock()
+_pending_refreshes = []  # Threads de rafraîchissement lancés par refresh_sources
+
+
+class TokenBucket:
+    """Limiteur de débit partagé entre threads : `rate` jetons par seconde, au plus `capacity` d'avance."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bloque jusqu'à obtenir un jeton."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# Tous les appels d'historique CoinGecko passent par le même limiteur
+coingecko_limiter = TokenBucket(COINGECKO_RATE_PER_S, COINGECKO_BURST)
+
+
+def _get(url):
+    """GET HTTP avec timeout (import paresseux de requests)."""
+    import requests
+
+    response = requests.get(url, timeout=HTTP_TIMEOUT_S)
+    response.raise_for_status()
+    return response
+
+
+def fetch_block_height(base_url=None):
+    """Hauteur de bloc actuelle via Esplora/Blockstream (lève une exception en cas d'échec)."""
+    return int(_get(f"{base_url or ESPLORA_URL}/blocks/tip/height").text)
+
+
+def fetch_prices(currencies=tuple(CURRENCY_SYMBOLS)):
+    """Prix actuel du BTC dans toutes les devises en une seule requête CoinGecko, {devise: prix}.
+
+    Lève une exception en cas d'échec ou si l'euro manque à la réponse.
+    """
+    url = f"{COINGECKO_URL}/simple/price?ids=bitcoin&vs_currencies={','.join(currencies)}"
+    quotes = _get(url).json()["bitcoin"]
+    prices = {code: quotes[code] for code in currencies if code in quotes}
+    if 'eur' not in prices:
+        raise ValueError("Prix en EUR absent de la réponse")
+    return prices
+
+
+def fetch_hash_rate_ths():
+    """Hash rate actuel en TH/s via Blockchain.info (lève une exception en cas d'échec)."""
+    return _get(f"{BLOCKCHAIN_INFO_URL}/charts/hash-rate?format=json").json()['values'][-1]['y']
+
+
+def fetch_block_height_mempool():
+    """Hauteur de bloc actuelle via mempool.space (API compatible Esplora)."""
+    return fetch_block_height(MEMPOOL_URL)
+
+
+def fetch_block_height_blockchain_info():
+    """Hauteur de bloc actuelle via Blockchain.com."""
+    return int(_get(f"{BLOCKCHAIN_COM_URL}/q/getblockcount").text)
+
+
+def fetch_prices_blockchain_info(currencies=tuple(CURRENCY_SYMBOLS)):
+    """Prix actuel du BTC dans toutes les devises en une requête Blockchain.com, {devise: prix}."""
+    ticker = _get(f"{BLOCKCHAIN_COM_URL}/ticker").json()
+    prices = {code: ticker[code.upper()]['last'] for code in currencies if code.upper() in ticker}
+    if 'eur' not in prices:
+        raise ValueError("Prix en EUR absent de la réponse")
+    return prices
+
+
+def fetch_hash_rate_mempool():
+    """Hash rate actuel en TH/s via mempool.space (moyenne sur 3 jours, fournie en H/s)."""
+    return _get(f"{MEMPOOL_URL}/v1/mining/hashrate/3d").json()['currentHashrate'] / 1e12
+
+
+def fetch_prices_kraken(currencies=tuple(CURRENCY_SYMBOLS)):
+    """Prix actuel du BTC (dernière transaction) dans toutes les devises en une requête Kraken, {devise: prix}."""
+    pairs = ','.join(f"XBT{code.upper()}" for code in currencies)
+    response = _get(f"{KRAKEN_URL}/0/public/Ticker?pair={pairs}").json()
+    if response.get('error'):
+        raise ValueError(f"Erreur Kraken : {response['error']}")
+    # Clés de paires hétérogènes ('XXBTZEUR', 'XBTCHF') : la devise est le suffixe
+    prices = {code: float(ticker['c'][0]) for name, ticker in response['result'].items()
+              for code in currencies if name.endswith(code.upper())}
+    if 'eur' not in prices:
+        raise ValueError("Prix en EUR absent de la réponse")
+    return prices
+
+
+def fetch_hash_rate_difficulty():
+    """Hash rate actuel en TH/s déduit de la difficulté du dernier bloc (Esplora) : D × 2^32 / 600 s."""
+    return _get(f"{ESPLORA_URL}/blocks").json()[0]['difficulty'] * 2 ** 32 / 600 / 1e12
+
+
+def fetch_historical_prices(current_date, currency='eur', from_ts=START_TS_2018, to_ts=None):
+    """Prix BTC dans une devise sur [from_ts, to_ts], [[ts_ms, prix], ...] (lève une exception en cas d'échec).
+
+    to_ts vaut par défaut le début de current_date. L'appel attend un jeton de coingecko_limiter.
+    """
+    if to_ts is None:
+        to_ts = int(time.mktime(current_date.timetuple()))
+    coingecko_limiter.acquire()
+    url = (f"{COINGECKO_URL}/coins/bitcoin/market_chart/range"
+           f"?vs_currency={currency}&from={from_ts}&to={to_ts}")
+    return _get(url).json()['prices']
+
+
+def fetch_block_rewards(from_height, to_height):
+    """Horodatage et frais (sats) des blocs [from_height, to_height] via mempool.space, 15 blocs par requête."""
+    import numpy as np
+
+    blocks = {}
+    height = to_height
+    while height >= from_height:
+        for block in _get(f"{MEMPOOL_URL}/v1/blocks/{height}").json():
+            if block['height'] >= from_height:
+                blocks[block['height']] = (block['timestamp'], block['extras']['totalFees'])
+        height -= 15
+    heights = np.array(sorted(blocks), dtype=np.int64)
+    timestamps = np.array([blocks[h][0] for h in heights.tolist()], dtype=np.int64)
+    fees = np.array([blocks[h][1] for h in heights.tolist()], dtype=np.int64)
+    return heights, timestamps, fees
+
+
+def load_last_good(path=LAST_GOOD_PATH):
+    """Charge les dernières valeurs valides par source."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def store_last_good(name, value, fetched_at, path=LAST_GOOD_PATH):
+    """Enregistre la dernière valeur valide d'une source (écriture atomique, sûre entre threads)."""
+    with _last_good_lock:
+        cache = load_last_good(path)
+        cache[name] = {'value': value, 'fetched_at': fetched_at}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+
+def _start_refresh(name, fetch, persist, path):
+    """Lance la récupération d'une source dans un thread démon ; le résultat est persisté dès son arrivée."""
+    holder = {}
+
+    def run():
+        try:
+            value = fetch()
+        except Exception as e:
+            print(f"Erreur lors de la récupération de {name} : {e}")
+            return
+        fetched_at = int(time.time())
+        if persist:
+            store_last_good(name, value, fetched_at, path)
+        holder['fetched_at'] = fetched_at
+        holder['value'] = value
+
+    thread = threading.Thread(target=run, name=f"refresh-{name}", daemon=True)
+    thread.start()
+    _pending_refreshes.append(thread)
+    return thread, holder
+
+
+def refresh_sources(fetchers, deadline=REFRESH_DEADLINE_S, path=LAST_GOOD_PATH, transient=()):
+    """Interroge toutes les sources en parallèle et attend au plus `deadline` secondes.
+
+    Retourne {source: {'value', 'fetched_at', 'fresh'}} : valeur fraîche si la source a répondu
+    à temps, sinon dernière valeur valide du cache (None si aucune). Les sources en retard
+    continuent en arrière-plan et mettent le cache à jour si elles finissent par répondre.
+    Les sources de `transient` ne passent pas par le cache (elles ont leur propre stockage).
+    """
+    cache = load_last_good(path)
+    started = {
+        name: _start_refresh(name, fetch, name not in transient, path)
+        for name, fetch in fetchers.items()
+    }
+    deadline_at = time.monotonic() + deadline
+    results = {}
+    for name, (thread, holder) in started.items():
+        thread.join(max(0.0, deadline_at - time.monotonic()))
+        if 'value' in holder:
+            results[name] = {'value': holder['value'], 'fetched_at': holder['fetched_at'], 'fresh': True}
+        elif name in cache:
+            results[name] = {**cache[name], 'fresh': False}
+        else:
+            results[name] = None
+    return results
+
+
+def wait_for_refreshes(timeout=PENDING_REFRESH_WAIT_S):
+    """Attend au plus `timeout` secondes les sources encore en cours ; retourne leurs noms restants.
+
+    Les threads de rafraîchissement sont des démons : une construction ponctuelle appelle cette
+    fonction avant de quitter pour qu'une réponse tardive atteigne quand même le cache.
+    """
+    deadline_at = time.monotonic() + timeout
+    for thread in list(_pending_refreshes):
+        thread.join(max(0.0, deadline_at - time.monotonic()))
+    _pending_refreshes[:] = [thread for thread in _pending_refreshes if thread.is_alive()]
+    return [thread.name.removeprefix("refresh-") for thread in _pending_refreshes]
+
+
+def load_hashrate_history(path=HASHRATE_HISTORY_PATH):
+    """Charge l'historique local du hash rate sous forme de tableaux (timestamps, TH/s)."""
+    import numpy as np
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return np.asarray(data["t"], dtype=np.int64), np.asarray(data["hr"], dtype=np.float64)
+    except (OSError, ValueError, KeyError):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+
+def save_hashrate_history(timestamps, hash_rates, path=HASHRATE_HISTORY_PATH):
+    """Enregistre l'historique du hash rate (format colonnes compact)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"t": timestamps.tolist(), "hr": hash_rates.tolist()}, f, separators=(",", ":"))
+
+
+def update_hashrate_history(path=HASHRATE_HISTORY_PATH):
+    """Met à jour l'historique local en ne récupérant que les jours manquants."""
+    import numpy as np
+
+    timestamps, hash_rates = load_hashrate_history(path)
+    if len(timestamps):
+        missing_days = int((time.time() - timestamps[-1]) // 86400) + 2
+        timespan = f"{missing_days}days"
+    else:
+        timespan = "all"
+    try:
+        response = _get(
+            f"{BLOCKCHAIN_INFO_URL}/charts/hash-rate?timespan={timespan}&sampled=false&format=json"
+        )
+        values = response.json()["values"]
+        new_ts = np.fromiter((v["x"] for v in values), dtype=np.int64, count=len(values))
+        new_hr = np.fromiter((v["y"] for v in values), dtype=np.float64, count=len(values))
+        timestamps, hash_rates = merge_series(timestamps, hash_rates, new_ts, new_hr)
+        save_hashrate_history(timestamps, hash_rates, path)
+    except Exception as e:
+        print(f"Erreur lors de la mise à jour de l'historique du hash rate : {e}")
+    return timestamps, hash_rates
+
+
+def load_price_history(currency, path=PRICE_HISTORY_PATH):
+    """Charge l'historique local des prix d'une devise sous forme de tableau (n, 2) : ts_ms, prix."""
+    import numpy as np
+
+    try:
+        with open(path.format(currency=currency), encoding="utf-8") as f:
+            data = json.load(f)
+        return np.column_stack([np.asarray(data["t"], dtype=np.float64), np.asarray(data["p"], dtype=np.float64)])
+    except (OSError, ValueError, KeyError):
+        return np.empty((0, 2), dtype=np.float64)
+
+
+def save_price_history(currency, history, path=PRICE_HISTORY_PATH):
+    """Enregistre l'historique des prix d'une devise (format colonnes compact)."""
+    path = path.format(currency=currency)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"t": history[:, 0].astype("int64").tolist(), "p": history[:, 1].tolist()}, f, separators=(",", ":"))
+
+
+def backfill_windows(from_ts, to_ts, window_days=BACKFILL_WINDOW_DAYS):
+    """Découpe [from_ts, to_ts] en fenêtres contiguës de window_days jours, [(début, fin), ...]."""
+    step = window_days * 86400
+    return [(start, min(start + step, to_ts)) for start in range(from_ts, to_ts, step)]
+
+
+def load_backfill_checkpoint(currency, path=PRICE_BACKFILL_PATH):
+    """Fenêtres déjà récupérées d'un remplissage interrompu, {"début-fin": [[ts_ms, prix], ...]}."""
+    try:
+        with open(path.format(currency=currency), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_backfill_checkpoint(currency, windows, path=PRICE_BACKFILL_PATH):
+    """Enregistre les fenêtres récupérées (écriture atomique)."""
+    path = path.format(currency=currency)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(windows, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def backfill_price_history(currency, current_date, from_ts=START_TS_2018, window_days=BACKFILL_WINDOW_DAYS,
+                           workers=BACKFILL_WORKERS, path=PRICE_BACKFILL_PATH):
+    """Reconstruit l'historique complet d'une devise, fenêtre par fenêtre, en parallèle.
+
+    Chaque fenêtre réussie est enregistrée dans un point de reprise : après un échec, seul le
+    reste est redemandé au lancement suivant. Retourne la série fusionnée, ramenée au jour et
+    dédupliquée (tableau (n, 2) : ts_ms, prix) ; lève RuntimeError si des fenêtres manquent.
+    """
+    import numpy as np
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    to_ts = int(time.mktime(current_date.timetuple()))
+    done = load_backfill_checkpoint(currency, path)
+    pending = [w for w in backfill_windows(from_ts, to_ts, window_days) if f"{w[0]}-{w[1]}" not in done]
+
+    def fetch_window(window):
+        for attempt in range(BACKFILL_RETRIES):
+            try:
+                return fetch_historical_prices(current_date, currency, *window)
+            except Exception:
+                if attempt == BACKFILL_RETRIES - 1:
+                    raise
+                time.sleep(2 ** attempt)
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fetch_window, window): window for window in pending}
+        for future in as_completed(futures):
+            start, end = futures[future]
+            try:
+                done[f"{start}-{end}"] = future.result()
+            except Exception as e:
+                failed.append((start, end))
+                print(f"Erreur sur la fenêtre {currency} {start}-{end} : {e}")
+                continue
+            save_backfill_checkpoint(currency, done, path)
+    if failed:
+        raise RuntimeError(f"{len(failed)} fenêtre(s) manquante(s) pour {currency}, reprise au prochain lancement")
+
+    # Fenêtres dans l'ordre chronologique : aux bords partagés, le premier point du jour l'emporte
+    points = [point for key in sorted(done, key=lambda k: int(k.split('-')[0])) for point in done[key]]
+    data = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    empty = np.empty(0, dtype=np.float64)
+    ts, prices = merge_series(empty, empty, (data[:, 0] // 86_400_000) * 86_400_000, data[:, 1])
+    os.remove(path.format(currency=currency))
+    return np.column_stack([ts, prices])
+
+
+def update_price_histories(current_date, currencies=tuple(CURRENCY_SYMBOLS), path=PRICE_HISTORY_PATH,
+                           backfill=False):
+    """Met à jour l'historique local de chaque devise en ne récupérant que les jours manquants.
+
+    Les horodatages sont ramenés au jour (UTC) avant fusion : le point intrajournalier que
+    CoinGecko renvoie pour aujourd'hui remplace celui de la veille au lieu de s'y ajouter.
+    Sans historique local, la devise n'est reconstruite (backfill_price_history) qu'avec
+    backfill=True : ce remplissage long est une étape à part (python sources.py remplir-prix),
+    jamais lancé pendant une construction, qui ne doit pas attendre l'amont.
+    Une devise en échec garde son historique local ; retourne {devise: tableau (n, 2)}.
+    """
+    import numpy as np
+
+    histories = {}
+    for currency in currencies:
+        history = load_price_history(currency, path)
+        try:
+            if len(history):
+                from_ts = int(history[-1, 0] // 1000) - 86400
+                new = np.asarray(fetch_historical_prices(current_date, currency, from_ts), dtype=np.float64).reshape(-1, 2)
+                new_ts = (new[:, 0] // 86_400_000) * 86_400_000
+                ts, prices = merge_series(history[:, 0], history[:, 1], new_ts, new[:, 1])
+                history = np.column_stack([ts, prices])
+            elif backfill:
+                history = backfill_price_history(currency, current_date)
+            else:
+                print(f"Pas d'historique local des prix ({currency}) : lancer python sources.py remplir-prix")
+                continue
+            save_price_history(currency, history, path)
+        except Exception as e:
+            print(f"Erreur lors de la mise à jour de l'historique des prix ({currency}) : {e}")
+        if len(history):
+            histories[currency] = history
+    return histories
+
+
+def fetch_snapshot(current_date=None, deadline=REFRESH_DEADLINE_S, path=LAST_GOOD_PATH):
+    """Interroge les fournisseurs (sous échéance) et assemble le snapshot attendu par le cœur de calcul.
+
+    En plus des données, le snapshot indique pour chaque source l'instant de la donnée utilisée
+    ('fetched_at') et la liste des sources servies depuis le cache ou les valeurs par défaut
+    ('stale_sources'), pour étiqueter une page construite en mode dégradé. Hauteur, prix et hash
+    rate doivent être confirmés par un second fournisseur : une valeur fraîche qu'aucun autre
+    n'a confirmée avant l'échéance est publiée, mais figure dans 'unconfirmed_sources' (et
+    dans 'stale_sources').
+    """
+    from fournisseurs import confirmed_fetch, save_latencies
+    from registre_blocs import open_block_store
+
+    if current_date is None:
+        current_date = date.today()
+    unconfirmed = set()
+
+    def confirmed(metric):
+        # Fournisseurs redondants : un fournisseur lent est couvert par le suivant, et une valeur
+        # publiée sur la page doit être confirmée par un second fournisseur
+        def fetch():
+            value, ok = confirmed_fetch(metric, deadline=max(0.0, deadline - CONFIRM_MARGIN_S))
+            if not ok:
+                unconfirmed.add(metric)
+            return value
+        return fetch
+
+    results = refresh_sources({
+        'block_height': confirmed('block_height'),
+        'prices': confirmed('prices'),
+        'hash_rate_ths': confirmed('hash_rate_ths'),
+        'price_histories': lambda: update_price_histories(current_date),
+        'hashrate_history': update_hashrate_history,
+    }, deadline, path, transient=('price_histories', 'hashrate_history'))
+    save_latencies()  # Délais de couverture appris pour les constructions suivantes
+    # Les historiques ont leur propre stockage local, qui sert de repli
+    history = results.pop('hashrate_history')
+    hashrate_history = history['value'] if history else load_hashrate_history()
+    histories = results.pop('price_histories')
+    if histories:
+        price_histories = histories['value']
+    else:
+        price_histories = {code: h for code in CURRENCY_SYMBOLS if len(h := load_price_history(code))}
+
+    snapshot = {
+        'date': current_date,
+        'timestamp': int(time.time()),
+        'hashrate_history': hashrate_history,
+        'block_rewards': open_block_store(),
+        'fetched_at': {},
+        'stale_sources': [],
+        'unconfirmed_sources': [],
+    }
+    if len(hashrate_history[0]) < 2:
+        # Sans historique, l'énergie suppose le hash rate actuel constant depuis 2018 : MW signalés
+        snapshot['stale_sources'].append('hashrate_history')
+        snapshot['fetched_at']['hashrate_history'] = None
+    if 'eur' not in price_histories:
+        # Aucun historique en EUR, ni frais ni local : courbe factice signalée comme telle
+        price_histories = {**price_histories, **FALLBACKS['price_histories'][0]}
+        snapshot['stale_sources'].append('price_histories')
+        snapshot['fetched_at']['price_histories'] = None
+    snapshot['price_histories'] = price_histories
+    for name, result in results.items():
+        if result is None:
+            value, fetched_at = FALLBACKS[name]
+        else:
+            value, fetched_at = result['value'], result['fetched_at']
+        if result is None or not result['fresh']:
+            snapshot['stale_sources'].append(name)
+            age = "de date inconnue" if fetched_at is None else datetime.fromtimestamp(fetched_at).strftime("du %d/%m/%Y %H:%M")
+            print(f"Source {name} indisponible : donnée {age} utilisée")
+        elif name in unconfirmed:
+            snapshot['stale_sources'].append(name)
+            snapshot['unconfirmed_sources'].append(name)
+        snapshot[name] = value
+        snapshot['fetched_at'][name] = fetched_at
+    return snapshot
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["remplir-prix"]:
+        histories = update_price_histories(date.today(), backfill=True)
+        for code in CURRENCY_SYMBOLS:
+            print(f"{code} : {len(histories[code]) if code in histories else 0} jours")
+    else:
+        print(__doc__)
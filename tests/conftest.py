@@ -0,0 +1,123 @@
+"""Bouchons d'API amont partagés par les tests (aucun appel réseau réel)."""
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fournisseurs  # noqa: E402
+import sources  # noqa: E402
+
+
+class Upstream:
+    """API amont locales sur un seul port, un préfixe de chemin par fournisseur.
+
+    Les valeurs servies (state), la latence (delays) et les pannes (failures, réponse 503)
+    se règlent par fournisseur pendant le test ; hits compte les requêtes reçues. L'historique
+    CoinGecko (market_chart/range) renvoie un prix toutes les HISTORY_STEP_S secondes, égal à
+    l'horodatage en secondes ; les fenêtres dont le début est dans failing_windows échouent et
+    range_requests liste les (début, fin) demandés.
+    """
+
+    HISTORY_STEP_S = 43_200
+
+    def __init__(self):
+        self.state = {
+            'height': {'esplora': 800_000, 'mempool': 800_000, 'blockchain.com': 800_000},
+            'prices': {'coingecko': {'eur': 50_000.0, 'usd': 55_000.0},
+                       'blockchain.com': {'eur': 50_100.0, 'usd': 55_050.0},
+                       'kraken': {'eur': 50_050.0, 'usd': 55_020.0}},
+            'hash_rate_ths': {'blockchain.info': 6e8, 'mempool': 6.1e8, 'esplora': 6.05e8},
+        }
+        self.delays = Counter()
+        self.failures = set()
+        self.failing_windows = set()
+        self.range_requests = []
+        self.hits = Counter()
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                upstream.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def body(self, provider, path, query):
+        state = self.state
+        if path == '/coins/bitcoin/market_chart/range':
+            start, end = int(query['from'][0]), int(query['to'][0])
+            self.range_requests.append((start, end))
+            if start in self.failing_windows:
+                return None
+            first = -(-start // self.HISTORY_STEP_S) * self.HISTORY_STEP_S
+            return json.dumps({'prices': [[t * 1000, float(t)] for t in range(first, end + 1, self.HISTORY_STEP_S)]})
+        if path == '/blocks/tip/height':
+            return str(state['height'][provider])
+        if path == '/q/getblockcount':
+            return str(state['height']['blockchain.com'])
+        if path == '/simple/price':
+            return json.dumps({'bitcoin': state['prices']['coingecko']})
+        if path == '/ticker':
+            return json.dumps({code.upper(): {'last': p} for code, p in state['prices']['blockchain.com'].items()})
+        if path == '/0/public/Ticker':
+            # Clés hétérogènes comme chez Kraken ('XXBTZEUR', 'XBTUSD')
+            return json.dumps({'error': [], 'result': {
+                ('XXBTZ' if code == 'eur' else 'XBT') + code.upper(): {'c': [str(p), '0.01']}
+                for code, p in state['prices']['kraken'].items()}})
+        if path == '/blocks':
+            difficulty = state['hash_rate_ths']['esplora'] * 1e12 * 600 / 2 ** 32
+            return json.dumps([{'height': state['height'][provider], 'difficulty': difficulty}])
+        if path == '/charts/hash-rate':
+            return json.dumps({'values': [{'x': int(time.time()), 'y': state['hash_rate_ths']['blockchain.info']}]})
+        if path == '/v1/mining/hashrate/3d':
+            return json.dumps({'currentHashrate': state['hash_rate_ths']['mempool'] * 1e12})
+        return None
+
+    def handle(self, request):
+        url = urlparse(request.path)
+        _, provider, path = url.path.split('/', 2)
+        self.hits[provider] += 1
+        if self.delays[provider]:
+            time.sleep(self.delays[provider])
+        body = None if provider in self.failures else self.body(provider, '/' + path, parse_qs(url.query))
+        if body is None:
+            request.send_error(503)
+            return
+        data = body.encode('utf-8')
+        request.send_response(200)
+        request.send_header('Content-Type', 'application/json')
+        request.send_header('Content-Length', str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def upstream(monkeypatch, tmp_path):
+    """Bouchons amont branchés sur les URL de base de sources.py, registre de fournisseurs neuf."""
+    stub = Upstream()
+    monkeypatch.setattr(sources, 'ESPLORA_URL', f"{stub.url}/esplora")
+    monkeypatch.setattr(sources, 'MEMPOOL_URL', f"{stub.url}/mempool")
+    monkeypatch.setattr(sources, 'COINGECKO_URL', f"{stub.url}/coingecko")
+    monkeypatch.setattr(sources, 'BLOCKCHAIN_INFO_URL', f"{stub.url}/blockchain.info")
+    monkeypatch.setattr(sources, 'BLOCKCHAIN_COM_URL', f"{stub.url}/blockchain.com")
+    monkeypatch.setattr(sources, 'KRAKEN_URL', f"{stub.url}/kraken")
+    monkeypatch.setattr(fournisseurs, 'REGISTRY', fournisseurs.default_registry())
+    monkeypatch.chdir(tmp_path)  # data/ (historiques, caches) isolé par test
+    yield stub
+    stub.close()
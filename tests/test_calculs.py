@@ -0,0 +1,42 @@
+"""Réduction des séries des graphiques (calculs.py) : LTTB et min/max par bucket."""
+import numpy as np
+import pytest
+
+from calculs import lttb_downsample, minmax_downsample
+
+
+def daily_series(n=3000, seed=1):
+    rng = np.random.default_rng(seed)
+    return np.arange(n, dtype=np.float64), np.cumsum(rng.normal(size=n)) + 100.0
+
+
+@pytest.mark.parametrize('downsample', [lttb_downsample, minmax_downsample])
+@pytest.mark.parametrize('n_out', [4, 10, 400])
+def test_keeps_ends_and_returns_n_out_increasing_indices(downsample, n_out):
+    x, y = daily_series()
+    indices = downsample(x, y, n_out)
+    assert len(indices) == n_out
+    assert indices[0] == 0 and indices[-1] == len(x) - 1
+    assert np.all(np.diff(indices) > 0)
+
+
+@pytest.mark.parametrize('downsample', [lttb_downsample, minmax_downsample])
+@pytest.mark.parametrize('spike', [1, 1234, 2998])
+def test_single_sample_spike_survives(downsample, spike):
+    x = np.arange(3000, dtype=np.float64)
+    y = np.zeros(3000)
+    y[spike] = 50.0
+    assert spike in downsample(x, y, 40)
+    y[spike] = -50.0  # Un creux isolé aussi
+    assert spike in downsample(x, y, 40)
+
+
+@pytest.mark.parametrize('downsample', [lttb_downsample, minmax_downsample])
+def test_short_series_is_returned_whole(downsample):
+    x, y = daily_series(50)
+    np.testing.assert_array_equal(downsample(x, y, 400), np.arange(50))
+
+
+def test_minmax_rounds_odd_targets_down():
+    x, y = daily_series()
+    assert len(minmax_downsample(x, y, 11)) == 10
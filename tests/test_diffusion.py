@@ -0,0 +1,97 @@
+"""Serveur SSE (diffusion.py) face à un Esplora local : contenu des deltas et diffusion à tous les onglets."""
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from diffusion import EVENTS_PATH, create_server
+
+
+def read_event(stream):
+    """Lit le prochain événement « delta » du flux ; retourne (id, données)."""
+    event_id, data = None, None
+    while True:
+        line = stream.readline().decode('utf-8')
+        if not line:
+            raise EOFError("flux fermé")
+        line = line.rstrip('\n')
+        if line.startswith('id: '):
+            event_id = int(line[4:])
+        elif line.startswith('data: '):
+            data = json.loads(line[6:])
+        elif line == '' and data is not None:
+            return event_id, data
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition non atteinte")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def server(upstream, tmp_path):
+    site = tmp_path / 'dist'
+    site.mkdir()
+    (site / 'index.html').write_text('<p>compteur</p>', encoding='utf-8')
+    (tmp_path / 'secret.py').write_text('TOKEN = 1', encoding='utf-8')
+    server, broadcaster, stop = create_server(str(site), port=0, esplora_url=f"{upstream.url}/esplora",
+                                              poll_s=0.05, price_refresh_s=0.05)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    wait_for(lambda: {'h', 'p', 'mw'} <= broadcaster.state.keys())
+    yield server, broadcaster
+    stop.set()
+    server.shutdown()
+    server.server_close()
+
+
+def url(server, path):
+    return f"http://127.0.0.1:{server.server_port}{path}"
+
+
+def test_listens_on_loopback_and_serves_only_the_site_directory(server):
+    server, _ = server
+    assert server.server_address[0] == '127.0.0.1'
+    with urllib.request.urlopen(url(server, '/index.html'), timeout=5) as response:
+        assert response.read() == b'<p>compteur</p>'
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(url(server, '/../secret.py'), timeout=5)
+    assert error.value.code == 404
+
+
+def test_new_subscriber_receives_full_state(server, upstream):
+    server, _ = server
+    with urllib.request.urlopen(url(server, EVENTS_PATH), timeout=5) as stream:
+        _, state = read_event(stream)
+    assert state['h'] == 800_000
+    assert state['p'] == {'eur': 50_000.0, 'usd': 55_000.0}
+    assert state['mw'] > 0
+
+
+def test_deltas_carry_only_changed_fields_to_every_subscriber(server, upstream):
+    server, broadcaster = server
+    streams = [urllib.request.urlopen(url(server, EVENTS_PATH), timeout=5) for _ in range(3)]
+    try:
+        initial_ids = {read_event(stream)[0] for stream in streams}
+        assert len(initial_ids) == 1
+        wait_for(lambda: len(broadcaster) == 3)
+
+        upstream.state['height']['esplora'] += 1
+        events = [read_event(stream) for stream in streams]
+        assert len(set(json.dumps(e, sort_keys=True) for e in events)) == 1  # Même événement pour tous
+        event_id, delta = events[0]
+        assert event_id > initial_ids.pop()
+        assert delta['h'] == 800_001
+        assert 'p' not in delta  # Prix inchangé : absent du delta
+
+        upstream.state['prices']['coingecko'] = {'eur': 51_000.0, 'usd': 56_000.0}
+        deltas = [read_event(stream)[1] for stream in streams]
+        assert all(d == {'p': {'eur': 51_000.0, 'usd': 56_000.0}} for d in deltas)
+    finally:
+        for stream in streams:
+            stream.close()
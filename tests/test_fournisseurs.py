@@ -0,0 +1,113 @@
+"""Fournisseurs redondants (fournisseurs.py) face à des API locales : couverture, bascule, confirmation, relégation."""
+import time
+
+import pytest
+
+import fournisseurs
+from fournisseurs import (DEFAULT_HEDGE_DELAY_S, MIN_SAMPLES, confirmed_fetch, cross_check, default_registry,
+                          hedged_fetch, load_latencies, save_latencies)
+from sources import REFRESH_DEADLINE_S, fetch_snapshot
+
+
+def names(metric):
+    return [provider.name for provider in fournisseurs.REGISTRY[metric]]
+
+
+def learn(metric, name, latency_s, samples=MIN_SAMPLES):
+    """Donne au fournisseur un historique de latences (délai de couverture appris)."""
+    provider = next(p for p in fournisseurs.REGISTRY[metric] if p.name == name)
+    provider.latencies.extend([latency_s] * samples)
+    return provider
+
+
+def test_slow_primary_is_hedged_after_its_learned_p95(upstream):
+    assert learn('block_height', 'blockstream', 0.01).hedge_delay() < DEFAULT_HEDGE_DELAY_S
+    upstream.delays['esplora'] = 2.0
+    upstream.state['height']['mempool'] = 800_001
+
+    started = time.monotonic()
+    assert hedged_fetch('block_height') == 800_001
+    assert time.monotonic() - started < 1.0
+    assert upstream.hits['esplora'] == 1 and upstream.hits['blockchain.com'] == 0
+
+
+def test_failing_primary_fails_over_without_waiting(upstream):
+    upstream.failures.add('coingecko')
+
+    started = time.monotonic()
+    assert hedged_fetch('prices') == {'eur': 50_100.0, 'usd': 55_050.0}
+    assert time.monotonic() - started < DEFAULT_HEDGE_DELAY_S
+
+
+def test_no_valid_answer_raises(upstream):
+    upstream.failures.update({'blockchain.info', 'mempool', 'esplora'})
+    with pytest.raises(RuntimeError, match="hash_rate_ths"):
+        hedged_fetch('hash_rate_ths')
+
+
+def test_confirmation_rejects_an_outlier_and_demotes_it(upstream):
+    upstream.state['height']['esplora'] = 900_000
+
+    assert confirmed_fetch('block_height') == (800_000, True)
+    assert names('block_height')[-1] == 'blockstream'
+
+
+def test_confirmation_does_not_wait_for_a_slow_second_provider(upstream):
+    upstream.delays['blockchain.com'] = 6.0
+
+    started = time.monotonic()
+    assert confirmed_fetch('prices') == ({'eur': 50_000.0, 'usd': 55_000.0}, True)  # Confirmé par Kraken
+    assert time.monotonic() - started < DEFAULT_HEDGE_DELAY_S + 1.0
+
+
+def test_lone_answer_is_returned_as_unconfirmed(upstream):
+    upstream.failures.update({'mempool', 'esplora'})
+    assert confirmed_fetch('hash_rate_ths') == (6e8, False)
+
+
+def test_confirmation_refuses_discordant_answers(upstream):
+    upstream.state['prices']['blockchain.com'] = {'eur': 80_000.0, 'usd': 88_000.0}
+    upstream.state['prices']['kraken'] = {'eur': 65_000.0, 'usd': 71_000.0}
+    with pytest.raises(RuntimeError, match="discordantes"):
+        confirmed_fetch('prices')
+
+
+def test_cross_check_demotes_outliers(upstream):
+    upstream.state['height']['esplora'] = 799_000
+
+    report = cross_check('block_height')
+    assert report['consensus'] == 800_000
+    assert report['outliers'] == ['blockstream']
+    assert names('block_height') == ['mempool.space', 'blockchain.com', 'blockstream']
+
+
+def test_latencies_survive_a_restart(upstream, tmp_path):
+    learn('prices', 'coingecko', 0.2)
+    path = tmp_path / 'latences.json'
+    save_latencies(path=str(path))
+
+    registry = load_latencies(default_registry(), str(path))
+    assert registry['prices'][0].hedge_delay() == pytest.approx(0.2)
+    assert registry['prices'][1].hedge_delay() == DEFAULT_HEDGE_DELAY_S
+
+
+def test_snapshot_uses_the_confirmed_value_and_persists_latencies(upstream, tmp_path):
+    upstream.state['height']['esplora'] = 900_000
+
+    snapshot = fetch_snapshot()
+    assert snapshot['block_height'] == 800_000
+    assert 'block_height' not in snapshot['stale_sources']
+    assert snapshot['unconfirmed_sources'] == []
+    assert (tmp_path / fournisseurs.LATENCIES_PATH).exists()
+
+
+def test_snapshot_publishes_an_unconfirmed_fresh_price_before_the_deadline(upstream):
+    upstream.delays['blockchain.com'] = 6.0
+    upstream.failures.add('kraken')
+
+    started = time.monotonic()
+    snapshot = fetch_snapshot()
+    assert time.monotonic() - started < REFRESH_DEADLINE_S
+    assert snapshot['prices'] == {'eur': 50_000.0, 'usd': 55_000.0}  # Pas la valeur figée de 2025
+    assert 'prices' in snapshot['stale_sources'] and snapshot['unconfirmed_sources'] == ['prices']
+    assert snapshot['fetched_at']['prices'] is not None
@@ -0,0 +1,98 @@
+"""Registre colonnaire des blocs (registre_blocs.py) : protocole d'ajout, sommes préfixes, raccord exact."""
+from datetime import date
+
+import numpy as np
+import pytest
+
+from calculs import START_BLOCK, calculate_mined_btc, calculate_opportunity_cost
+from registre_blocs import COLUMNS, SATS_PER_BTC, BlockStore, block_subsidy_sat
+
+
+def fill(path, start, count, fees=1_000):
+    store = BlockStore(str(path))
+    heights = np.arange(start, start + count)
+    store.append(heights, 1_700_000_000 + 600 * (heights - start), np.full(count, fees))
+    return store
+
+
+def test_append_is_contiguous_and_skips_known_heights(tmp_path):
+    store = fill(tmp_path, 100, 10)
+    assert (len(store), store.base_height, store.tip_height) == (10, 100, 109)
+
+    # Chevauchement : seules les hauteurs nouvelles sont ajoutées, dans le désordre admis
+    assert store.append([111, 108, 110, 109], [0, 0, 0, 0], [5, 5, 5, 5]) == 2
+    assert store.tip_height == 111
+    assert store.append([105], [0], [0]) == 0
+
+    with pytest.raises(ValueError, match="non contiguës"):
+        store.append([113], [0], [0])  # Trou après la dernière hauteur
+    with pytest.raises(ValueError, match="non contiguës"):
+        store.append([112, 114], [0, 0], [0, 0])  # Trou interne
+    assert len(BlockStore(str(tmp_path))) == 12  # Refus sans effet sur le registre
+
+
+def test_interrupted_append_is_truncated_on_next_append(tmp_path):
+    fill(tmp_path, 100, 10)
+    # Ajout interrompu : lignes écrites dans les colonnes, meta.json jamais mis à jour
+    for name, dtype in COLUMNS.items():
+        with open(tmp_path / f"{name}.bin", 'ab') as f:
+            f.write(np.full(3, 99, dtype=dtype).tobytes())
+
+    store = BlockStore(str(tmp_path))
+    assert len(store) == 10 and store.tip_height == 109
+    assert store.append([110, 111], [0, 0], [7, 7]) == 2
+    for name, dtype in COLUMNS.items():
+        assert (tmp_path / f"{name}.bin").stat().st_size == 12 * np.dtype(dtype).itemsize
+    reopened = BlockStore(str(tmp_path))
+    np.testing.assert_array_equal(reopened.columns['height'], np.arange(100, 112))
+    assert reopened.columns['cum_fees'][-1] == 10 * 1_000 + 2 * 7
+
+
+def test_range_totals_match_a_direct_sum(tmp_path):
+    rng = np.random.default_rng(3)
+    start, count = 209_900, 300  # Traverse le premier halving
+    fees = rng.integers(0, 50_000_000, count)
+    store = BlockStore(str(tmp_path))
+    store.append(np.arange(start, start + count), np.zeros(count), fees)
+    subsidy = block_subsidy_sat(np.arange(start, start + count))
+
+    for lo, hi in [(209_900, 210_200), (210_000, 210_001), (209_950, 210_050), (100, 209_905), (210_150, 999_999)]:
+        i, j = max(lo - start, 0), min(hi - start, count)
+        totals = store.range_totals(lo, hi)
+        assert totals['blocks'] == j - i
+        assert totals['subsidy_btc'] == subsidy[i:j].sum() / SATS_PER_BTC
+        assert totals['fees_btc'] == fees[i:j].sum() / SATS_PER_BTC
+    assert store.range_totals(300_000, 400_000)['blocks'] == 0
+    assert BlockStore(str(tmp_path / 'vide')).range_totals(0, 10)['total_btc'] == 0.0
+
+
+def snapshot(height, store):
+    return {
+        'date': date(2025, 9, 29),
+        'timestamp': 1_759_104_000,
+        'block_height': height,
+        'prices': {'eur': 100_000.0},
+        'hash_rate_ths': 6e8,
+        'hashrate_history': (np.array([1_514_764_800, 1_759_104_000]), np.array([2e7, 6e8])),
+        'price_histories': {'eur': [[1_514_764_800_000, 12_000.0], [1_759_104_000_000, 100_000.0]]},
+        'block_rewards': store,
+    }
+
+
+@pytest.mark.parametrize('start, count, height', [
+    (839_990, 20, 900_000),  # Registre au milieu de la période, à cheval sur un halving
+    (899_990, 20, 900_000),  # Registre au-delà de la hauteur actuelle : raccord borné
+    (499_000, 1_000, 900_000),  # Registre commençant avant START_BLOCK
+])
+def test_opportunity_cost_splices_the_exact_range(tmp_path, start, count, height):
+    store = fill(tmp_path, start, count, fees=1_000)
+    result = calculate_opportunity_cost(snapshot(height, store), share=0.10)
+
+    covered = min(start + count, height) - max(start, START_BLOCK)
+    assert result['fees_btc'] == pytest.approx(covered * 1_000 / SATS_PER_BTC)
+    # Subventions exactes identiques au calcul par périodes : seul l'apport des frais diffère
+    expected = calculate_mined_btc(START_BLOCK, height) + covered * 1_000 / SATS_PER_BTC
+    assert result['total_mined_btc'] == pytest.approx(expected)
+    without_store = calculate_opportunity_cost(snapshot(height, None), share=0.10)
+    gained = result['france_btc_past'] - without_store['france_btc_past']
+    assert gained == pytest.approx(0.10 * covered * 1_000 / SATS_PER_BTC, abs=1e-9)
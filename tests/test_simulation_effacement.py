@@ -0,0 +1,113 @@
+"""simulation_effacement.py : chargement des profils de surplus (cellules vides ou illisibles, pied de
+tableau) et moteur horaire (écrêtage, effacement au prix, BTC minés, agrégats annuels)."""
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from calculs import FEES_PER_BLOCK
+from simulation_effacement import load_surplus_profile, simulate_curtailment, summarize_by_year
+
+
+def test_blank_cells_and_footer_rows_are_dropped(tmp_path):
+    path = tmp_path / 'profil.csv'
+    path.write_text('horodatage;surplus_mw;prix_eur_mwh\n'
+                    '2024-01-01 00:00;100;20\n'
+                    '2024-01-01 00:30;;25\n'
+                    '2024-01-01 01:00;300;\n'
+                    '2024-01-01 01:30;200,5;30,5\n'
+                    'Données provisoires;;\n', encoding='utf-8')
+
+    hours, surplus, prices = load_surplus_profile(path)
+    np.testing.assert_array_equal(hours, [1704067200, 1704070800])
+    np.testing.assert_array_equal(surplus, [100.0, 200.5])
+    np.testing.assert_array_equal(prices, [20.0, 30.5])
+
+
+def test_unreadable_cells_are_dropped(tmp_path):
+    path = tmp_path / 'nd.csv'
+    path.write_text('Date;Heures;surplus_mw;prix_eur_mwh\n'
+                    '2024-01-01;00:00;ND;20\n'
+                    '2024-01-01;01:00;150;ND\n'
+                    '2024-01-01;02:00;1 200,5;10\n'  # Séparateur de milliers : illisible
+                    '2024-01-01;03:00;400;12\n'
+                    'Source : RTE;Total;;\n', encoding='utf-8')
+
+    hours, surplus, prices = load_surplus_profile(path)
+    np.testing.assert_array_equal(hours, [1704078000])
+    np.testing.assert_array_equal(surplus, [400.0])
+    np.testing.assert_array_equal(prices, [12.0])
+
+
+def test_eco2mix_columns_average_sub_hourly_steps(tmp_path):
+    path = tmp_path / 'eco2mix.csv'
+    path.write_text('Date;Heures;surplus_mw\n2024-01-01;00:00;1,5\n2024-01-01;00:15;2,5\nPied de tableau\n',
+                    encoding='utf-8')
+
+    hours, surplus, prices = load_surplus_profile(path)
+    np.testing.assert_array_equal(hours, [1704067200])
+    np.testing.assert_array_equal(surplus, [2.0])
+    assert prices is None
+
+
+def test_profile_without_usable_rows_is_rejected(tmp_path):
+    path = tmp_path / 'vide.csv'
+    path.write_text('horodatage;surplus_mw\n2024-01-01 00:00;\n', encoding='utf-8')
+    with pytest.raises(ValueError, match="Aucune ligne exploitable"):
+        load_surplus_profile(path)
+
+
+def hour(year, month=6, day=1, h=0):
+    return int(datetime(year, month, day, h, tzinfo=timezone.utc).timestamp())
+
+
+NETWORK_THS = 95e6  # Hash rate mondial constant de l'historique de test
+BTC_PRICE_EUR = 100_000.0
+
+
+def run(timestamps, surplus, prices=None, **kwargs):
+    timestamps = np.asarray(timestamps)
+    history = (np.array([hour(2018), hour(2030)]), np.array([NETWORK_THS, NETWORK_THS]))
+    price_history = np.array([[hour(2018) * 1000.0, BTC_PRICE_EUR], [hour(2030) * 1000.0, BTC_PRICE_EUR]])
+    return simulate_curtailment(timestamps, np.asarray(surplus, dtype=float),
+                                None if prices is None else np.asarray(prices, dtype=float),
+                                hashrate_history=history, price_history=price_history, **kwargs)
+
+
+def test_fleet_is_clipped_to_surplus_and_capacity():
+    result = run([hour(2025, h=h) for h in range(4)], [-50.0, 0.0, 60.0, 250.0], capacity_mw=100)
+    np.testing.assert_array_equal(result['used_mw'], [0.0, 0.0, 60.0, 100.0])
+    assert result['electricity_cost_eur'] is None
+
+
+def test_fleet_stops_above_the_price_ceiling():
+    result = run([hour(2025, h=h) for h in range(3)], [100.0, 100.0, 100.0], [10.0, 40.0, 40.01],
+                 capacity_mw=100, max_price_eur_mwh=40)
+    np.testing.assert_array_equal(result['used_mw'], [100.0, 100.0, 0.0])
+    np.testing.assert_array_equal(result['electricity_cost_eur'], [1_000.0, 4_000.0, 0.0])
+    assert result['btc'][2] == 0.0
+
+
+def test_btc_and_revenue_match_a_hand_computation():
+    # 100 MW à 20 J/TH = 5e6 TH/s ; 5 % d'un réseau de 100e6 TH/s (95e6 + la flotte)
+    result = run([hour(2025)], [100.0], capacity_mw=100, efficiency_j_th=20.0)
+    expected_btc = 0.05 * (3.125 + FEES_PER_BLOCK) * 6  # 6 blocs par heure, après le halving de 2024
+    assert result['hash_share'][0] == pytest.approx(0.05)
+    assert result['btc'][0] == pytest.approx(expected_btc)
+    assert result['revenue_eur'][0] == pytest.approx(expected_btc * BTC_PRICE_EUR)
+
+
+def test_yearly_summary_aggregates_hours():
+    timestamps = [hour(2024, 12, 31, 22), hour(2024, 12, 31, 23), hour(2025, 1, 1, 0)]
+    result = run(timestamps, [0.0, 100.0, 300.0], capacity_mw=200, efficiency_j_th=20.0)
+    rows = summarize_by_year(result)
+
+    assert [row['year'] for row in rows] == [2024, 2025]
+    first, second = rows
+    assert (first['hours'], first['running_hours'], second['hours'], second['running_hours']) == (2, 1, 1, 1)
+    assert first['energy_twh'] == pytest.approx(100 / 1e6)
+    assert first['average_mw'] == pytest.approx(50.0)
+    assert second['energy_twh'] == pytest.approx(200 / 1e6)
+    assert first['btc_mined'] == pytest.approx(result['btc'][:2].sum())
+    assert second['revenue_eur'] == pytest.approx(result['btc'][2] * BTC_PRICE_EUR)
+    assert first['electricity_cost_eur'] is None
@@ -0,0 +1,124 @@
+"""sources.py : cache des dernières valeurs valides (échéance, réponses tardives, mode dégradé) et remplissage
+de l'historique des prix (limiteur, fenêtres, reprise, fusion)."""
+import threading
+import time
+from datetime import date
+
+import numpy as np
+import pytest
+
+import sources
+from sources import (TokenBucket, backfill_price_history, backfill_windows, fetch_snapshot, load_backfill_checkpoint,
+                     load_last_good, refresh_sources, save_hashrate_history, store_last_good, wait_for_refreshes)
+
+
+def slow(value, delay_s):
+    def fetch():
+        time.sleep(delay_s)
+        return value
+    return fetch
+
+
+def test_late_source_is_served_from_cache_then_reaches_it_before_exit(tmp_path):
+    path = str(tmp_path / 'last_good.json')
+    store_last_good('block_height', 800_000, 1_700_000_000, path)
+
+    results = refresh_sources({'block_height': slow(800_010, 0.3), 'prices': slow({'eur': 1.0}, 0.0)},
+                              deadline=0.1, path=path)
+    assert results['block_height'] == {'value': 800_000, 'fetched_at': 1_700_000_000, 'fresh': False}
+    assert results['prices']['fresh'] and results['prices']['value'] == {'eur': 1.0}
+
+    assert wait_for_refreshes(timeout=5) == []
+    assert load_last_good(path)['block_height']['value'] == 800_010
+
+
+def test_wait_for_refreshes_is_bounded(tmp_path):
+    refresh_sources({'hash_rate_ths': slow(6e8, 1.0)}, deadline=0.0, path=str(tmp_path / 'last_good.json'))
+    started = time.monotonic()
+    assert wait_for_refreshes(timeout=0.1) == ['hash_rate_ths']
+    assert time.monotonic() - started < 0.5
+    assert wait_for_refreshes(timeout=5) == []
+
+
+def test_missing_hashrate_history_is_labelled_stale(upstream):
+    upstream.failures.add('blockchain.info')  # Historique du hash rate indisponible, aucun fichier local
+
+    snapshot = fetch_snapshot()
+    assert 'hashrate_history' in snapshot['stale_sources']
+    assert snapshot['fetched_at']['hashrate_history'] is None
+    assert 'block_height' not in snapshot['stale_sources']
+
+
+def test_local_hashrate_history_is_not_labelled(upstream):
+    save_hashrate_history(np.array([1_600_000_000, 1_700_000_000]), np.array([1.5e8, 5e8]))
+
+    snapshot = fetch_snapshot()
+    assert 'hashrate_history' not in snapshot['stale_sources']
+    assert len(snapshot['hashrate_history'][0]) == 3  # Historique local + point servi par le bouchon
+
+
+def test_token_bucket_spends_its_burst_then_holds_the_rate():
+    bucket = TokenBucket(rate=20, capacity=2)
+    started = time.monotonic()
+    for _ in range(2):
+        bucket.acquire()
+    assert time.monotonic() - started < 0.05  # Rafale immédiate
+    for _ in range(4):
+        bucket.acquire()
+    assert 0.18 <= time.monotonic() - started < 0.6
+
+
+def test_token_bucket_is_shared_between_threads():
+    bucket = TokenBucket(rate=50, capacity=1)
+    started = time.monotonic()
+    threads = [threading.Thread(target=lambda: [bucket.acquire() for _ in range(3)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.monotonic() - started >= 11 / 50 * 0.9  # 12 jetons dont 1 d'avance, quel que soit le thread
+
+
+def test_backfill_windows_cover_the_range_contiguously():
+    windows = backfill_windows(0, 10 * 86400, window_days=3)
+    assert windows == [(0, 3 * 86400), (3 * 86400, 6 * 86400), (6 * 86400, 9 * 86400), (9 * 86400, 10 * 86400)]
+    assert backfill_windows(0, 3 * 86400, window_days=3) == [(0, 3 * 86400)]
+    assert backfill_windows(5, 5) == []
+
+
+@pytest.fixture
+def backfill(upstream, monkeypatch):
+    """Remplissage sans attente : limiteur permissif, une seule tentative par fenêtre."""
+    monkeypatch.setattr(sources, 'coingecko_limiter', TokenBucket(1000, 1000))
+    monkeypatch.setattr(sources, 'BACKFILL_RETRIES', 1)
+    today = date(2025, 9, 29)
+    to_ts = int(time.mktime(today.timetuple()))
+    return upstream, today, to_ts - 10 * 86400, to_ts
+
+
+def first_point_per_day(from_ts, to_ts, step):
+    """Série attendue : premier point servi de chaque jour, horodatage ramené au jour."""
+    days = {}
+    for t in range(-(-from_ts // step) * step, to_ts + 1, step):
+        days.setdefault(t // 86400, t)
+    return [[day * 86_400_000, float(t)] for day, t in sorted(days.items())]
+
+
+def test_backfill_resumes_from_checkpoint_and_merges_window_edges(backfill):
+    upstream, today, from_ts, to_ts = backfill
+    windows = backfill_windows(from_ts, to_ts, window_days=3)
+    upstream.failing_windows.add(windows[1][0])
+
+    with pytest.raises(RuntimeError, match="1 fenêtre"):
+        backfill_price_history('eur', today, from_ts, window_days=3)
+    assert sorted(load_backfill_checkpoint('eur')) == sorted(f"{s}-{e}" for s, e in windows if s != windows[1][0])
+
+    upstream.failing_windows.clear()
+    upstream.range_requests.clear()
+    history = backfill_price_history('eur', today, from_ts, window_days=3)
+    assert upstream.range_requests == [windows[1]]  # Seule la fenêtre manquante est redemandée
+    assert load_backfill_checkpoint('eur') == {}
+
+    # Bords partagés entre fenêtres et points intrajournaliers : un seul point par jour, le premier
+    assert history.tolist() == first_point_per_day(from_ts, to_ts, upstream.HISTORY_STEP_S)
+    assert np.all(np.diff(history[:, 0]) == 86_400_000)